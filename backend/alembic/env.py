@@ -0,0 +1,71 @@
+"""
+Alembic 迁移环境
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.core.config import settings
+from app.db.database import Base, engine
+from app.db.search import is_search_index_object
+import app.models  # noqa: F401  注册所有模型
+
+config = context.config
+
+# 通过 alembic 命令行运行时才配置日志，应用内调用时保留应用自身的日志配置
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """自动生成迁移时忽略由搜索索引迁移维护、未在模型中声明的对象"""
+    if reflected and compare_to is None and is_search_index_object(name, type_):
+        return False
+    return True
+
+
+def run_migrations_offline() -> None:
+    """离线模式：仅生成SQL脚本"""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=settings.DATABASE_URL.startswith("sqlite"),
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """在线模式：复用应用的数据库引擎执行迁移"""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_with_connection(connection)
+        return
+
+    with engine.connect() as connection:
+        _run_with_connection(connection)
+
+
+def _run_with_connection(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite 不支持大部分 ALTER 操作，使用批处理模式（重建表）
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
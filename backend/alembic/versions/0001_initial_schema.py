@@ -0,0 +1,175 @@
+"""初始表结构
+
+与首次引入迁移前 init_db() 中 create_all 创建的表结构一致；
+已有数据库会被标记（stamp）为此版本，随后再执行后续迁移。
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('news',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=500), nullable=False),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('summary', sa.String(length=1000), nullable=True),
+    sa.Column('source', sa.String(length=200), nullable=True),
+    sa.Column('source_url', sa.String(length=1000), nullable=True),
+    sa.Column('author', sa.String(length=100), nullable=True),
+    sa.Column('category', sa.String(length=50), nullable=True),
+    sa.Column('tags', sa.String(length=500), nullable=True),
+    sa.Column('cover_image', sa.String(length=1000), nullable=True),
+    sa.Column('publish_date', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('crawl_date', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('view_count', sa.Integer(), nullable=True),
+    sa.Column('is_featured', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_news_category'), 'news', ['category'], unique=False)
+    op.create_index(op.f('ix_news_id'), 'news', ['id'], unique=False)
+    op.create_index(op.f('ix_news_title'), 'news', ['title'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=True),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+
+    op.create_table('blogs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('summary', sa.String(length=500), nullable=True),
+    sa.Column('cover_image', sa.String(length=500), nullable=True),
+    sa.Column('tags', sa.String(length=500), nullable=True),
+    sa.Column('category', sa.String(length=50), nullable=True),
+    sa.Column('is_published', sa.Boolean(), nullable=True),
+    sa.Column('view_count', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_blogs_id'), 'blogs', ['id'], unique=False)
+    op.create_index(op.f('ix_blogs_title'), 'blogs', ['title'], unique=False)
+    op.create_index(op.f('ix_blogs_user_id'), 'blogs', ['user_id'], unique=False)
+
+    op.create_table('ebooks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('author', sa.String(length=100), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('file_path', sa.String(length=500), nullable=False),
+    sa.Column('file_name', sa.String(length=200), nullable=False),
+    sa.Column('file_size', sa.Integer(), nullable=False),
+    sa.Column('file_type', sa.String(length=50), nullable=False),
+    sa.Column('cover_image', sa.String(length=500), nullable=True),
+    sa.Column('tags', sa.String(length=500), nullable=True),
+    sa.Column('reading_progress', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ebooks_id'), 'ebooks', ['id'], unique=False)
+    op.create_index(op.f('ix_ebooks_title'), 'ebooks', ['title'], unique=False)
+    op.create_index(op.f('ix_ebooks_user_id'), 'ebooks', ['user_id'], unique=False)
+
+    op.create_table('files',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('original_name', sa.String(length=500), nullable=False),
+    sa.Column('stored_name', sa.String(length=500), nullable=False),
+    sa.Column('file_path', sa.String(length=1000), nullable=False),
+    sa.Column('file_size', sa.BigInteger(), nullable=False),
+    sa.Column('file_type', sa.String(length=100), nullable=False),
+    sa.Column('file_extension', sa.String(length=20), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('tags', sa.String(length=500), nullable=True),
+    sa.Column('category', sa.String(length=50), nullable=True),
+    sa.Column('is_public', sa.Integer(), nullable=True),
+    sa.Column('download_count', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_files_id'), 'files', ['id'], unique=False)
+    op.create_index(op.f('ix_files_user_id'), 'files', ['user_id'], unique=False)
+
+    op.create_table('problems',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('difficulty', sa.String(length=20), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('solution', sa.Text(), nullable=True),
+    sa.Column('code', sa.Text(), nullable=True),
+    sa.Column('tags', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_problems_date'), 'problems', ['date'], unique=False)
+    op.create_index(op.f('ix_problems_id'), 'problems', ['id'], unique=False)
+    op.create_index(op.f('ix_problems_user_id'), 'problems', ['user_id'], unique=False)
+
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_problems_user_id'), table_name='problems')
+    op.drop_index(op.f('ix_problems_id'), table_name='problems')
+    op.drop_index(op.f('ix_problems_date'), table_name='problems')
+
+    op.drop_table('problems')
+    op.drop_index(op.f('ix_files_user_id'), table_name='files')
+    op.drop_index(op.f('ix_files_id'), table_name='files')
+
+    op.drop_table('files')
+    op.drop_index(op.f('ix_ebooks_user_id'), table_name='ebooks')
+    op.drop_index(op.f('ix_ebooks_title'), table_name='ebooks')
+    op.drop_index(op.f('ix_ebooks_id'), table_name='ebooks')
+
+    op.drop_table('ebooks')
+    op.drop_index(op.f('ix_blogs_user_id'), table_name='blogs')
+    op.drop_index(op.f('ix_blogs_title'), table_name='blogs')
+    op.drop_index(op.f('ix_blogs_id'), table_name='blogs')
+
+    op.drop_table('blogs')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+
+    op.drop_table('users')
+    op.drop_index(op.f('ix_news_title'), table_name='news')
+    op.drop_index(op.f('ix_news_id'), table_name='news')
+    op.drop_index(op.f('ix_news_category'), table_name='news')
+
+    op.drop_table('news')
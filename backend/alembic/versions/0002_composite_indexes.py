@@ -0,0 +1,32 @@
+"""按用户访问路径的复合索引
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_problems_user_date_id', 'problems', ['user_id', 'date', 'id'], unique=False)
+    op.create_index('ix_problems_user_date_created', 'problems', ['user_id', 'date', 'created_at'], unique=False)
+    op.create_index('ix_blogs_user_created', 'blogs', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_ebooks_user_created', 'ebooks', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_files_user_created', 'files', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_files_user_created', table_name='files')
+    op.drop_index('ix_ebooks_user_created', table_name='ebooks')
+    op.drop_index('ix_blogs_user_created', table_name='blogs')
+    op.drop_index('ix_problems_user_date_created', table_name='problems')
+    op.drop_index('ix_problems_user_date_id', table_name='problems')
@@ -0,0 +1,95 @@
+"""全文搜索索引（题目、博客、新闻）
+
+SQLite：FTS5 外部内容表（*_fts）+ 触发器，在插入/更新/删除时同步索引。
+PostgreSQL：tsvector 生成列（search_vector）+ GIN 索引，由数据库在写入时自动维护。
+其他数据库不创建索引。
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 表名 -> (参与索引的列, 按权重从高到低：A/B/C)
+SEARCH_SOURCES = {
+    'problems': (['title', 'tags', 'description', 'solution'], {'A': ['title'], 'B': ['tags'], 'C': ['description', 'solution']}),
+    'blogs': (['title', 'tags', 'summary', 'content'], {'A': ['title'], 'B': ['tags', 'summary'], 'C': ['content']}),
+    'news': (['title', 'tags', 'summary', 'content'], {'A': ['title'], 'B': ['tags', 'summary'], 'C': ['content']}),
+}
+
+
+def _sqlite_upgrade(table: str, columns: list) -> None:
+    fts = f'{table}_fts'
+    cols = ', '.join(columns)
+    new_values = ', '.join(f'new.{c}' for c in columns)
+    old_values = ', '.join(f'old.{c}' for c in columns)
+    op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', content_rowid='id')")
+    op.execute(f"""
+        CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values});
+        END
+    """)
+    # 为已有数据建立索引
+    op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def _sqlite_downgrade(table: str) -> None:
+    fts = f'{table}_fts'
+    for suffix in ('ai', 'ad', 'au'):
+        op.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+    op.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+def _postgresql_upgrade(table: str, weights: dict) -> None:
+    parts = []
+    for weight, columns in weights.items():
+        text = " || ' ' || ".join(f"coalesce({c}, '')" for c in columns)
+        parts.append(f"setweight(to_tsvector('simple', {text}), '{weight}')")
+    op.execute(
+        f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({' || '.join(parts)}) STORED"
+    )
+    op.execute(f'CREATE INDEX ix_{table}_search_vector ON {table} USING GIN (search_vector)')
+
+
+def _postgresql_downgrade(table: str) -> None:
+    op.execute(f'DROP INDEX IF EXISTS ix_{table}_search_vector')
+    op.execute(f'ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector')
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table, (columns, weights) in SEARCH_SOURCES.items():
+        if dialect == 'sqlite':
+            _sqlite_upgrade(table, columns)
+        elif dialect == 'postgresql':
+            _postgresql_upgrade(table, weights)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table in SEARCH_SOURCES:
+        if dialect == 'sqlite':
+            _sqlite_downgrade(table)
+        elif dialect == 'postgresql':
+            _postgresql_downgrade(table)
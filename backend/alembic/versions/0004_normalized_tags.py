@@ -0,0 +1,120 @@
+"""规范化标签存储
+
+新增 tags 表、各资源的标签关联表与用户标签计数表，并从现有的逗号分隔 tags 字段回填。
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from collections import Counter
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 资源类型 -> (资源表, 关联表, 关联表中的资源ID列, 是否属于用户)
+TAGGED_RESOURCES = {
+    'problem': ('problems', 'problem_tags', 'problem_id', True),
+    'blog': ('blogs', 'blog_tags', 'blog_id', True),
+    'ebook': ('ebooks', 'ebook_tags', 'ebook_id', True),
+    'file': ('files', 'file_tags', 'file_id', True),
+    'news': ('news', 'news_tags', 'news_id', False),
+}
+
+BATCH_SIZE = 1000
+
+
+def _parse_tags(value):
+    """与 app.db.tags.parse_tags 一致：去除空白、转为小写、去重并保持顺序"""
+    if not value:
+        return []
+    names = []
+    for part in value.replace('，', ',').split(','):
+        name = part.strip().lower()[:50]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def _backfill(tags_table, count_table) -> None:
+    bind = op.get_bind()
+    tag_ids = {}
+    
+    def tag_id(name):
+        if name not in tag_ids:
+            tag_ids[name] = bind.execute(
+                tags_table.insert().values(name=name).returning(tags_table.c.id)
+            ).scalar_one()
+        return tag_ids[name]
+    
+    for resource, (table, assoc, column, owned) in TAGGED_RESOURCES.items():
+        source = sa.table(table, sa.column('id'), sa.column('tags'), *([sa.column('user_id')] if owned else []))
+        assoc_table = sa.table(assoc, sa.column(column), sa.column('tag_id'))
+        counts = Counter()
+        rows = []
+        result = bind.execute(sa.select(source).where(source.c.tags.isnot(None)))
+        for row in result.mappings():
+            for name in _parse_tags(row['tags']):
+                tid = tag_id(name)
+                rows.append({column: row['id'], 'tag_id': tid})
+                if owned:
+                    counts[(row['user_id'], tid)] += 1
+            if len(rows) >= BATCH_SIZE:
+                bind.execute(assoc_table.insert(), rows)
+                rows = []
+        if rows:
+            bind.execute(assoc_table.insert(), rows)
+        if counts:
+            bind.execute(count_table.insert(), [
+                {'user_id': user_id, 'resource': resource, 'tag_id': tid, 'count': count}
+                for (user_id, tid), count in counts.items()
+            ])
+
+
+def upgrade() -> None:
+    tags_table = op.create_table('tags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tags_id'), 'tags', ['id'], unique=False)
+    op.create_index(op.f('ix_tags_name'), 'tags', ['name'], unique=True)
+    
+    for table, assoc, column, _ in TAGGED_RESOURCES.values():
+        op.create_table(assoc,
+        sa.Column(column, sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint([column], [f'{table}.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint(column, 'tag_id')
+        )
+        op.create_index(f'ix_{assoc}_tag_entity', assoc, ['tag_id', column], unique=False)
+    
+    count_table = op.create_table('user_tag_counts',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('resource', sa.String(length=20), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'resource', 'tag_id')
+    )
+    
+    _backfill(tags_table, count_table)
+
+
+def downgrade() -> None:
+    op.drop_table('user_tag_counts')
+    for _, assoc, _, _ in TAGGED_RESOURCES.values():
+        op.drop_index(f'ix_{assoc}_tag_entity', table_name=assoc)
+        op.drop_table(assoc)
+    op.drop_index(op.f('ix_tags_name'), table_name='tags')
+    op.drop_index(op.f('ix_tags_id'), table_name='tags')
+    op.drop_table('tags')
@@ -0,0 +1,38 @@
+"""题目每日统计汇总表
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('problem_daily_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('difficulty', sa.String(length=20), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'date', 'difficulty')
+    )
+    # 从现有题目回填
+    op.execute(
+        "INSERT INTO problem_daily_stats (user_id, date, difficulty, count) "
+        "SELECT user_id, date, coalesce(difficulty, ''), count(*) FROM problems "
+        "GROUP BY user_id, date, coalesce(difficulty, '')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('problem_daily_stats')
@@ -0,0 +1,45 @@
+"""内容寻址存储：blobs 表与文件/电子书的 content_hash
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    op.create_index('ix_blobs_ref_count', 'blobs', ['ref_count'], unique=False)
+    # 旧数据的 content_hash 为空，仍按原 file_path 读取
+    op.add_column('files', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_files_content_hash'), 'files', ['content_hash'], unique=False)
+    op.add_column('ebooks', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_ebooks_content_hash'), 'ebooks', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ebooks_content_hash'), table_name='ebooks')
+    with op.batch_alter_table('ebooks') as batch_op:
+        batch_op.drop_column('content_hash')
+    op.drop_index(op.f('ix_files_content_hash'), table_name='files')
+    with op.batch_alter_table('files') as batch_op:
+        batch_op.drop_column('content_hash')
+    op.drop_index('ix_blobs_ref_count', table_name='blobs')
+    op.drop_table('blobs')
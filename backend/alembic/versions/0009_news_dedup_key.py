@@ -0,0 +1,77 @@
+"""新闻去重键
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00
+
+"""
+import hashlib
+import re
+from typing import Sequence, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 1000
+_TRACKING_PARAMS = {'spm', 'from', 'ref', 'fbclid', 'gclid', 'share_token'}
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _dedup_key(source_url, title, source):
+    """与 app.db.news.dedup_key 一致"""
+    url = ''
+    if source_url and source_url.strip():
+        parts = urlsplit(source_url.strip())
+        host = (parts.hostname or '').lower()
+        if host.startswith('www.'):
+            host = host[4:]
+        if parts.port and parts.port not in (80, 443):
+            host = f'{host}:{parts.port}'
+        query = urlencode(sorted(
+            (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith('utm_') and key.lower() not in _TRACKING_PARAMS
+        ))
+        url = urlunsplit(('', host, parts.path.rstrip('/'), query, '')).lstrip('/')
+    if url:
+        basis = 'url:' + url
+    else:
+        basis = 'title:' + _WHITESPACE.sub(' ', title).strip().casefold() + '|' + (source or '').strip().casefold()
+    return hashlib.sha256(basis.encode('utf-8')).hexdigest()
+
+
+def upgrade() -> None:
+    op.add_column('news', sa.Column('dedup_key', sa.String(length=64), nullable=True))
+    
+    # 回填现有新闻；已有重复时只有最早的一条获得去重键
+    bind = op.get_bind()
+    news = sa.table('news', sa.column('id'), sa.column('title'), sa.column('source'),
+                    sa.column('source_url'), sa.column('dedup_key'))
+    seen = set()
+    updates = []
+    rows = bind.execute(sa.select(news.c.id, news.c.title, news.c.source, news.c.source_url).order_by(news.c.id))
+    for row in rows.mappings().all():
+        key = _dedup_key(row['source_url'], row['title'], row['source'])
+        if key not in seen:
+            seen.add(key)
+            updates.append({'_id': row['id'], '_key': key})
+    for start in range(0, len(updates), BATCH_SIZE):
+        bind.execute(
+            news.update().where(news.c.id == sa.bindparam('_id')).values(dedup_key=sa.bindparam('_key')),
+            updates[start:start + BATCH_SIZE]
+        )
+    
+    op.create_index(op.f('ix_news_dedup_key'), 'news', ['dedup_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_news_dedup_key'), table_name='news')
+    # 不使用 batch 模式重建表，以免丢失 news 表上的全文索引触发器（SQLite 3.35+ 支持 DROP COLUMN）
+    op.drop_column('news', 'dedup_key')
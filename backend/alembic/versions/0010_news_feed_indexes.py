@@ -0,0 +1,55 @@
+"""新闻列表索引；全文索引更新触发器限定为被索引的列
+
+浏览次数等计数列的批量更新不再触发全文索引的删除与重建（仅 SQLite，PostgreSQL 的生成列不受影响）。
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 与 0003 一致：表名 -> 参与索引的列
+SEARCH_COLUMNS = {
+    'problems': ['title', 'tags', 'description', 'solution'],
+    'blogs': ['title', 'tags', 'summary', 'content'],
+    'news': ['title', 'tags', 'summary', 'content'],
+}
+
+
+def _recreate_update_triggers(only_indexed_columns: bool) -> None:
+    for table, columns in SEARCH_COLUMNS.items():
+        fts = f'{table}_fts'
+        cols = ', '.join(columns)
+        new_values = ', '.join(f'new.{c}' for c in columns)
+        old_values = ', '.join(f'old.{c}' for c in columns)
+        of_columns = f' OF {cols}' if only_indexed_columns else ''
+        op.execute(f'DROP TRIGGER IF EXISTS {fts}_au')
+        op.execute(f"""
+            CREATE TRIGGER {fts}_au AFTER UPDATE{of_columns} ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+                INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values});
+            END
+        """)
+
+
+def upgrade() -> None:
+    op.create_index('ix_news_publish_id', 'news', ['publish_date', 'id'], unique=False)
+    op.create_index('ix_news_category_publish_id', 'news', ['category', 'publish_date', 'id'], unique=False)
+    if op.get_bind().dialect.name == 'sqlite':
+        _recreate_update_triggers(only_indexed_columns=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        _recreate_update_triggers(only_indexed_columns=False)
+    op.drop_index('ix_news_category_publish_id', table_name='news')
+    op.drop_index('ix_news_publish_id', table_name='news')
@@ -2,10 +2,18 @@
 API v1 路由
 """
 from fastapi import APIRouter
-from app.api.v1 import auth, problems
+from app.api.v1 import auth, problems, search, tags, uploads, files, ebooks, images, news, blogs
 
 api_router = APIRouter()
 
 # 注册子路由
 api_router.include_router(auth.router, prefix="/auth", tags=["认证"])
 api_router.include_router(problems.router, prefix="/problems", tags=["题目"])
+api_router.include_router(search.router, prefix="/search", tags=["搜索"])
+api_router.include_router(tags.router, prefix="/tags", tags=["标签"])
+api_router.include_router(uploads.router, prefix="/uploads", tags=["上传"])
+api_router.include_router(files.router, prefix="/files", tags=["文件"])
+api_router.include_router(ebooks.router, prefix="/ebooks", tags=["电子书"])
+api_router.include_router(images.router, prefix="/images", tags=["图片"])
+api_router.include_router(news.router, prefix="/news", tags=["新闻"])
+api_router.include_router(blogs.router, prefix="/blogs", tags=["博客"])
@@ -1,58 +1,123 @@
 """
 认证相关API
 """
+import math
 from datetime import datetime, timedelta
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
 
 from app.core.config import settings
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.models.user import User
+from app.core.user_cache import CurrentUser, user_cache
+from app.core.rsa_keys import key_ring, KEY_SIZE
+from app.core.rate_limit import Bucket, client_ip, login_throttle
 from app.schemas.user import UserCreate, UserResponse, Token, UserLogin, UserLoginEncrypted
 from app.core.security import (
-    verify_password, 
-    get_password_hash, 
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
-    get_public_key_pem,
-    decrypt_password
+    decrypt_password_async,
+    PasswordHasherBusyError
 )
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-def get_current_user(
+def _hasher_busy_exception() -> HTTPException:
+    """密码哈希进程池饱和时返回的503异常"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="服务繁忙，请稍后重试",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def _check_login_throttle(request: Request, username: str) -> List[Bucket]:
+    """登录限流（在解密与校验密码之前），超出限制时返回429"""
+    peer = request.client.host if request.client else None
+    buckets = login_throttle.buckets(username, client_ip(peer, request.headers.get("x-forwarded-for")))
+    retry_after = await login_throttle.acquire(buckets)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="登录尝试过于频繁，请稍后重试",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+    return buckets
+
+
+async def _authenticate(db: AsyncSession, username: str, password: str, buckets: List[Bucket]) -> dict:
+    """校验用户名与密码并签发令牌（登录成功或未能校验密码时归还限流令牌）"""
+    user = await db.scalar(select(User).where(User.username == username))
+    try:
+        valid = user is not None and await verify_password_async(password, user.hashed_password)
+    except PasswordHasherBusyError:
+        # 哈希进程池饱和时密码未被校验，不计为一次失败的尝试
+        await login_throttle.refund(buckets)
+        raise _hasher_busy_exception()
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="用户名或密码错误",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    await login_throttle.refund(buckets)
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="用户账户已被禁用"
+        )
+    
+    access_token = create_access_token(data={"sub": user.username})
+    return {"access_token": access_token, "token_type": "bearer"}
+
+
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """获取当前用户"""
+    db: AsyncSession = Depends(get_async_db)
+) -> CurrentUser:
+    """获取当前用户（优先读取已认证用户缓存）"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="无法验证凭据",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+    current_user = user_cache.get(token)
+    if current_user is None:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            username: str = payload.get("sub")
+            if username is None:
+                raise credentials_exception
+        except JWTError:
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+        
+        user = await db.scalar(select(User).where(User.username == username))
+        if user is None:
+            raise credentials_exception
+        current_user = CurrentUser(id=user.id, username=user.username, is_active=user.is_active)
+        user_cache.set(token, current_user, expires_at=payload.get("exp"))
     
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    return user
+    if not current_user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="用户账户已被禁用"
+        )
+    return current_user
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """用户注册"""
     # 检查用户名是否已存在
-    db_user = db.query(User).filter(User.username == user_data.username).first()
+    db_user = await db.scalar(select(User).where(User.username == user_data.username))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -61,7 +126,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     
     # 检查邮箱是否已存在
     if user_data.email:
-        db_user = db.query(User).filter(User.email == user_data.email).first()
+        db_user = await db.scalar(select(User).where(User.email == user_data.email))
         if db_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -69,105 +134,82 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
             )
     
     # 创建新用户
-    hashed_password = get_password_hash(user_data.password)
+    try:
+        hashed_password = await get_password_hash_async(user_data.password)
+    except PasswordHasherBusyError:
+        raise _hasher_busy_exception()
     db_user = User(
         username=user_data.username,
         email=user_data.email,
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
 
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
     """用户登录"""
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="用户名或密码错误",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="用户账户已被禁用"
-        )
-    
-    access_token = create_access_token(data={"sub": user.username})
-    return {"access_token": access_token, "token_type": "bearer"}
+    buckets = await _check_login_throttle(request, form_data.username)
+    return await _authenticate(db, form_data.username, form_data.password, buckets)
 
 
 @router.post("/login-json", response_model=Token)
-async def login_json(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login_json(request: Request, user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """用户登录（JSON格式）"""
-    user = db.query(User).filter(User.username == user_data.username).first()
-    if not user or not verify_password(user_data.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="用户名或密码错误",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="用户账户已被禁用"
-        )
-    
-    access_token = create_access_token(data={"sub": user.username})
-    return {"access_token": access_token, "token_type": "bearer"}
+    buckets = await _check_login_throttle(request, user_data.username)
+    return await _authenticate(db, user_data.username, user_data.password, buckets)
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """获取当前用户信息"""
-    return current_user
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="无法验证凭据",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
 
 
 @router.get("/public-key")
 async def get_public_key():
-    """获取RSA公钥（用于前端加密密码）"""
-    public_key_pem = get_public_key_pem()
+    """获取RSA公钥（用于前端加密密码）
+    
+    登录时可将 key_id 随密文一并提交；密钥轮换后旧公钥在重叠期内仍可使用。
+    """
+    key = key_ring.current()
     return {
-        "public_key": public_key_pem,
+        "public_key": key.public_pem,
+        "key_id": key.kid,
         "algorithm": "RSA-OAEP",
-        "key_size": 2048
+        "key_size": KEY_SIZE
     }
 
 
 @router.post("/login-encrypted", response_model=Token)
-async def login_encrypted(user_data: UserLoginEncrypted, db: Session = Depends(get_db)):
+async def login_encrypted(request: Request, user_data: UserLoginEncrypted, db: AsyncSession = Depends(get_async_db)):
     """用户登录（加密密码）"""
+    buckets = await _check_login_throttle(request, user_data.username)
     try:
         # 解密密码
-        decrypted_password = decrypt_password(user_data.encrypted_password)
+        decrypted_password = await decrypt_password_async(user_data.encrypted_password, user_data.key_id)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"密码解密失败: {str(e)}"
         )
     
-    # 验证用户
-    user = db.query(User).filter(User.username == user_data.username).first()
-    if not user or not verify_password(decrypted_password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="用户名或密码错误",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="用户账户已被禁用"
-        )
-    
-    access_token = create_access_token(data={"sub": user.username})
-    return {"access_token": access_token, "token_type": "bearer"}
-
+    return await _authenticate(db, user_data.username, decrypted_password, buckets)
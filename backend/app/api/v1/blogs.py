@@ -0,0 +1,188 @@
+"""
+博客相关API
+"""
+import asyncio
+import hashlib
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import String, cast, literal, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.markdown import render_markdown, rendered_cache
+from app.core.metrics import timed
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.user_cache import CurrentUser
+from app.db.counters import blog_view_counts
+from app.db.database import get_async_db
+from app.db.tags import add_tags_bulk, set_tags, tagged_with
+from app.models.blog import Blog
+from app.schemas.blog import BlogCreate, BlogUpdate, BlogResponse, BlogListItem, BlogDetail
+from app.api.v1.auth import get_current_user
+
+router = APIRouter()
+
+# 列表只查询这些列，不加载正文
+LIST_COLUMNS = (
+    Blog.id, Blog.user_id, Blog.title, Blog.summary, Blog.cover_image, Blog.tags,
+    Blog.category, Blog.is_published, Blog.view_count, Blog.created_at, Blog.updated_at,
+)
+
+
+def _created_at_bound(db: AsyncSession, value: str):
+    """游标中 created_at 的比较值
+
+    游标保存数据库中 created_at 的原始文本：SQLite 以文本存储时间，必须按原始文本比较
+    （重新格式化后的时间与存储的文本长度不同，相等的时间会被误判）；其他数据库转换回时间类型。
+    """
+    if db.bind.dialect.name == "sqlite":
+        return literal(value, String)
+    return cast(literal(value, String), Blog.created_at.type)
+
+
+def _render_key(blog: Blog) -> tuple:
+    return (blog.id, hashlib.sha1(blog.content.encode("utf-8")).hexdigest())
+
+
+async def _get_owned_blog(db: AsyncSession, blog_id: int, user_id: int) -> Blog:
+    blog = await db.scalar(select(Blog).where(Blog.id == blog_id, Blog.user_id == user_id))
+    if not blog:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="博客不存在"
+        )
+    return blog
+
+
+@router.post("", response_model=BlogResponse, status_code=status.HTTP_201_CREATED)
+async def create_blog(
+    blog_data: BlogCreate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """创建博客（正文为 Markdown）"""
+    blog = Blog(**blog_data.dict(), user_id=current_user.id, view_count=0)
+    db.add(blog)
+    await db.flush()
+    await add_tags_bulk(db, "blog", current_user.id, [(blog.id, blog.tags)])
+    await db.commit()
+    await db.refresh(blog)
+    return blog
+
+
+@router.get("", response_model=List[BlogListItem])
+async def get_blogs(
+    response: Response,
+    mine: bool = False,
+    category: Optional[str] = None,
+    tag: Optional[List[str]] = Query(None),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """获取博客列表（不含正文）
+
+    默认返回所有已发布的博客；mine=true 时返回自己的博客（含草稿）。
+    按 (created_at, id) 降序游标分页，下一页游标通过响应头 X-Next-Cursor 返回（没有更多数据时不返回）。
+    """
+    created_at_key = cast(Blog.created_at, String).label("created_at_key")
+    query = select(*LIST_COLUMNS, created_at_key)
+    if mine:
+        query = query.where(Blog.user_id == current_user.id)
+    else:
+        query = query.where(Blog.is_published.is_(True))
+    if category:
+        query = query.where(Blog.category == category)
+    if tag:
+        query = query.where(Blog.id.in_(tagged_with("blog", tag)))
+
+    if cursor:
+        try:
+            cursor_created, cursor_id = decode_cursor(cursor, 2)
+            cursor_created, cursor_id = str(cursor_created), int(cursor_id)
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="无效的游标"
+            )
+        query = query.where(
+            tuple_(Blog.created_at, Blog.id) < tuple_(_created_at_bound(db, cursor_created), cursor_id)
+        )
+
+    query = query.order_by(Blog.created_at.desc(), Blog.id.desc()).limit(limit)
+    rows = (await db.execute(query)).all()
+    if len(rows) == limit:
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at_key, last.id)
+    return [BlogListItem.model_validate(row) for row in rows]
+
+
+@router.get("/{blog_id}", response_model=BlogDetail)
+async def get_blog(
+    blog_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """获取单个博客（已发布的或自己的），content_html 为渲染后的正文
+
+    浏览次数在进程内累加后批量写入，返回的 view_count 可能略有滞后。
+    """
+    blog = await db.scalar(select(Blog).where(
+        Blog.id == blog_id,
+        or_(Blog.is_published.is_(True), Blog.user_id == current_user.id)
+    ))
+
+    if not blog:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="博客不存在"
+        )
+
+    key = _render_key(blog)
+    html = rendered_cache.get(key)
+    if html is None:
+        with timed("markdown"):
+            html = await asyncio.to_thread(render_markdown, blog.content)
+        rendered_cache.set(key, html)
+    if blog.user_id != current_user.id:
+        blog_view_counts.incr(blog.id)
+    return BlogDetail(**BlogResponse.model_validate(blog).model_dump(), content_html=html)
+
+
+@router.put("/{blog_id}", response_model=BlogResponse)
+async def update_blog(
+    blog_id: int,
+    blog_data: BlogUpdate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """更新博客"""
+    blog = await _get_owned_blog(db, blog_id, current_user.id)
+    # 旧正文的渲染结果不会再命中，及时释放
+    rendered_cache.pop(_render_key(blog))
+
+    update_data = blog_data.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(blog, field, value)
+    if "tags" in update_data:
+        await set_tags(db, "blog", blog.id, current_user.id, blog.tags)
+
+    await db.commit()
+    await db.refresh(blog)
+    return blog
+
+
+@router.delete("/{blog_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_blog(
+    blog_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """删除博客"""
+    blog = await _get_owned_blog(db, blog_id, current_user.id)
+    rendered_cache.pop(_render_key(blog))
+    await set_tags(db, "blog", blog.id, current_user.id, None)
+    await db.delete(blog)
+    await db.commit()
+    return None
@@ -0,0 +1,48 @@
+"""
+电子书相关API
+"""
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import storage
+from app.core.responses import file_download_response
+from app.core.user_cache import CurrentUser
+from app.db.database import get_async_db
+from app.models.ebook import Ebook
+from app.api.v1.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.api_route("/{ebook_id}/download", methods=["GET", "HEAD"])
+async def download_ebook(
+    ebook_id: int,
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """下载电子书文件（支持 Range 分段读取与 ETag 条件请求，便于阅读器按需加载）"""
+    ebook = await db.scalar(select(Ebook).where(
+        Ebook.id == ebook_id,
+        Ebook.user_id == current_user.id
+    ))
+    
+    if not ebook:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="电子书不存在"
+        )
+    
+    response = file_download_response(
+        request,
+        storage.resolve_path(ebook.file_path),
+        ebook.content_hash,
+        filename=ebook.file_name
+    )
+    if response.status_code == status.HTTP_404_NOT_FOUND:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="电子书文件不存在"
+        )
+    return response
@@ -0,0 +1,59 @@
+"""
+文件相关API
+"""
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import storage
+from app.core.responses import file_download_response
+from app.core.user_cache import CurrentUser
+from app.db.counters import download_counts
+from app.db.database import get_async_db
+from app.models.file import File
+from app.api.v1.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.api_route("/{file_id}/download", methods=["GET", "HEAD"])
+async def download_file(
+    file_id: int,
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """下载文件（自己的或公开的）
+    
+    支持 Range 断点续传、ETag 与 If-None-Match / If-Range 条件请求。
+    下载次数在完整下载或从头开始的范围请求时累加，并由后台任务批量写入。
+    """
+    file = await db.scalar(select(File).where(
+        File.id == file_id,
+        or_(File.user_id == current_user.id, File.is_public == 1)
+    ))
+    
+    if not file:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="文件不存在"
+        )
+    
+    response = file_download_response(
+        request,
+        storage.resolve_path(file.file_path),
+        file.content_hash,
+        media_type=file.file_type,
+        filename=file.original_name
+    )
+    if response.status_code == status.HTTP_404_NOT_FOUND:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="文件内容不存在"
+        )
+    if request.method == "GET" and (
+        response.status_code == status.HTTP_200_OK
+        or (response.status_code == status.HTTP_206_PARTIAL_CONTENT and response.offset == 0)
+    ):
+        download_counts.incr(file.id)
+    return response
@@ -0,0 +1,45 @@
+"""
+衍生图片API（缩略图、电子书封面）
+"""
+import re
+
+from fastapi import APIRouter, HTTPException, Request, status
+
+from app.core import images, storage
+from app.core.responses import file_download_response
+
+router = APIRouter()
+
+_CONTENT_HASH = re.compile(r"^[0-9a-f]{64}$")
+_VARIANT = re.compile(r"^(\d+)\.(" + "|".join(images.VARIANT_FORMATS) + r")$")
+
+# 衍生图片按内容哈希寻址，内容永不变化，可长期缓存
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.api_route("/{content_hash}/{variant}", methods=["GET", "HEAD"])
+async def get_image(content_hash: str, variant: str, request: Request):
+    """获取衍生图片，variant 形如 320.webp 或 320.jpg
+    
+    地址由源文件内容的 SHA-256 构成，无需认证即可在 <img> 中直接引用；
+    图片尚未生成时返回 404。
+    """
+    if not _CONTENT_HASH.match(content_hash) or not _VARIANT.match(variant):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="图片不存在"
+        )
+    
+    path = storage.resolve_path(f"{storage.derived_dir(content_hash)}/{variant}")
+    response = file_download_response(
+        request,
+        path,
+        f"{content_hash}-{variant}",
+        cache_control=IMMUTABLE_CACHE_CONTROL
+    )
+    if response.status_code == status.HTTP_404_NOT_FOUND:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="图片不存在"
+        )
+    return response
@@ -0,0 +1,170 @@
+"""
+新闻相关API
+"""
+import secrets
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+
+from app.core.bulk import iter_bulk_rows, aenumerate, format_validation_error
+from app.core.config import settings
+from app.core.news_cache import news_cache, make_cached_body
+from app.core.responses import conditional_response
+from app.db.counters import news_view_counts
+from app.db.database import get_async_db, AsyncSessionLocal
+from app.db.news import ingest_news
+from app.db.tags import parse_tags, tagged_with
+from app.models.news import News
+from app.schemas.news import (
+    NewsCreate,
+    NewsResponse,
+    NewsListItem,
+    NewsCategory,
+    NewsIngestError,
+    NewsIngestResult
+)
+
+router = APIRouter()
+
+_news_list_adapter = TypeAdapter(List[NewsListItem])
+_categories_adapter = TypeAdapter(List[NewsCategory])
+
+
+def _cache_control() -> str:
+    return f"public, max-age={settings.NEWS_HTTP_MAX_AGE}"
+
+
+@router.get("", response_model=List[NewsListItem])
+async def get_news_list(
+    request: Request,
+    category: Optional[str] = None,
+    featured: Optional[bool] = None,
+    tag: Optional[List[str]] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """获取新闻列表（公开，按发布时间倒序，不含正文）
+    
+    可传入多个 tag 参数，仅返回同时带有这些标签的新闻。
+    各分类的前 NEWS_CACHE_MAX_PAGES 页缓存在服务端，响应带 ETag 与 Cache-Control，
+    客户端可通过 If-None-Match 获得 304。
+    """
+    # 仅在缓存未命中时才打开数据库会话
+    async def build() -> bytes:
+        query = select(News).options(defer(News.content))
+        if category is not None:
+            query = query.where(News.category == category)
+        if featured is not None:
+            query = query.where(News.is_featured == int(featured))
+        if tag:
+            query = query.where(News.id.in_(tagged_with("news", tag)))
+        query = query.order_by(News.publish_date.desc().nulls_last(), News.id.desc()).offset(skip).limit(limit)
+        async with AsyncSessionLocal() as db:
+            news = (await db.scalars(query)).all()
+            return _news_list_adapter.dump_json([NewsListItem.model_validate(n) for n in news])
+    
+    if skip < limit * settings.NEWS_CACHE_MAX_PAGES:
+        # 标签按规范化后的集合作为缓存键，参数顺序与大小写不同的请求共用缓存
+        tags = tuple(sorted(parse_tags(",".join(tag)))) if tag else None
+        entry = await news_cache.get_or_build(("list", category, featured, tags, skip, limit), build)
+    else:
+        entry = make_cached_body(await build())
+    return conditional_response(request, entry.body, entry.etag, _cache_control())
+
+
+@router.get("/categories", response_model=List[NewsCategory])
+async def get_news_categories(request: Request):
+    """获取新闻分类及各分类的新闻数量（公开）"""
+    async def build() -> bytes:
+        async with AsyncSessionLocal() as db:
+            rows = await db.execute(
+                select(News.category, func.count())
+                .where(News.category.isnot(None))
+                .group_by(News.category)
+                .order_by(func.count().desc(), News.category)
+            )
+            return _categories_adapter.dump_json([NewsCategory(name=name, count=count) for name, count in rows.all()])
+    
+    entry = await news_cache.get_or_build(("categories",), build)
+    return conditional_response(request, entry.body, entry.etag, _cache_control())
+
+
+def verify_ingest_token(x_ingest_token: Optional[str] = Header(None)):
+    """校验爬虫推送令牌"""
+    if not settings.NEWS_INGEST_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="新闻推送接口未启用"
+        )
+    if not x_ingest_token or not secrets.compare_digest(x_ingest_token, settings.NEWS_INGEST_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="推送令牌无效"
+        )
+
+
+@router.post("/ingest", response_model=NewsIngestResult, dependencies=[Depends(verify_ingest_token)])
+async def ingest(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """爬虫批量推送新闻
+    
+    请求体为 NewsCreate 的JSON数组，或 JSON Lines（Content-Type: application/x-ndjson），
+    请求头 X-Ingest-Token 需与 NEWS_INGEST_TOKEN 一致；请求体超过 NEWS_INGEST_MAX_BODY_BYTES 时返回413
+    （在写入数据库之前），JSON Lines 中超过 BULK_MAX_LINE_BYTES 的行按该条的错误报告。
+    按规范化的 source_url（无链接时为标题 + 来源）去重，在一个事务中批量插入或更新；
+    不合法的条目在 errors 中按序号报告。
+    """
+    items: List[dict] = []
+    errors: List[NewsIngestError] = []
+    async for index, row in aenumerate(iter_bulk_rows(request, settings.NEWS_INGEST_MAX_BODY_BYTES)):
+        if index >= settings.NEWS_INGEST_MAX_ITEMS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"单次最多推送 {settings.NEWS_INGEST_MAX_ITEMS} 条新闻"
+            )
+        if isinstance(row, Exception):
+            errors.append(NewsIngestError(index=index, error=f"JSON解析失败: {row}"))
+            continue
+        try:
+            items.append(NewsCreate.model_validate(row).dict())
+        except ValidationError as e:
+            errors.append(NewsIngestError(index=index, error=format_validation_error(e)))
+    
+    counts = await ingest_news(db, items)
+    await db.commit()
+    if counts.inserted or counts.updated:
+        news_cache.invalidate()
+    return NewsIngestResult(
+        inserted=counts.inserted,
+        updated=counts.updated,
+        skipped=counts.skipped,
+        failed=len(errors),
+        errors=errors
+    )
+
+
+@router.get("/{news_id}", response_model=NewsResponse)
+async def get_news(news_id: int, request: Request):
+    """获取单个新闻（公开）
+    
+    浏览次数在进程内累加，由后台任务定期批量写入，因此返回的 view_count 可能略有滞后。
+    """
+    async def build() -> bytes:
+        async with AsyncSessionLocal() as db:
+            news = await db.get(News, news_id)
+            if news is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="新闻不存在"
+                )
+            return NewsResponse.model_validate(news).model_dump_json().encode()
+    
+    entry = await news_cache.get_or_build(("item", news_id), build)
+    news_view_counts.incr(news_id)
+    return conditional_response(request, entry.body, entry.etag, _cache_control())
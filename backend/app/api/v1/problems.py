@@ -1,25 +1,106 @@
 """
 题目相关API
 """
-from typing import List, Optional
+from collections import Counter
+from typing import List, Literal, Optional
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import get_db
-from app.models.user import User
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.db.database import get_async_db, get_read_db, read_session
+from app.db.tags import add_tags_bulk, set_tags, tagged_with
+from app.db.stats import adjust_problem_stats, get_problem_stats, stat_key
+from app.core.user_cache import CurrentUser
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.bulk import BulkBodyTooLarge, iter_bulk_rows, aenumerate, format_validation_error
 from app.models.problem import Problem
-from app.schemas.problem import ProblemCreate, ProblemUpdate, ProblemResponse
+from app.schemas.problem import (
+    ProblemCreate,
+    ProblemUpdate,
+    ProblemResponse,
+    ProblemBulkError,
+    ProblemBulkResult,
+    ProblemStats
+)
 from app.api.v1.auth import get_current_user
 
 router = APIRouter()
 
+# 批量导入每批写入的行数、单次请求允许的最大行数
+BULK_BATCH_SIZE = 500
+BULK_MAX_ROWS = 10000
+# 流式响应时每次从数据库读取并序列化的行数
+STREAM_YIELD_PER = 500
+
+# 流式响应格式：ndjson（每行一个对象）或 json（分块输出的JSON数组）
+StreamFormat = Literal["ndjson", "json"]
+
+# 快速序列化时按 ProblemResponse 的字段顺序查询的列
+RESPONSE_COLUMNS = [getattr(Problem, name) for name in ProblemResponse.model_fields]
+
+
+async def _fetch_problems(db: AsyncSession, query) -> list:
+    """执行题目列表查询
+    
+    开启 FAST_JSON_RESPONSES 时只查询响应字段对应的列并返回 dict 列表：数据库中的行已满足
+    ProblemResponse 的约束，不再构造 ORM 对象，也不再经 Pydantic 校验与转换。
+    """
+    if settings.FAST_JSON_RESPONSES:
+        result = await db.execute(query.with_only_columns(*RESPONSE_COLUMNS))
+        return [row._asdict() for row in result]
+    return (await db.scalars(query)).all()
+
+
+def _list_response(problems: list, response: Response):
+    """dict 列表直接以 FastJSONResponse 返回（跳过 response_model），ORM 对象交给 FastAPI 处理"""
+    if not settings.FAST_JSON_RESPONSES:
+        return problems
+    # 直接返回 Response 时 FastAPI 不再合并注入的 response 上设置的响应头
+    return FastJSONResponse(problems, headers=response.headers)
+
+
+def _stream_problems(query, fmt: StreamFormat, headers: Optional[dict] = None) -> StreamingResponse:
+    """以流式响应返回查询结果
+    
+    使用独立的只读会话按 STREAM_YIELD_PER 行分批读取并逐批序列化，
+    单个请求占用的内存与结果总行数无关。
+    """
+    query = query.execution_options(yield_per=STREAM_YIELD_PER)
+    
+    async def generate():
+        async with read_session() as session:
+            result = await session.stream_scalars(query)
+            first = True
+            if fmt == "json":
+                yield "["
+            async for partition in result.partitions():
+                rows = []
+                for problem in partition:
+                    rows.append(ProblemResponse.model_validate(problem).model_dump_json())
+                    # 已序列化的对象不再需要，避免会话的标识映射随行数增长
+                    session.expunge(problem)
+                if fmt == "json":
+                    yield ("" if first else ",") + ",".join(rows)
+                else:
+                    yield "\n".join(rows) + "\n"
+                first = False
+            if fmt == "json":
+                yield "]"
+    
+    media_type = "application/json" if fmt == "json" else "application/x-ndjson"
+    return StreamingResponse(generate(), media_type=media_type, headers=headers)
+
 
 @router.post("", response_model=ProblemResponse, status_code=status.HTTP_201_CREATED)
 async def create_problem(
     problem_data: ProblemCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """创建题目"""
     db_problem = Problem(
@@ -27,43 +108,182 @@ async def create_problem(
         user_id=current_user.id
     )
     db.add(db_problem)
-    db.commit()
-    db.refresh(db_problem)
+    await db.flush()
+    await add_tags_bulk(db, "problem", current_user.id, [(db_problem.id, db_problem.tags)])
+    await adjust_problem_stats(db, current_user.id, Counter([stat_key(db_problem.date, db_problem.difficulty)]))
+    await db.commit()
+    await db.refresh(db_problem)
     return db_problem
 
 
 @router.get("", response_model=List[ProblemResponse])
 async def get_problems(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    tag: Optional[List[str]] = Query(None),
+    cursor: Optional[str] = None,
+    use_cursor: bool = False,
+    stream: Optional[StreamFormat] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """获取题目列表"""
-    query = db.query(Problem).filter(Problem.user_id == current_user.id)
+    """获取题目列表
+    
+    默认使用 skip/limit 偏移分页；传入 use_cursor=true 或 cursor 时使用游标分页，
+    下一页游标通过响应头 X-Next-Cursor 返回（没有更多数据时不返回）。
+    传入 stream=ndjson|json 时以流式响应逐批序列化返回（流式模式下不返回 X-Next-Cursor）。
+    可传入多个 tag 参数，仅返回同时带有这些标签的题目。
+    """
+    query = select(Problem).where(Problem.user_id == current_user.id)
     
     if date_from:
-        query = query.filter(Problem.date >= date_from)
+        query = query.where(Problem.date >= date_from)
     if date_to:
-        query = query.filter(Problem.date <= date_to)
+        query = query.where(Problem.date <= date_to)
+    if tag:
+        query = query.where(Problem.id.in_(tagged_with("problem", tag)))
+    
+    if not (use_cursor or cursor):
+        query = query.order_by(Problem.date.desc()).offset(skip).limit(limit)
+        if stream:
+            return _stream_problems(query, stream)
+        return _list_response(await _fetch_problems(db, query), response)
     
-    problems = query.order_by(Problem.date.desc()).offset(skip).limit(limit).all()
-    return problems
+    # 游标分页：按 (date, id) 降序，从上一页最后一条记录之后继续
+    if cursor:
+        try:
+            cursor_date, cursor_id = decode_cursor(cursor, 2)
+            cursor_date, cursor_id = date.fromisoformat(cursor_date), int(cursor_id)
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="无效的游标"
+            )
+        query = query.where(tuple_(Problem.date, Problem.id) < tuple_(cursor_date, cursor_id))
+    
+    query = query.order_by(Problem.date.desc(), Problem.id.desc()).limit(limit)
+    if stream:
+        return _stream_problems(query, stream)
+    problems = await _fetch_problems(db, query)
+    if len(problems) == limit and problems:
+        last = problems[-1]
+        if isinstance(last, dict):
+            response.headers["X-Next-Cursor"] = encode_cursor(last["date"], last["id"])
+        else:
+            response.headers["X-Next-Cursor"] = encode_cursor(last.date, last.id)
+    return _list_response(problems, response)
+
+
+@router.post("/bulk", response_model=ProblemBulkResult)
+async def bulk_create_problems(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """批量导入题目
+    
+    请求体为 ProblemCreate 的JSON数组，或 JSON Lines（Content-Type: application/x-ndjson）。
+    合法的行按批次（executemany）写入，每批一个事务；不合法的行在 errors 中按行号报告。
+    最多处理 BULK_MAX_ROWS 行，之后的行不再读取也不导入，此时 truncated 为 true；
+    请求体超过 BULK_MAX_BODY_BYTES 时返回413（JSON Lines 在已有批次提交后超限时同样按 truncated 返回）。
+    """
+    result = ProblemBulkResult(inserted=0, failed=0)
+    batch: List[dict] = []
+    
+    async def flush():
+        if batch:
+            ids = await db.scalars(
+                insert(Problem).returning(Problem.id, sort_by_parameter_order=True), batch
+            )
+            await add_tags_bulk(db, "problem", current_user.id, [
+                (problem_id, row["tags"]) for problem_id, row in zip(ids.all(), batch)
+            ])
+            await adjust_problem_stats(db, current_user.id, Counter(
+                stat_key(row["date"], row["difficulty"]) for row in batch
+            ))
+            await db.commit()
+            result.inserted += len(batch)
+            batch.clear()
+    
+    try:
+        async for index, row in aenumerate(iter_bulk_rows(request)):
+            # 之前的批次已经提交，超出上限时不能再返回错误，只停止导入
+            if index >= BULK_MAX_ROWS:
+                result.truncated = True
+                break
+            if isinstance(row, Exception):
+                error = f"JSON解析失败: {row}"
+            else:
+                try:
+                    problem_data = ProblemCreate.model_validate(row)
+                except ValidationError as e:
+                    error = format_validation_error(e)
+                else:
+                    batch.append({**problem_data.dict(), "user_id": current_user.id})
+                    if len(batch) >= BULK_BATCH_SIZE:
+                        await flush()
+                    continue
+            result.failed += 1
+            result.errors.append(ProblemBulkError(index=index, error=error))
+    except BulkBodyTooLarge:
+        # JSON Lines 读到一半超出大小上限：已有批次提交时同样只停止导入，否则直接返回413
+        if not result.inserted:
+            raise
+        result.truncated = True
+    
+    await flush()
+    return result
+
+
+@router.get("/export")
+async def export_problems(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """流式导出题目（JSON Lines，每行一个 ProblemResponse）"""
+    query = select(Problem).where(Problem.user_id == current_user.id)
+    if date_from:
+        query = query.where(Problem.date >= date_from)
+    if date_to:
+        query = query.where(Problem.date <= date_to)
+    query = query.order_by(Problem.date.desc(), Problem.id.desc())
+    
+    return _stream_problems(
+        query,
+        "ndjson",
+        headers={"Content-Disposition": 'attachment; filename="problems.jsonl"'}
+    )
+
+
+@router.get("/stats", response_model=ProblemStats)
+async def get_problems_stats(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """获取题目统计（总数、按难度、按标签、每日日历与连续练习天数）
+    
+    数据来自增量维护的汇总表；date_from/date_to 仅限制返回的日历范围。
+    """
+    return await get_problem_stats(db, current_user.id, date_from, date_to)
 
 
 @router.get("/{problem_id}", response_model=ProblemResponse)
 async def get_problem(
     problem_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取单个题目"""
-    problem = db.query(Problem).filter(
+    problem = await db.scalar(select(Problem).where(
         Problem.id == problem_id,
         Problem.user_id == current_user.id
-    ).first()
+    ))
     
     if not problem:
         raise HTTPException(
@@ -78,14 +298,14 @@ async def get_problem(
 async def update_problem(
     problem_id: int,
     problem_data: ProblemUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """更新题目"""
-    problem = db.query(Problem).filter(
+    problem = await db.scalar(select(Problem).where(
         Problem.id == problem_id,
         Problem.user_id == current_user.id
-    ).first()
+    ))
     
     if not problem:
         raise HTTPException(
@@ -94,26 +314,32 @@ async def update_problem(
         )
     
     # 更新字段
+    previous_key = stat_key(problem.date, problem.difficulty)
     update_data = problem_data.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(problem, field, value)
+    if "tags" in update_data:
+        await set_tags(db, "problem", problem.id, current_user.id, problem.tags)
+    current_key = stat_key(problem.date, problem.difficulty)
+    if current_key != previous_key:
+        await adjust_problem_stats(db, current_user.id, Counter({current_key: 1, previous_key: -1}))
     
-    db.commit()
-    db.refresh(problem)
+    await db.commit()
+    await db.refresh(problem)
     return problem
 
 
 @router.delete("/{problem_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_problem(
     problem_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """删除题目"""
-    problem = db.query(Problem).filter(
+    problem = await db.scalar(select(Problem).where(
         Problem.id == problem_id,
         Problem.user_id == current_user.id
-    ).first()
+    ))
     
     if not problem:
         raise HTTPException(
@@ -121,23 +347,28 @@ async def delete_problem(
             detail="题目不存在"
         )
     
-    db.delete(problem)
-    db.commit()
+    await set_tags(db, "problem", problem.id, current_user.id, None)
+    await adjust_problem_stats(db, current_user.id, Counter({stat_key(problem.date, problem.difficulty): -1}))
+    await db.delete(problem)
+    await db.commit()
     return None
 
 
 @router.get("/date/{problem_date}", response_model=List[ProblemResponse])
 async def get_problems_by_date(
+    response: Response,
     problem_date: date,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    stream: Optional[StreamFormat] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """根据日期获取题目列表"""
-    problems = db.query(Problem).filter(
+    """根据日期获取题目列表（传入 stream=ndjson|json 时以流式响应返回）"""
+    query = select(Problem).where(
         Problem.user_id == current_user.id,
         Problem.date == problem_date
-    ).order_by(Problem.created_at.desc()).all()
+    ).order_by(Problem.created_at.desc())
     
-    return problems
-
+    if stream:
+        return _stream_problems(query, stream)
+    return _list_response(await _fetch_problems(db, query), response)
 
@@ -0,0 +1,37 @@
+"""
+全文搜索API
+"""
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_async_db
+from app.db.search import search, SearchUnavailableError
+from app.core.user_cache import CurrentUser
+from app.schemas.search import SearchResult, SearchType
+from app.api.v1.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get("", response_model=List[SearchResult])
+async def search_documents(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[List[SearchType]] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """全文搜索题目、博客和新闻
+    
+    结果按相关度排序；可通过多个 type 参数限定搜索范围。
+    题目仅搜索当前用户的，博客搜索当前用户的及已发布的，新闻为公开内容。
+    """
+    try:
+        return await search(db, q, current_user.id, types=type, skip=skip, limit=limit)
+    except SearchUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=str(e)
+        )
@@ -0,0 +1,25 @@
+"""
+标签相关API
+"""
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_async_db
+from app.db.tags import get_user_tag_counts
+from app.core.user_cache import CurrentUser
+from app.schemas.tag import TagCount, TagResource
+from app.api.v1.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get("", response_model=List[TagCount])
+async def get_tag_counts(
+    resource: TagResource = "problem",
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """获取当前用户某类资源的标签计数（预汇总，按数量降序）"""
+    return await get_user_tag_counts(db, current_user.id, resource, limit)
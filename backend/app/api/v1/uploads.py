@@ -0,0 +1,310 @@
+"""
+分块上传API（可续传）
+
+流程：
+1. POST /uploads 创建上传会话，声明文件名、类型与大小
+2. PUT /uploads/{upload_id}?offset=N 以原始字节流上传一个分块，offset 必须等于已接收的字节数；
+   连接中断后通过 GET /uploads/{upload_id} 查询 received，从该偏移量继续上传
+3. POST /uploads/{upload_id}/complete 校验大小后存入内容寻址存储（相同内容只保存一份），
+   并创建文件或电子书记录
+
+upload_lock 只在进程内互斥；完成与取消以数据库中的条件更新（status 仍为 pending）认领会话，
+多个 worker 同时完成同一上传时只有一个成功，其余返回409。
+"""
+import os
+import uuid
+from typing import Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import storage
+from app.core.config import settings
+from app.core.user_cache import CurrentUser
+from app.db.database import get_async_db
+from app.db.blobs import acquire_blob
+from app.db.image_jobs import enqueue_image_job, notify_image_worker
+from app.db.tags import add_tags_bulk, set_tags
+from app.models.ebook import Ebook
+from app.models.file import File
+from app.models.image_job import ImageJob
+from app.models.upload import UploadSession
+from app.schemas.ebook import EbookResponse
+from app.schemas.file import FileResponse as FileSchema
+from app.schemas.upload import UploadCreate, UploadStatus, UploadComplete
+from app.api.v1.auth import get_current_user
+
+router = APIRouter()
+
+
+def _to_status(session: UploadSession) -> UploadStatus:
+    return UploadStatus(
+        id=session.id,
+        target=session.target,
+        file_name=session.file_name,
+        file_type=session.file_type,
+        file_size=session.file_size,
+        received=session.received,
+        chunk_size=settings.UPLOAD_CHUNK_SIZE,
+        status=session.status,
+        sha256=session.sha256,
+        created_at=session.created_at,
+        updated_at=session.updated_at
+    )
+
+
+async def _get_session(db: AsyncSession, upload_id: str, user_id: int) -> UploadSession:
+    session = await db.scalar(select(UploadSession).where(
+        UploadSession.id == upload_id,
+        UploadSession.user_id == user_id
+    ))
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="上传会话不存在"
+        )
+    return session
+
+
+def _ensure_pending(session: UploadSession):
+    if session.status != "pending":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="上传已完成"
+        )
+
+
+def _file_category(file_type: str) -> str:
+    """根据MIME类型推断文件分类"""
+    major = file_type.split("/", 1)[0]
+    return major if major in ("image", "video", "audio") else "document"
+
+
+@router.post("", response_model=UploadStatus, status_code=status.HTTP_201_CREATED)
+async def create_upload(
+    upload_data: UploadCreate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """创建上传会话"""
+    if upload_data.file_size > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"文件大小超过上限 {settings.MAX_UPLOAD_SIZE} 字节"
+        )
+    session = UploadSession(
+        id=uuid.uuid4().hex,
+        user_id=current_user.id,
+        target=upload_data.target,
+        file_name=os.path.basename(upload_data.file_name),
+        file_type=upload_data.file_type,
+        file_size=upload_data.file_size,
+        received=0,
+        status="pending"
+    )
+    db.add(session)
+    await db.commit()
+    await db.refresh(session)
+    return _to_status(session)
+
+
+@router.get("/{upload_id}", response_model=UploadStatus)
+async def get_upload(
+    upload_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """查询上传进度（received 为续传时应使用的偏移量）"""
+    session = await _get_session(db, upload_id, current_user.id)
+    if session.status == "pending":
+        session.received = await storage.received_size(upload_id)
+    return _to_status(session)
+
+
+@router.put("/{upload_id}", response_model=UploadStatus)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="本分块在文件中的起始偏移量"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """上传一个分块（请求体为原始字节流，边接收边写入磁盘）"""
+    session = await _get_session(db, upload_id, current_user.id)
+    _ensure_pending(session)
+    
+    async with storage.upload_lock(upload_id):
+        received = await storage.received_size(upload_id)
+        if offset != received:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"偏移量不匹配，已接收 {received} 字节"
+            )
+        try:
+            received = await storage.append_chunks(upload_id, offset, request.stream(), session.file_size)
+        except storage.UploadSizeExceededError as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
+        finally:
+            # 即使连接中断也记录已写入的进度
+            session.received = await storage.received_size(upload_id)
+            await db.commit()
+    
+    await db.refresh(session)
+    return _to_status(session)
+
+
+@router.post("/{upload_id}/complete", response_model=Union[FileSchema, EbookResponse], status_code=status.HTTP_201_CREATED)
+async def complete_upload(
+    upload_id: str,
+    metadata: UploadComplete,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """完成上传，创建文件或电子书记录"""
+    session = await _get_session(db, upload_id, current_user.id)
+    _ensure_pending(session)
+    
+    async with storage.upload_lock(upload_id):
+        await _claim_completion(db, session)
+        try:
+            record = await _complete(db, session, metadata, current_user.id)
+        except Exception:
+            # 未能完成时释放认领（已提交完成的不变），会话恢复为未完成以便重试
+            await db.rollback()
+            await db.execute(
+                update(UploadSession)
+                .where(UploadSession.id == upload_id, UploadSession.status == "completing")
+                .values(status="pending")
+            )
+            await db.commit()
+            raise
+    notify_image_worker()
+    
+    await db.refresh(record)
+    return record
+
+
+async def _claim_completion(db: AsyncSession, session: UploadSession):
+    """以条件更新将未完成的会话标记为 completing（跨进程互斥），已被其他请求认领时返回409"""
+    result = await db.execute(
+        update(UploadSession)
+        .where(UploadSession.id == session.id, UploadSession.status == "pending")
+        .values(status="completing")
+    )
+    await db.commit()
+    if not result.rowcount:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="上传已完成或正在处理"
+        )
+    session.status = "completing"
+
+
+async def _complete(
+    db: AsyncSession, session: UploadSession, metadata: UploadComplete, user_id: int
+) -> Union[File, Ebook]:
+    """校验已接收的数据并创建记录（调用方持有上传锁并已认领会话）"""
+    upload_id = session.id
+    received = await storage.received_size(upload_id)
+    if received != session.file_size:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"上传未完成，已接收 {received}/{session.file_size} 字节"
+        )
+    
+    # 相同内容只保存一份：记录引用计数后，内容已存在时直接丢弃临时文件
+    sha256 = await storage.upload_digest(upload_id)
+    file_path = storage.blob_path(sha256)
+    extension = os.path.splitext(session.file_name)[1].lower().lstrip(".")
+    if session.target == "ebook":
+        record = Ebook(
+            user_id=user_id,
+            title=metadata.title or os.path.splitext(session.file_name)[0],
+            author=metadata.author,
+            description=metadata.description,
+            file_path=file_path,
+            content_hash=sha256,
+            file_name=session.file_name,
+            file_size=session.file_size,
+            file_type=extension or session.file_type,
+            tags=metadata.tags
+        )
+    else:
+        record = File(
+            user_id=user_id,
+            original_name=session.file_name,
+            stored_name=sha256,
+            file_path=file_path,
+            content_hash=sha256,
+            file_size=session.file_size,
+            file_type=session.file_type,
+            file_extension=extension or None,
+            description=metadata.description,
+            tags=metadata.tags,
+            category=metadata.category or _file_category(session.file_type),
+            is_public=metadata.is_public
+        )
+    
+    session.sha256 = sha256
+    session.received = received
+    session.status = "completed"
+    db.add(record)
+    await db.flush()
+    await add_tags_bulk(db, session.target, user_id, [(record.id, record.tags)])
+    await acquire_blob(db, sha256, session.file_size)
+    # 图片生成缩略图、电子书提取封面（后台处理）
+    if session.target == "ebook":
+        await enqueue_image_job(db, "ebook_cover", sha256, file_path, "ebook", record.id)
+    elif session.file_type.startswith("image/"):
+        await enqueue_image_job(db, "thumbnail", sha256, file_path, "file", record.id)
+    # 先提交引用再移动文件，避免内容在移动前被垃圾回收
+    await db.commit()
+    try:
+        await storage.store_blob(upload_id, sha256)
+    except OSError:
+        await _revert_completion(db, session, record)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="保存文件失败，请重试"
+        )
+    return record
+
+
+async def _revert_completion(db: AsyncSession, session: UploadSession, record: Union[File, Ebook]):
+    """内容未能存入存储时撤销已提交的记录与图片任务（引用计数由删除钩子释放），上传会话恢复为未完成以便重试"""
+    await db.execute(delete(ImageJob).where(
+        ImageJob.resource == session.target, ImageJob.resource_id == record.id
+    ))
+    await set_tags(db, session.target, record.id, record.user_id, None)
+    await db.delete(record)
+    session.status = "pending"
+    session.sha256 = None
+    await db.commit()
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload(
+    upload_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """取消上传并删除已接收的数据"""
+    session = await _get_session(db, upload_id, current_user.id)
+    _ensure_pending(session)
+    async with storage.upload_lock(upload_id):
+        # 条件删除：正在被其他请求完成的会话不能取消
+        result = await db.execute(
+            delete(UploadSession).where(UploadSession.id == upload_id, UploadSession.status == "pending")
+        )
+        await db.commit()
+        if not result.rowcount:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="上传已完成或正在处理"
+            )
+        await storage.discard_upload(upload_id)
+    return None
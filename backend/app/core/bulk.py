@@ -0,0 +1,131 @@
+"""
+批量请求体解析
+
+批量导入接口共用：请求体为JSON数组，或按行流式解析的 JSON Lines。
+只有 JSON Lines 是流式解析的：JSON 数组需要读取完整请求体后再解析，大批量数据建议使用 JSON Lines。
+请求体不能超过 BULK_MAX_BODY_BYTES（超出时返回 413），JSON Lines 单行不能超过 BULK_MAX_LINE_BYTES
+（超长的行不缓存，作为该行的错误报告）。
+"""
+import json
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, Request, status
+from pydantic import ValidationError
+
+from app.core.config import settings
+
+
+class BulkBodyTooLarge(HTTPException):
+    """请求体超过大小上限（413）"""
+
+    def __init__(self, limit: int):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"请求体不能超过 {limit} 字节"
+        )
+
+
+class _LineTooLong(ValueError):
+    pass
+
+
+async def _iter_body(request: Request, max_body_bytes: int) -> AsyncIterator[bytes]:
+    """逐块读取请求体，累计超过上限时抛出 BulkBodyTooLarge（Content-Length 超限时在读取前拒绝）"""
+    try:
+        declared = int(request.headers.get("content-length", ""))
+    except ValueError:
+        declared = None
+    if declared is not None and declared > max_body_bytes:
+        raise BulkBodyTooLarge(max_body_bytes)
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_body_bytes:
+            raise BulkBodyTooLarge(max_body_bytes)
+        yield chunk
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[object]:
+    """按换行切分（只扫描新到达的数据），超长的行丢弃内容并产出 _LineTooLong"""
+    line = bytearray()
+    too_long = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            piece = chunk[start:] if end < 0 else chunk[start:end]
+            if not too_long:
+                line += piece
+                if len(line) > max_line_bytes:
+                    too_long = True
+                    line.clear()
+            if end < 0:
+                break
+            if too_long:
+                yield _LineTooLong(f"单行超过 {max_line_bytes} 字节")
+            elif line.strip():
+                yield bytes(line)
+            line.clear()
+            too_long = False
+            start = end + 1
+    if too_long:
+        yield _LineTooLong(f"单行超过 {max_line_bytes} 字节")
+    elif line.strip():
+        yield bytes(line)
+
+
+async def iter_bulk_rows(request: Request, max_body_bytes: Optional[int] = None) -> AsyncIterator[object]:
+    """解析批量请求体，逐行产出原始数据（解析失败或超长的行产出异常对象）
+    
+    Content-Type 为 application/x-ndjson 或 application/jsonl 时按 JSON Lines 流式解析，
+    否则读取完整请求体后按 JSON 数组解析。请求体超过 max_body_bytes（默认 BULK_MAX_BODY_BYTES）时
+    抛出 BulkBodyTooLarge：JSON 数组在产出任何行之前抛出，JSON Lines 可能在产出部分行之后抛出。
+    """
+    limit = max_body_bytes or settings.BULK_MAX_BODY_BYTES
+    chunks = _iter_body(request, limit)
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        async for line in _iter_lines(chunks, settings.BULK_MAX_LINE_BYTES):
+            yield line if isinstance(line, Exception) else _parse_json_line(line)
+        return
+    
+    body = bytearray()
+    async for chunk in chunks:
+        body += chunk
+    try:
+        rows = json.loads(body)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="请求体不是合法的JSON"
+        )
+    if not isinstance(rows, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="请求体必须是JSON数组"
+        )
+    for row in rows:
+        yield row
+
+
+def _parse_json_line(line: bytes) -> object:
+    """解析单行JSON，失败时返回异常对象（由调用方记录为该行的错误）"""
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return e
+
+
+async def aenumerate(iterable: AsyncIterator) -> AsyncIterator:
+    """异步版本的 enumerate"""
+    index = 0
+    async for item in iterable:
+        yield index, item
+        index += 1
+
+
+def format_validation_error(e: ValidationError) -> str:
+    """将校验错误格式化为简短的字符串"""
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+    )
@@ -0,0 +1,102 @@
+"""
+进程内缓存工具
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """带过期时间的LRU缓存（线程安全），并统计命中/未命中次数
+    
+    on_evict(key, value) 在条目离开缓存时调用（过期、被淘汰、被覆盖、删除或清空），在锁外执行。
+    """
+    
+    def __init__(self, maxsize: int, ttl: float, on_evict: Optional[Callable[[Hashable, Any], None]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def _notify(self, removed: List[Tuple[Hashable, Any]]):
+        if self.on_evict is not None:
+            for key, value in removed:
+                self.on_evict(key, value)
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存，过期或不存在时返回 default"""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING or item[0] <= now:
+                if item is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                expired = item
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[1]
+        if expired is not _MISSING:
+            self._notify([(key, expired[1])])
+        return default
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        removed = []
+        with self._lock:
+            previous = self._data.get(key, _MISSING)
+            if previous is not _MISSING:
+                removed.append((key, previous[1]))
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted_key, (_, evicted) = self._data.popitem(last=False)
+                removed.append((evicted_key, evicted))
+                self.evictions += 1
+        self._notify(removed)
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """删除并返回缓存条目"""
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+        if item is _MISSING:
+            return default
+        self._notify([(key, item[1])])
+        return item[1]
+    
+    def reject(self, key: Hashable):
+        """丢弃刚命中但已被调用方判定无效的条目，并将该次命中计为未命中"""
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+            self.hits -= 1
+            self.misses += 1
+        if item is not _MISSING:
+            self._notify([(key, item[1])])
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            removed = [(key, item[1]) for key, item in self._data.items()] if self.on_evict is not None else []
+            self._data.clear()
+        self._notify(removed)
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def stats(self) -> Dict[str, int]:
+        """缓存统计信息"""
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
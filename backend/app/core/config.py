@@ -1,8 +1,9 @@
 """
 应用配置管理
 """
+from ipaddress import IPv4Network, IPv6Network, ip_network
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Union
 
 
 class Settings(BaseSettings):
@@ -19,21 +20,113 @@ class Settings(BaseSettings):
     
     # 数据库配置
     DATABASE_URL: str = "sqlite:///./codingSpace.db"
+    DATABASE_READ_REPLICA_URLS: str = ""  # 只读副本URL（逗号分隔），只读接口轮流使用，为空时读写均使用主库
+    DB_POOL_SIZE: int = 10  # 每个引擎常驻的连接数（SQLite 仅在开启 SQLITE_OPTIMIZE 时使用连接池，且忽略回收与检测配置）
+    DB_MAX_OVERFLOW: int = 20  # 超出常驻连接数后允许额外创建的连接数
+    DB_POOL_TIMEOUT_SECONDS: int = 30  # 等待空闲连接的超时时间（秒）
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # 连接的最长使用时间（秒），避免被数据库或中间网络设备断开，-1表示不回收
+    DB_POOL_PRE_PING: bool = True  # 使用连接前检测是否可用
+    
+    # SQLite 生产模式（单机部署）
+    SQLITE_OPTIMIZE: bool = False  # 启用 WAL 等 PRAGMA、异步连接池与进程内串行写入（默认关闭，部署时在 .env 中显式开启），False 时保持 SQLite 默认行为
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # WAL 模式下 NORMAL 不会损坏数据库，断电时可能丢失最近提交的事务
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # 等待其他进程释放数据库锁的时间（毫秒）
+    SQLITE_CACHE_SIZE_KB: int = 65536  # 每个连接的页缓存大小（KiB）
+    SQLITE_MMAP_SIZE: int = 268435456  # 内存映射读取的最大字节数（256MB），0表示禁用
+    SQLITE_WRITE_LOCK_TIMEOUT_SECONDS: float = 30.0  # 等待进程内写锁的超时时间（秒）
     
     # JWT配置
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 7天
     
+    # 密码哈希配置（bcrypt在独立进程池中执行，避免阻塞事件循环）
+    PASSWORD_HASH_WORKERS: int = 2  # 哈希进程池大小
+    PASSWORD_HASH_MAX_PENDING: int = 32  # 最大排队任务数，超出后直接返回503
+    
+    # 登录限流配置（令牌桶：每次登录尝试消耗一个令牌，登录成功后归还）
+    LOGIN_RATE_LIMIT_USER_BURST: int = 5  # 每个用户名允许连续失败的次数，0表示不限制
+    LOGIN_RATE_LIMIT_USER_PER_MINUTE: float = 1.0  # 每个用户名每分钟恢复的尝试次数
+    LOGIN_RATE_LIMIT_IP_BURST: int = 30  # 每个客户端IP允许连续失败的次数，0表示不限制
+    LOGIN_RATE_LIMIT_IP_PER_MINUTE: float = 10.0  # 每个客户端IP每分钟恢复的尝试次数
+    LOGIN_RATE_LIMIT_MAX_KEYS: int = 100000  # 进程内最多保存的令牌桶数
+    LOGIN_RATE_LIMIT_REDIS_URL: str = ""  # 多 worker 共享令牌桶的 Redis 地址（需安装 redis），为空时使用进程内存储
+    LOGIN_TRUSTED_PROXIES: str = ""  # 受信任的反向代理地址（IP或CIDR，逗号分隔），来自这些地址的请求按 X-Forwarded-For 确定客户端IP
+    
+    # 加密登录RSA密钥配置
+    RSA_PRIVATE_KEY: str = ""  # 固定使用的私钥（PEM），设置后不读写密钥目录、不轮换
+    RSA_KEY_DIR: str = "./keys"  # 密钥目录（多个 worker 共享，启动时加载或生成）
+    RSA_KEY_ROTATION_DAYS: int = 30  # 密钥轮换周期（天），0表示不自动轮换
+    RSA_KEY_OVERLAP_HOURS: int = 48  # 轮换后旧密钥仍可解密的时间（小时），应大于前端缓存公钥的24小时
+    
+    # 已认证用户缓存配置
+    # 用户被禁用或删除时只有处理该请求的 worker 立即失效，其他 worker 最多在有效期内仍接受其 token；
+    # 缓存包含 is_active 等认证字段，有效期应保持较短（超过60秒时按60秒处理）
+    USER_CACHE_TTL_SECONDS: int = 30  # 缓存有效期（秒），0表示禁用
+    USER_CACHE_MAX_SIZE: int = 10000  # 最大缓存条目数
+    
     # CORS配置
     CORS_ORIGINS: str = "http://localhost:3000,http://127.0.0.1:3000"
     
+    # 批量导入配置（题目批量导入、新闻推送）
+    BULK_MAX_BODY_BYTES: int = 52428800  # 请求体最大字节数（50MB），超出时返回413
+    BULK_MAX_LINE_BYTES: int = 1048576  # JSON Lines 单行最大字节数（1MB），超长的行按该行错误处理
+    
     # 文件存储配置
     UPLOAD_DIR: str = "./uploads"
-    MAX_UPLOAD_SIZE: int = 10485760  # 10MB，单位：字节
+    MAX_UPLOAD_SIZE: int = 1073741824  # 1GB，单位：字节（分块流式写入磁盘，不占用等量内存）
+    UPLOAD_CHUNK_SIZE: int = 8388608  # 建议客户端每次上传的分块大小（8MB）
+    UPLOAD_SESSION_TTL_HOURS: int = 24  # 未完成的上传会话保留时间（小时）
+    UPLOAD_PURGE_INTERVAL_SECONDS: int = 3600  # 清理过期上传会话的间隔（秒），0表示只在启动时清理
+    BLOB_GC_INTERVAL_SECONDS: int = 3600  # 回收无引用文件内容（及其缩略图）的间隔（秒），0表示只在启动时回收
+    
+    # 图片处理配置（缩略图与电子书封面在独立进程池中生成）
+    IMAGE_WORKERS: int = 1  # 图片处理进程数
+    IMAGE_THUMBNAIL_WIDTHS: str = "160,320,640"  # 缩略图宽度（像素），每种宽度生成 WebP 与 JPEG
+    IMAGE_JOB_POLL_SECONDS: float = 10.0  # 空闲时轮询任务队列的间隔（秒）
+    IMAGE_JOB_MAX_ATTEMPTS: int = 3  # 任务最大尝试次数
+    IMAGE_JOB_LEASE_SECONDS: int = 600  # 领取任务的租约时长（秒），超时未完成的任务由其他工作协程重新领取，应大于单个任务的最长处理时间
+    
+    # 博客配置
+    BLOG_RENDER_CACHE_SIZE: int = 500  # 缓存的已渲染博客正文数
+    BLOG_RENDER_CACHE_TTL_SECONDS: int = 3600  # 已渲染正文的缓存有效期（秒）
+    
+    # 计数器批量写入配置（浏览次数、下载次数等）
+    COUNTER_FLUSH_INTERVAL_SECONDS: float = 5.0  # 刷新间隔（秒）
+    COUNTER_FLUSH_THRESHOLD: int = 5000  # 累积的待写入行数达到该值时立即刷新
+    COUNTER_SHARDS: int = 16  # 进程内累加缓冲区的分片数（每个分片一把锁）
+    
+    # 性能观测配置
+    FAST_JSON_RESPONSES: bool = False  # 使用 orjson（需安装，否则为 pydantic-core）序列化响应，题目列表直接序列化数据库行
+    METRICS_ENABLED: bool = False  # 是否提供 /metrics（Prometheus 文本格式，包含路由流量与内部统计，默认关闭）
+    METRICS_TOKEN: str = ""  # 非空时访问 /metrics 需携带请求头 Authorization: Bearer <令牌>
+    PROFILING_TOKEN: str = ""  # 请求头 X-Profile 与该值一致时对该请求做 cProfile 剖析，为空时禁用
+    PROFILE_DIR: str = "./profiles"  # 剖析结果保存目录
     
     # 外部服务配置（用于新闻爬虫等服务）
     NEWS_CRAWLER_URL: str = ""  # 新闻爬虫服务地址
+    NEWS_INGEST_TOKEN: str = ""  # 爬虫推送新闻时使用的令牌（请求头 X-Ingest-Token），为空时禁用入库接口
+    NEWS_INGEST_MAX_ITEMS: int = 10000  # 单次推送的最大新闻条数
+    NEWS_INGEST_MAX_BODY_BYTES: int = 104857600  # 单次推送的请求体最大字节数（100MB，含正文），单行上限同 BULK_MAX_LINE_BYTES
+    NEWS_CACHE_TTL_SECONDS: int = 60  # 新闻列表/详情的进程内缓存有效期（秒）
+    NEWS_CACHE_MAX_SIZE: int = 1000  # 新闻缓存最大条目数
+    NEWS_CACHE_MAX_PAGES: int = 5  # 每个分类缓存的列表页数（更深的分页直接查询数据库）
+    NEWS_HTTP_MAX_AGE: int = 30  # 新闻接口 Cache-Control 的 max-age（秒）
+    
+    @property
+    def image_thumbnail_widths(self) -> List[int]:
+        """将IMAGE_THUMBNAIL_WIDTHS字符串转换为宽度列表（升序）"""
+        return sorted({int(w) for w in self.IMAGE_THUMBNAIL_WIDTHS.split(",") if w.strip()})
+    
+    @property
+    def database_read_replica_urls(self) -> List[str]:
+        """将DATABASE_READ_REPLICA_URLS字符串转换为列表"""
+        return [url.strip() for url in self.DATABASE_READ_REPLICA_URLS.split(",") if url.strip()]
+    
+    @property
+    def login_trusted_proxies(self) -> List[Union[IPv4Network, IPv6Network]]:
+        """将LOGIN_TRUSTED_PROXIES字符串转换为网络列表"""
+        return [ip_network(p.strip(), strict=False) for p in self.LOGIN_TRUSTED_PROXIES.split(",") if p.strip()]
     
     @property
     def cors_origins_list(self) -> List[str]:
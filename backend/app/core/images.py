@@ -0,0 +1,139 @@
+"""
+图片衍生文件生成（缩略图、WebP 变体、电子书封面）
+
+本模块的函数在图片处理进程池中执行（见 app.db.image_jobs），参数与返回值均为
+可序列化的简单类型。衍生文件按源内容的 SHA-256 存放，文件名为 <宽度>.<格式>。
+"""
+import io
+import os
+import posixpath
+import re
+import zipfile
+from typing import List, Optional, Sequence
+from urllib.parse import unquote
+from xml.etree import ElementTree
+
+from PIL import Image, ImageOps
+
+# 衍生文件格式及保存参数
+VARIANT_FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpg": {"format": "JPEG", "quality": 85, "optimize": True, "progressive": True},
+}
+
+# 提取 PDF 内嵌封面时最多读取的字节数
+PDF_SCAN_BYTES = 16 * 1024 * 1024
+
+_PDF_DCT_STREAM = re.compile(rb"/DCTDecode.*?stream\r?\n", re.S)
+_OPF_NS = {"opf": "http://www.idpf.org/2007/opf"}
+_CONTAINER_NS = {"c": "urn:oasis:names:tc:opendocument:xmlns:container"}
+
+
+def variant_name(width: int, fmt: str) -> str:
+    """衍生文件名，例如 320.webp"""
+    return f"{width}.{fmt}"
+
+
+def _save_atomic(image: Image.Image, path: str, fmt: str):
+    """先写入临时文件再改名，避免读取到写了一半的文件"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    image.save(tmp_path, **VARIANT_FORMATS[fmt])
+    os.replace(tmp_path, path)
+
+
+def generate_thumbnails(source, dest_dir: str, widths: Sequence[int]) -> List[str]:
+    """按宽度生成缩略图（不放大），每种宽度输出 WebP 与 JPEG，返回生成的文件名
+
+    source 为文件路径或图片字节。
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    os.makedirs(dest_dir, exist_ok=True)
+    names = []
+    with Image.open(source) as image:
+        # JPEG 可在解码时直接缩小，大幅减少大图的解码开销
+        image.draft("RGB", (max(widths), max(widths)))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        for width in widths:
+            resized = image
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), Image.LANCZOS)
+            for fmt in VARIANT_FORMATS:
+                variant = resized
+                if fmt == "jpg" and variant.mode == "RGBA":
+                    # JPEG 不支持透明通道，合成到白色背景
+                    background = Image.new("RGB", variant.size, (255, 255, 255))
+                    background.paste(variant, mask=variant.getchannel("A"))
+                    variant = background
+                name = variant_name(width, fmt)
+                _save_atomic(variant, os.path.join(dest_dir, name), fmt)
+                names.append(name)
+    return names
+
+
+def _read_epub_cover(path: str) -> Optional[bytes]:
+    """从 EPUB 中读取封面图片（依次尝试 EPUB3 cover-image、EPUB2 meta cover、文件名包含 cover 的图片）"""
+    with zipfile.ZipFile(path) as epub:
+        container = ElementTree.fromstring(epub.read("META-INF/container.xml"))
+        rootfile = container.find(".//c:rootfile", _CONTAINER_NS)
+        if rootfile is None:
+            return None
+        opf_path = rootfile.get("full-path")
+        opf = ElementTree.fromstring(epub.read(opf_path))
+        items = opf.findall(".//opf:manifest/opf:item", _OPF_NS)
+        images = [item for item in items if (item.get("media-type") or "").startswith("image/")]
+
+        cover = next((item for item in images if "cover-image" in (item.get("properties") or "").split()), None)
+        if cover is None:
+            meta = opf.find(".//opf:metadata/opf:meta[@name='cover']", _OPF_NS)
+            if meta is not None:
+                cover = next((item for item in images if item.get("id") == meta.get("content")), None)
+        if cover is None:
+            cover = next((item for item in images if "cover" in (item.get("id", "") + item.get("href", "")).lower()), None)
+        if cover is None:
+            return None
+
+        href = posixpath.normpath(posixpath.join(posixpath.dirname(opf_path), unquote(cover.get("href"))))
+        return epub.read(href)
+
+
+def _read_pdf_cover(path: str) -> Optional[bytes]:
+    """获取 PDF 封面：安装了 PyMuPDF 时渲染第一页，否则提取文件开头第一张内嵌 JPEG 图片"""
+    try:
+        import fitz
+    except ImportError:
+        fitz = None
+    if fitz is not None:
+        with fitz.open(path) as document:
+            if document.page_count == 0:
+                return None
+            return document[0].get_pixmap(dpi=96).tobytes("png")
+
+    with open(path, "rb") as f:
+        data = f.read(PDF_SCAN_BYTES)
+    for match in _PDF_DCT_STREAM.finditer(data):
+        start = match.end()
+        end = data.find(b"endstream", start)
+        if end < 0:
+            break
+        stream = data[start:end].rstrip(b"\r\n")
+        if stream.startswith(b"\xff\xd8"):
+            return stream
+    return None
+
+
+def extract_ebook_cover(path: str, file_type: str, dest_dir: str, widths: Sequence[int]) -> List[str]:
+    """提取电子书封面并生成缩略图，无法提取时返回空列表"""
+    file_type = file_type.lower()
+    if file_type == "epub":
+        cover = _read_epub_cover(path)
+    elif file_type == "pdf":
+        cover = _read_pdf_cover(path)
+    else:
+        return []
+    if not cover:
+        return []
+    return generate_thumbnails(cover, dest_dir, widths)
@@ -0,0 +1,40 @@
+"""
+Markdown 渲染
+
+博客正文以 Markdown 存储，详情页返回渲染并净化后的 HTML。渲染结果按 (博客ID, 正文哈希) 缓存，
+正文修改后自然失效，与 updated_at 等其他列无关。
+"""
+import bleach
+import markdown as markdown_lib
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists", "toc"]
+
+# 渲染结果中允许保留的标签与属性（防止正文中的 HTML 造成 XSS）
+ALLOWED_TAGS = bleach.sanitizer.ALLOWED_TAGS | {
+    "p", "br", "hr", "pre", "span", "div", "img",
+    "h1", "h2", "h3", "h4", "h5", "h6",
+    "table", "thead", "tbody", "tr", "th", "td",
+    "dl", "dt", "dd", "sup", "sub", "del",
+}
+ALLOWED_ATTRIBUTES = {
+    **bleach.sanitizer.ALLOWED_ATTRIBUTES,
+    "img": ["src", "alt", "title"],
+    "code": ["class"],
+    "th": ["align"],
+    "td": ["align"],
+    "h1": ["id"], "h2": ["id"], "h3": ["id"], "h4": ["id"], "h5": ["id"], "h6": ["id"],
+    "sup": ["id"],
+    "li": ["id"],
+    "a": ["href", "title", "id", "class"],
+}
+
+rendered_cache = TTLCache(maxsize=settings.BLOG_RENDER_CACHE_SIZE, ttl=settings.BLOG_RENDER_CACHE_TTL_SECONDS)
+
+
+def render_markdown(text: str) -> str:
+    """将 Markdown 渲染为净化后的 HTML"""
+    html = markdown_lib.markdown(text, extensions=MARKDOWN_EXTENSIONS, output_format="html")
+    return bleach.clean(html, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, strip=True)
@@ -0,0 +1,323 @@
+"""
+请求级性能指标
+
+InstrumentationMiddleware 为每个请求创建一个 RequestTiming（通过 ContextVar 传递），
+数据库查询钩子与 timed() 将耗时记入当前请求：
+- 响应头 Server-Timing 给出本次请求的总耗时、数据库耗时与查询次数及各阶段耗时；
+- 按路由汇总的延迟直方图、查询次数等以 Prometheus 文本格式由 /metrics 导出；
+- 请求头 X-Profile 与 PROFILING_TOKEN 一致时，用 cProfile 记录该请求并保存到 PROFILE_DIR。
+
+指标只在事件循环线程中更新，不加锁。
+"""
+import asyncio
+import cProfile
+import os
+import re
+import secrets
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+# 指标名前缀
+METRIC_PREFIX = "codingspace"
+
+# 请求延迟直方图的桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 未匹配到路由的请求统一记为该路由，避免任意路径产生大量指标
+UNMATCHED_ROUTE = "unmatched"
+
+_UNSAFE_FILENAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class Histogram:
+    """累积桶直方图（与 Prometheus histogram 语义一致）"""
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """(上界, 累计次数) 列表，不含 +Inf"""
+        total, result = 0, []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class RequestTiming:
+    """单个请求的耗时记录"""
+    __slots__ = ("started", "db_queries", "db_seconds", "spans")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.spans: Dict[str, float] = {}
+
+    def server_timing(self) -> str:
+        """Server-Timing 响应头（毫秒）"""
+        total = (time.perf_counter() - self.started) * 1000
+        parts = [f'db;dur={self.db_seconds * 1000:.2f};desc="{self.db_queries} queries"']
+        parts.extend(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.spans.items())
+        parts.append(f"total;dur={total:.2f}")
+        return ", ".join(parts)
+
+
+_current_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+def current_timing() -> Optional[RequestTiming]:
+    """当前请求的耗时记录（不在请求中时为 None）"""
+    return _current_timing.get()
+
+
+class MetricsRegistry:
+    """进程内指标汇总"""
+
+    def __init__(self):
+        self.request_durations: Dict[Tuple[str, str], Histogram] = {}
+        self.request_totals: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self.request_db_queries: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.request_db_seconds: Dict[Tuple[str, str], float] = defaultdict(float)
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.db_query_errors = 0
+        self.span_seconds: Dict[str, float] = defaultdict(float)
+        self.span_calls: Dict[str, int] = defaultdict(int)
+        self._stats_sources: List[Tuple[str, Callable[[], Dict[str, Dict[str, float]]]]] = []
+
+    def register_stats(self, family: str, collect: Callable[[], Dict[str, Dict[str, float]]]):
+        """注册统计信息来源
+
+        collect 返回 {名称: {指标: 数值}}，导出为 <前缀>_<family>_<指标>{<family>="<名称>"}。
+        """
+        self._stats_sources.append((family, collect))
+
+    def observe_query(self, seconds: float, failed: bool = False):
+        self.db_queries += 1
+        self.db_seconds += seconds
+        if failed:
+            self.db_query_errors += 1
+
+    def observe_span(self, name: str, seconds: float):
+        self.span_seconds[name] += seconds
+        self.span_calls[name] += 1
+
+    def observe_request(self, method: str, route: str, status_code: int, seconds: float, timing: RequestTiming):
+        key = (method, route)
+        histogram = self.request_durations.get(key)
+        if histogram is None:
+            histogram = self.request_durations[key] = Histogram()
+        histogram.observe(seconds)
+        self.request_totals[(method, route, str(status_code))] += 1
+        self.request_db_queries[key] += timing.db_queries
+        self.request_db_seconds[key] += timing.db_seconds
+
+    def render(self) -> str:
+        """Prometheus 文本格式"""
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> str:
+            full = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        name = family("http_request_duration_seconds", "histogram", "HTTP request latency by route")
+        for (method, route), histogram in sorted(self.request_durations.items()):
+            labels = f'method="{method}",route="{_escape(route)}"'
+            for bound, count in histogram.cumulative():
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        name = family("http_requests_total", "counter", "HTTP requests by route and status")
+        for (method, route, status_code), count in sorted(self.request_totals.items()):
+            lines.append(f'{name}{{method="{method}",route="{_escape(route)}",status="{status_code}"}} {count}')
+
+        name = family("http_request_db_queries_total", "counter", "SQL statements executed while handling requests")
+        for (method, route), count in sorted(self.request_db_queries.items()):
+            lines.append(f'{name}{{method="{method}",route="{_escape(route)}"}} {count}')
+
+        name = family("http_request_db_seconds_total", "counter", "Time spent in SQL statements while handling requests")
+        for (method, route), seconds in sorted(self.request_db_seconds.items()):
+            lines.append(f'{name}{{method="{method}",route="{_escape(route)}"}} {seconds}')
+
+        name = family("db_queries_total", "counter", "SQL statements executed (including background tasks)")
+        lines.append(f"{name} {self.db_queries}")
+        name = family("db_query_seconds_total", "counter", "Time spent in SQL statements (including background tasks)")
+        lines.append(f"{name} {self.db_seconds}")
+        name = family("db_query_errors_total", "counter", "SQL statements that raised an error")
+        lines.append(f"{name} {self.db_query_errors}")
+
+        name = family("span_seconds_total", "counter", "Time spent in instrumented operations")
+        for span, seconds in sorted(self.span_seconds.items()):
+            lines.append(f'{name}{{span="{_escape(span)}"}} {seconds}')
+        name = family("span_calls_total", "counter", "Calls of instrumented operations")
+        for span, count in sorted(self.span_calls.items()):
+            lines.append(f'{name}{{span="{_escape(span)}"}} {count}')
+
+        for source, collect in self._stats_sources:
+            samples: Dict[str, List[str]] = defaultdict(list)
+            for label, stats in collect().items():
+                for stat, value in stats.items():
+                    samples[stat].append(f'{{{source}="{_escape(label)}"}} {value}')
+            for stat, values in samples.items():
+                name = family(f"{source}_{stat}", "gauge", f"{source} {stat}")
+                lines.extend(name + value for value in values)
+
+        lines.append("")
+        return "\n".join(lines)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
+
+
+def record_span(name: str, seconds: float):
+    """记录一次操作耗时（计入当前请求的 Server-Timing 与全局指标）"""
+    metrics.observe_span(name, seconds)
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.spans[name] = timing.spans.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timed(name: str):
+    """记录代码块耗时，例如 with timed("password_hash"): ..."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - started)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """SQLAlchemy 事件钩子：记录语句开始时间"""
+    conn.info.setdefault("query_started", []).append((cursor, time.perf_counter()))
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """SQLAlchemy 事件钩子：将语句耗时计入当前请求与全局指标"""
+    _, started = conn.info["query_started"].pop()
+    _record_query(time.perf_counter() - started)
+
+
+def handle_error(exception_context):
+    """SQLAlchemy 事件钩子：执行失败的语句不会触发 after_cursor_execute，在此弹出开始时间并计为失败的语句"""
+    conn, context = exception_context.connection, exception_context.execution_context
+    pending = conn.info.get("query_started") if conn is not None else None
+    if not pending or context is None or pending[-1][0] is not context.cursor:
+        # 在 before_cursor_execute 之前失败（如连接失败、等待写锁超时），没有记录开始时间
+        return
+    _, started = pending.pop()
+    _record_query(time.perf_counter() - started, failed=True)
+
+
+def _record_query(seconds: float, failed: bool = False):
+    metrics.observe_query(seconds, failed)
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.db_queries += 1
+        timing.db_seconds += seconds
+
+
+def _route_path(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+# 同一时间只允许一个请求被 cProfile 记录
+_profiling = False
+
+
+def _wants_profile(scope: Scope) -> bool:
+    if not settings.PROFILING_TOKEN or _profiling:
+        return False
+    token = Headers(scope=scope).get("x-profile")
+    return token is not None and secrets.compare_digest(token, settings.PROFILING_TOKEN)
+
+
+def _dump_profile(profiler: cProfile.Profile, filename: str):
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(os.path.join(settings.PROFILE_DIR, filename))
+
+
+class InstrumentationMiddleware:
+    """记录请求耗时、数据库查询次数与耗时，添加 Server-Timing 响应头，按需对请求做性能剖析
+
+    cProfile 记录的是事件循环线程上的全部执行，剖析期间并发处理的其他请求也会计入，
+    应在负载较低的实例上使用。剖析结果（.prof，可用 snakeviz 或 pstats 查看）的文件名
+    通过响应头 X-Profile-File 返回。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        global _profiling
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _current_timing.set(timing)
+        status_code = 500
+        profiler = profile_name = None
+        if _wants_profile(scope):
+            _profiling = True
+            profile_name = "{}-{}-{}.prof".format(
+                time.strftime("%Y%m%d-%H%M%S"), scope["method"],
+                _UNSAFE_FILENAME.sub("_", scope["path"]).strip("_")[:80] or "root",
+            )
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        async def send_with_timing(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timing.server_timing())
+                if profile_name:
+                    headers.append("X-Profile-File", profile_name)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timing.reset(token)
+            if profiler is not None:
+                profiler.disable()
+                try:
+                    await asyncio.to_thread(_dump_profile, profiler, profile_name)
+                finally:
+                    _profiling = False
+            metrics.observe_request(
+                scope["method"], _route_path(scope), status_code,
+                time.perf_counter() - timing.started, timing,
+            )
@@ -0,0 +1,59 @@
+"""
+新闻公共内容缓存
+
+新闻对所有访客相同，热门页面（各分类列表的前几页、分类列表、新闻详情）的序列化结果
+（JSON 字节 + ETag）缓存在进程内，新闻入库后整体失效。
+"""
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Hashable
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """已序列化的响应体"""
+    body: bytes
+    etag: str
+
+
+def make_cached_body(body: bytes) -> CachedBody:
+    """根据响应体内容生成强 ETag"""
+    return CachedBody(body=body, etag='"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"')
+
+
+class NewsCache:
+    """新闻响应缓存，通过代数（generation）避免失效前开始构建的旧结果在失效后写入"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generation = 0
+        self._lock = threading.Lock()
+    
+    async def get_or_build(self, key: Hashable, build: Callable[[], Awaitable[bytes]]) -> CachedBody:
+        """读取缓存，未命中时调用 build 生成响应体并写入缓存"""
+        entry = self._cache.get(key)
+        if entry is not None:
+            return entry
+        generation = self._generation
+        entry = make_cached_body(await build())
+        with self._lock:
+            if generation == self._generation:
+                self._cache.set(key, entry)
+        return entry
+    
+    def invalidate(self):
+        """使所有缓存失效（新闻入库后调用）"""
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+    
+    def stats(self):
+        """缓存统计信息"""
+        return self._cache.stats()
+
+
+news_cache = NewsCache(maxsize=settings.NEWS_CACHE_MAX_SIZE, ttl=settings.NEWS_CACHE_TTL_SECONDS)
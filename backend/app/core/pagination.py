@@ -0,0 +1,27 @@
+"""
+游标（keyset）分页工具
+
+游标是对排序键取值的不透明编码（URL安全的Base64 JSON），客户端只需原样回传。
+"""
+import base64
+import json
+from typing import Any, List
+
+
+def encode_cursor(*values: Any) -> str:
+    """将排序键取值编码为游标"""
+    raw = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in values],
+                     separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """解码游标，格式不合法时抛出 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"无效的游标: {cursor}") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError(f"无效的游标: {cursor}")
+    return values
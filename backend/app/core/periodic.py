@@ -0,0 +1,44 @@
+"""
+周期性后台任务
+
+在事件循环中按固定间隔执行维护任务（如回收无引用的文件内容），应用启动时 start、关闭时 stop；
+单次执行失败只记录日志，下个周期继续。
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """按固定间隔执行的后台任务"""
+
+    def __init__(self, name: str, func: Callable[[], Awaitable[object]], interval_seconds: float):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.func()
+            except Exception:
+                logger.exception("后台任务执行失败：%s", self.name)
+
+    def start(self):
+        """启动后台任务（在应用启动时调用），间隔不大于 0 时不启动"""
+        if self._task is None and self.interval_seconds > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """停止后台任务（在应用关闭时调用）"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
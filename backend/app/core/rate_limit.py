@@ -0,0 +1,254 @@
+"""
+登录限流（令牌桶）
+
+每次登录尝试在校验密码之前从用户名与客户端IP两个令牌桶中各取一个令牌，任一桶为空时直接拒绝，
+不查询数据库也不计算 bcrypt；登录成功后归还令牌，因此只有失败的尝试会累积。
+
+默认在进程内保存令牌桶：桶在令牌恢复满之前才需要保存，过期条目随访问顺序清理，并限制最大条目数。
+多 worker 部署时可设置 LOGIN_RATE_LIMIT_REDIS_URL 使用 Redis 共享（需安装 redis），
+Redis 不可用时放行请求并记录日志。
+
+位于反向代理之后时，连接的对端地址是代理本身：配置 LOGIN_TRUSTED_PROXIES 后，来自受信任代理的请求
+按 X-Forwarded-For 中最右侧的非代理地址限流；无法确定客户端IP时不使用IP令牌桶，避免所有用户共享代理的桶。
+"""
+import ipaddress
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 用户名参与键计算的最大长度，避免超长用户名占用内存
+MAX_KEY_LENGTH = 128
+
+# 受信任的反向代理（启动时解析，配置错误时立即报错）
+TRUSTED_PROXIES = settings.login_trusted_proxies
+
+
+@dataclass(frozen=True)
+class BucketLimit:
+    """令牌桶容量与每秒恢复的令牌数"""
+    capacity: float
+    per_second: float
+
+
+Bucket = Tuple[str, BucketLimit]
+
+
+class MemoryBuckets:
+    """进程内令牌桶（只在事件循环线程中使用，不加锁）"""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # 键 -> [剩余令牌, 更新时间, 过期时间]，按最近更新排序
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def _tokens(self, key: str, limit: BucketLimit, now: float) -> float:
+        entry = self._buckets.get(key)
+        if entry is None or entry[2] <= now:
+            return limit.capacity
+        return min(limit.capacity, entry[0] + (now - entry[1]) * limit.per_second)
+
+    def _sweep(self, now: float):
+        while self._buckets:
+            entry = next(iter(self._buckets.values()))
+            if entry[2] > now and len(self._buckets) <= self.max_keys:
+                break
+            self._buckets.popitem(last=False)
+
+    async def acquire(self, buckets: Sequence[Bucket]) -> float:
+        now = time.monotonic()
+        tokens = [self._tokens(key, limit, now) for key, limit in buckets]
+        wait = max(
+            ((1 - t) / limit.per_second for t, (_, limit) in zip(tokens, buckets) if t < 1),
+            default=0.0,
+        )
+        if wait > 0:
+            return wait
+        for t, (key, limit) in zip(tokens, buckets):
+            self._buckets[key] = [t - 1, now, now + (limit.capacity - t + 1) / limit.per_second]
+            self._buckets.move_to_end(key)
+        self._sweep(now)
+        return 0.0
+
+    async def refund(self, buckets: Sequence[Bucket]):
+        now = time.monotonic()
+        for key, limit in buckets:
+            entry = self._buckets.get(key)
+            if entry is not None and entry[2] > now:
+                entry[0] = min(limit.capacity, entry[0] + 1)
+                entry[2] = max(now, entry[2] - 1 / limit.per_second)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def close(self):
+        pass
+
+
+# KEYS 为桶的键；ARGV 依次为每个桶的容量与每秒恢复的令牌数。所有桶都有令牌时各取一个并返回 0，
+# 否则不取令牌并返回需要等待的秒数（以字符串返回，避免小数被截断）
+_ACQUIRE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local wait = 0
+local tokens = {}
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 2 - 1])
+  local rate = tonumber(ARGV[i * 2])
+  local state = redis.call('HMGET', key, 't', 's')
+  local t = tonumber(state[1]) or capacity
+  local s = tonumber(state[2]) or now
+  t = math.min(capacity, t + math.max(0, now - s) * rate)
+  if t < 1 then wait = math.max(wait, (1 - t) / rate) end
+  tokens[i] = t
+end
+if wait > 0 then return tostring(wait) end
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 2 - 1])
+  local rate = tonumber(ARGV[i * 2])
+  redis.call('HSET', key, 't', tostring(tokens[i] - 1), 's', tostring(now))
+  redis.call('PEXPIRE', key, math.ceil((capacity - tokens[i] + 1) / rate * 1000))
+end
+return '0'
+"""
+
+_REFUND_SCRIPT = """
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i])
+  local t = tonumber(redis.call('HGET', key, 't'))
+  if t then redis.call('HSET', key, 't', tostring(math.min(capacity, t + 1))) end
+end
+return 0
+"""
+
+
+class RedisBuckets:
+    """Redis 中的令牌桶（多个 worker 共享，通过 Lua 脚本原子更新）"""
+
+    def __init__(self, url: str, prefix: str = "codingspace:ratelimit:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("设置 LOGIN_RATE_LIMIT_REDIS_URL 需要安装 redis") from e
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+        self._acquire = self._client.register_script(_ACQUIRE_SCRIPT)
+        self._refund = self._client.register_script(_REFUND_SCRIPT)
+
+    async def acquire(self, buckets: Sequence[Bucket]) -> float:
+        args: List[float] = []
+        for _, limit in buckets:
+            args += [limit.capacity, limit.per_second]
+        try:
+            wait = await self._acquire(keys=[self.prefix + key for key, _ in buckets], args=args)
+        except Exception:
+            logger.warning("登录限流：Redis 不可用，放行请求", exc_info=True)
+            return 0.0
+        return float(wait)
+
+    async def refund(self, buckets: Sequence[Bucket]):
+        try:
+            await self._refund(
+                keys=[self.prefix + key for key, _ in buckets],
+                args=[limit.capacity for _, limit in buckets],
+            )
+        except Exception:
+            logger.warning("登录限流：Redis 不可用，未能归还令牌", exc_info=True)
+
+    def __len__(self) -> int:
+        return 0
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class LoginThrottle:
+    """按用户名与客户端IP限制登录尝试"""
+
+    def __init__(self, backend, user_limit: Optional[BucketLimit], ip_limit: Optional[BucketLimit]):
+        self.backend = backend
+        self.user_limit = user_limit
+        self.ip_limit = ip_limit
+        self.allowed = 0
+        self.rejected = 0
+
+    def buckets(self, username: str, client_ip: Optional[str]) -> List[Bucket]:
+        """本次登录尝试涉及的令牌桶"""
+        buckets = []
+        if self.user_limit:
+            buckets.append(("u:" + username.strip().lower()[:MAX_KEY_LENGTH], self.user_limit))
+        if self.ip_limit and client_ip:
+            buckets.append(("ip:" + client_ip, self.ip_limit))
+        return buckets
+
+    async def acquire(self, buckets: Sequence[Bucket]) -> float:
+        """取令牌，返回 0 表示放行，否则为建议的重试等待秒数"""
+        if not buckets:
+            return 0.0
+        wait = await self.backend.acquire(buckets)
+        if wait > 0:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    async def refund(self, buckets: Sequence[Bucket]):
+        """登录成功后归还令牌"""
+        if buckets:
+            await self.backend.refund(buckets)
+
+    async def close(self):
+        """释放后端连接（在应用关闭时调用）"""
+        await self.backend.close()
+
+    def stats(self) -> Dict[str, int]:
+        """限流统计信息"""
+        return {"keys": len(self.backend), "allowed": self.allowed, "rejected": self.rejected}
+
+
+def client_ip(peer: Optional[str], forwarded_for: Optional[str]) -> Optional[str]:
+    """确定登录限流使用的客户端IP
+    
+    对端不是受信任的代理时直接使用对端地址；否则从右向左跳过受信任代理，取 X-Forwarded-For
+    中第一个非代理地址（更左侧的地址可由客户端伪造）。无法确定时返回 None。
+    """
+    if not peer or not _is_trusted(peer):
+        return peer
+    for hop in reversed((forwarded_for or "").split(",")):
+        hop = hop.strip()
+        try:
+            address = ipaddress.ip_address(hop)
+        except ValueError:
+            return None
+        if not any(address in network for network in TRUSTED_PROXIES):
+            return str(address)
+    return None
+
+
+def _is_trusted(ip: str) -> bool:
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+
+def _limit(burst: int, per_minute: float) -> Optional[BucketLimit]:
+    if burst <= 0 or per_minute <= 0:
+        return None
+    return BucketLimit(capacity=burst, per_second=per_minute / 60)
+
+
+login_throttle = LoginThrottle(
+    backend=(
+        RedisBuckets(settings.LOGIN_RATE_LIMIT_REDIS_URL) if settings.LOGIN_RATE_LIMIT_REDIS_URL
+        else MemoryBuckets(settings.LOGIN_RATE_LIMIT_MAX_KEYS)
+    ),
+    user_limit=_limit(settings.LOGIN_RATE_LIMIT_USER_BURST, settings.LOGIN_RATE_LIMIT_USER_PER_MINUTE),
+    ip_limit=_limit(settings.LOGIN_RATE_LIMIT_IP_BURST, settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE),
+)
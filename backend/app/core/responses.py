@@ -0,0 +1,211 @@
+"""
+自定义响应类型
+
+文件下载支持单段 Range 请求（206）、强 ETag 与 If-None-Match / If-Range 条件请求；
+已序列化的 JSON 响应可通过 conditional_response 支持 If-None-Match。
+FastJSONResponse 使用 orjson（未安装时为 pydantic-core）序列化，开启 FAST_JSON_RESPONSES 时作为默认响应类型。
+ASGI 服务器提供 http.response.zerocopysend 扩展时通过 sendfile 零拷贝发送，
+否则按较大的块读取文件后发送。
+"""
+import os
+import stat
+from email.utils import formatdate
+from typing import Any, Optional, Tuple
+
+import anyio
+import pydantic_core
+from fastapi import Request, Response, status
+from starlette.responses import FileResponse, JSONResponse
+from starlette.types import Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时使用 pydantic-core 序列化
+    orjson = None
+
+
+def dumps_json(content: Any) -> bytes:
+    """序列化为紧凑的 UTF-8 JSON（date/datetime 输出 ISO 8601，UTC 时间以 Z 结尾，与 Pydantic 一致）"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return pydantic_core.to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """使用 dumps_json 序列化的 JSON 响应（替代标准库 json）"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
+class RangedFileResponse(FileResponse):
+    """只发送文件 [offset, offset + length) 区间的文件响应"""
+    chunk_size = 1024 * 1024
+
+    def __init__(self, path: str, offset: int, length: int, **kwargs):
+        super().__init__(path, **kwargs)
+        self.offset = offset
+        self.length = length
+        self.headers["content-length"] = str(length)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if self.send_header_only or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.fileno(),
+                    "offset": self.offset,
+                    "count": self.length,
+                    "more_body": False,
+                })
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(self.offset)
+                remaining = self.length
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": remaining > 0,
+                    })
+                if remaining > 0:
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+
+def make_etag(content_hash: Optional[str], stat_result: os.stat_result) -> str:
+    """内容哈希已知时生成强 ETag，否则按修改时间与大小生成弱 ETag"""
+    if content_hash:
+        return f'"{content_hash}"'
+    return f'W/"{int(stat_result.st_mtime)}-{stat_result.st_size}"'
+
+
+def _etag_matches(header: str, etag: str, weak: bool) -> bool:
+    """比较 If-None-Match（弱比较）或 If-Range（强比较）中的 ETag"""
+    if header.strip() == "*":
+        return True
+    if not weak and etag.startswith("W/"):
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    if weak:
+        candidates = [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+        etag = etag[2:] if etag.startswith("W/") else etag
+    return etag in candidates
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """解析单段 Range 请求头，返回 (起始偏移, 长度)
+
+    语法不合法或包含多段时返回 None（按完整响应处理），
+    范围无法满足时抛出 ValueError。
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start, sep, end = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if start:
+            first = int(start)
+            last = int(end) if end else size - 1
+            if end and first > last:
+                return None
+        elif end:
+            suffix = int(end)
+            first = max(size - suffix, 0)
+            last = size - 1 if suffix else -1
+        else:
+            return None
+    except ValueError:
+        return None
+    if first >= size or last < first:
+        raise ValueError("range not satisfiable")
+    last = min(last, size - 1)
+    return first, last - first + 1
+
+
+def file_download_response(
+    request: Request,
+    path: str,
+    content_hash: Optional[str],
+    media_type: Optional[str] = None,
+    filename: Optional[str] = None,
+    cache_control: str = "private, no-cache",
+) -> Response:
+    """构造文件下载响应（处理条件请求与 Range 请求）
+    
+    默认要求客户端每次通过 ETag 校验缓存；内容不可变的公开资源可传入长期缓存策略。
+    """
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        stat_result = None
+    if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+        return Response(status_code=status.HTTP_404_NOT_FOUND)
+
+    size = stat_result.st_size
+    etag = make_etag(content_hash, stat_result)
+    headers = {
+        "etag": etag,
+        "accept-ranges": "bytes",
+        "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "cache-control": cache_control,
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag, weak=True):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    offset, length, status_code = 0, size, status.HTTP_200_OK
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or _etag_matches(if_range, etag, weak=False)):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            headers["content-range"] = f"bytes */{size}"
+            return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+        if byte_range is not None:
+            offset, length = byte_range
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["content-range"] = f"bytes {offset}-{offset + length - 1}/{size}"
+
+    return RangedFileResponse(
+        path,
+        offset=offset,
+        length=length,
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type,
+        filename=filename,
+        stat_result=stat_result,
+        method=request.method,
+    )
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    cache_control: str,
+    media_type: str = "application/json",
+) -> Response:
+    """返回带 ETag 的响应，If-None-Match 匹配时返回 304"""
+    headers = {"etag": etag, "cache-control": cache_control}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag, weak=True):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,287 @@
+"""
+RSA 密钥管理（加密登录）
+
+密钥保存在 RSA_KEY_DIR 中，每个密钥一个 PEM 文件（rsa-<创建时间>-<密钥ID>.pem），
+同一目录供所有 worker 共享：应用启动时加载，目录中没有密钥或最新密钥超过 RSA_KEY_ROTATION_DAYS
+时，在锁文件保护下生成新密钥，多个 worker 同时启动也只会生成一个。
+轮换后旧密钥在 RSA_KEY_OVERLAP_HOURS 内仍可解密，兼容缓存了旧公钥的客户端（前端缓存公钥 24 小时）。
+后台任务定期在线程中检查密钥目录（到期轮换、加载其他 worker 轮换的新密钥），解密失败时也会重新加载；
+请求处理中读取当前密钥不访问磁盘，也不会在事件循环中生成密钥或等待目录锁。
+
+设置 RSA_PRIVATE_KEY 时只使用该密钥，不读写密钥目录。
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_SIZE = 2048
+KEY_PREFIX = "rsa-"
+KEY_SUFFIX = ".pem"
+LOCK_NAME = ".lock"
+
+# 后台检查密钥目录（轮换、加载其他 worker 轮换的密钥）的间隔（秒）
+REFRESH_INTERVAL_SECONDS = 60
+# 锁文件超过该时间视为持有者已退出（秒）
+LOCK_STALE_SECONDS = 30
+LOCK_TIMEOUT_SECONDS = 60
+
+OAEP_PADDING = padding.OAEP(
+    mgf=padding.MGF1(algorithm=hashes.SHA256()),
+    algorithm=hashes.SHA256(),
+    label=None
+)
+
+
+@dataclass(frozen=True)
+class RSAKey:
+    """一个 RSA 密钥（公钥 PEM 预先序列化）"""
+    kid: str
+    created_at: float
+    private_key: rsa.RSAPrivateKey
+    public_key: rsa.RSAPublicKey
+    public_pem: str
+
+
+def _make_key(private_key: rsa.RSAPrivateKey, created_at: float) -> RSAKey:
+    public_key = private_key.public_key()
+    der = public_key.public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    public_pem = public_key.public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode("utf-8")
+    # 密钥ID由公钥内容决定，各 worker 计算结果一致
+    kid = hashlib.sha256(der).hexdigest()[:16]
+    return RSAKey(kid, created_at, private_key, public_key, public_pem)
+
+
+def _load_pem(data: bytes, created_at: float) -> RSAKey:
+    private_key = serialization.load_pem_private_key(data, password=None)
+    if not isinstance(private_key, rsa.RSAPrivateKey):
+        raise ValueError("不是RSA私钥")
+    return _make_key(private_key, created_at)
+
+
+def _created_at(name: str) -> Optional[int]:
+    """从文件名 rsa-<创建时间>-<密钥ID>.pem 中解析创建时间，格式不符时返回 None"""
+    if not (name.startswith(KEY_PREFIX) and name.endswith(KEY_SUFFIX)):
+        return None
+    created, _, _ = name[len(KEY_PREFIX):-len(KEY_SUFFIX)].partition("-")
+    return int(created) if created.isdigit() else None
+
+
+@contextmanager
+def _dir_lock(key_dir: str):
+    """跨进程互斥（以独占方式创建锁文件，兼容不支持 fcntl 的平台）"""
+    path = os.path.join(key_dir, LOCK_NAME)
+    deadline = time.monotonic() + LOCK_TIMEOUT_SECONDS
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > LOCK_STALE_SECONDS:
+                    os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"等待密钥目录锁超时: {path}")
+            time.sleep(0.05)
+    os.close(fd)
+    try:
+        yield
+    finally:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class KeyRing:
+    """当前密钥与轮换重叠期内仍可解密的旧密钥（线程安全）"""
+
+    def __init__(self, key_dir: str, rotation_seconds: float, overlap_seconds: float, private_key_pem: str = ""):
+        self.key_dir = key_dir
+        self.rotation_seconds = rotation_seconds
+        self.overlap_seconds = overlap_seconds
+        self.private_key_pem = private_key_pem
+        self._keys: List[RSAKey] = []  # 按创建时间降序，第一个为当前密钥
+        self._loaded: Dict[str, RSAKey] = {}  # 文件名 -> 密钥
+        self._lock = threading.Lock()
+
+    def load(self):
+        """加载密钥，需要时生成或轮换（在应用启动时调用）"""
+        with self._lock:
+            self._sync()
+
+    def current(self) -> RSAKey:
+        """当前用于加密的密钥（只读取内存中的密钥；尚未加载时先加载）"""
+        if not self._keys:
+            self.load()
+        return self._keys[0]
+
+    def keys(self) -> List[RSAKey]:
+        """所有可用于解密的密钥（当前密钥在前）"""
+        self.current()
+        return list(self._keys)
+
+    def rotate(self) -> RSAKey:
+        """立即生成新密钥，旧密钥进入重叠期"""
+        if self.private_key_pem:
+            raise RuntimeError("使用 RSA_PRIVATE_KEY 时不支持轮换")
+        with self._lock:
+            os.makedirs(self.key_dir, exist_ok=True)
+            with _dir_lock(self.key_dir):
+                self._generate()
+            self._sync()
+        return self._keys[0]
+
+    def decrypt(self, ciphertext: bytes, kid: Optional[str] = None) -> bytes:
+        """解密 RSA-OAEP(SHA-256) 密文
+
+        指定 kid 时只使用该密钥，否则依次尝试可用的密钥；都无法解密时重新检查密钥目录后再试一次，
+        仍失败则抛出 ValueError。
+        """
+        tried = set()
+        for reload in (False, True):
+            if reload:
+                with self._lock:
+                    self._sync()
+            for key in self.keys():
+                if key.kid in tried or (kid and key.kid != kid):
+                    continue
+                tried.add(key.kid)
+                try:
+                    return key.private_key.decrypt(ciphertext, OAEP_PADDING)
+                except ValueError:
+                    continue
+        if kid and kid not in tried:
+            raise ValueError("密钥已过期，请重新获取公钥")
+        raise ValueError("无法解密")
+
+    def _sync(self):
+        """重新读取密钥目录（调用方持有 self._lock）"""
+        if self.private_key_pem:
+            if not self._keys:
+                self._keys = [_load_pem(self.private_key_pem.encode(), 0.0)]
+            return
+
+        os.makedirs(self.key_dir, exist_ok=True)
+        if self._needs_key(self._list()):
+            with _dir_lock(self.key_dir):
+                # 获得锁后再次检查，其他 worker 可能已经生成
+                if self._needs_key(self._list()):
+                    self._generate()
+                self._prune(self._list())
+
+        names = self._list()
+        loaded = {}
+        for name in names:
+            key = self._loaded.get(name)
+            if key is None:
+                with open(os.path.join(self.key_dir, name), "rb") as f:
+                    key = _load_pem(f.read(), _created_at(name))
+            loaded[name] = key
+        self._loaded = loaded
+        keys = [loaded[name] for name in names]
+        now = time.time()
+        # 旧密钥在其后一个密钥创建后的重叠期内有效
+        self._keys = [keys[0]] + [
+            key for newer, key in zip(keys, keys[1:])
+            if newer.created_at + self.overlap_seconds > now
+        ]
+
+    def _list(self) -> List[str]:
+        """密钥文件名，按创建时间降序"""
+        names = [name for name in os.listdir(self.key_dir) if _created_at(name) is not None]
+        return sorted(names, key=lambda name: (_created_at(name), name), reverse=True)
+
+    def _needs_key(self, names: List[str]) -> bool:
+        if not names:
+            return True
+        return self.rotation_seconds > 0 and time.time() - _created_at(names[0]) >= self.rotation_seconds
+
+    def _generate(self):
+        """生成新密钥并写入密钥目录（调用方持有目录锁）"""
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=KEY_SIZE)
+        # 保证新密钥的创建时间晚于已有密钥（文件名按创建时间排序）
+        names = self._list()
+        created_at = max(int(time.time()), _created_at(names[0]) + 1 if names else 0)
+        key = _make_key(private_key, created_at)
+        pem = private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+        path = os.path.join(self.key_dir, f"{KEY_PREFIX}{created_at}-{key.kid}{KEY_SUFFIX}")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(pem)
+        os.replace(tmp_path, path)
+
+    def _prune(self, names: List[str]):
+        """删除重叠期已过的旧密钥文件（调用方持有目录锁）"""
+        now = time.time()
+        for newer, name in zip(names, names[1:]):
+            if _created_at(newer) + self.overlap_seconds <= now:
+                try:
+                    os.remove(os.path.join(self.key_dir, name))
+                except FileNotFoundError:
+                    pass
+
+
+key_ring = KeyRing(
+    key_dir=settings.RSA_KEY_DIR,
+    rotation_seconds=settings.RSA_KEY_ROTATION_DAYS * 86400,
+    overlap_seconds=settings.RSA_KEY_OVERLAP_HOURS * 3600,
+    private_key_pem=settings.RSA_PRIVATE_KEY,
+)
+
+
+_refresh_task: Optional[asyncio.Task] = None
+
+
+async def _refresh_loop():
+    while True:
+        await asyncio.sleep(REFRESH_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(key_ring.load)
+        except Exception:
+            logger.exception("检查RSA密钥目录失败")
+
+
+def start_key_refresher():
+    """启动定期检查密钥目录的后台任务（在应用启动时调用）"""
+    global _refresh_task
+    if _refresh_task is None and not key_ring.private_key_pem:
+        _refresh_task = asyncio.create_task(_refresh_loop())
+
+
+async def stop_key_refresher():
+    """停止后台任务（在应用关闭时调用）"""
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
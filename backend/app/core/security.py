@@ -1,84 +1,48 @@
 """
 安全相关工具函数
 """
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import jwt
 from passlib.context import CryptContext
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
-from cryptography.hazmat.primitives import serialization, hashes
-from cryptography.hazmat.backends import default_backend
+import asyncio
 import base64
-import os
 
 from app.core.config import settings
+from app.core.metrics import timed
+from app.core.rsa_keys import key_ring
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-# RSA密钥对（单例模式）
-_rsa_private_key = None
-_rsa_public_key = None
+# 密码哈希进程池（延迟创建）及当前排队任务数
+_hash_executor: Optional[ProcessPoolExecutor] = None
+_hash_pending = 0
+
+
+class PasswordHasherBusyError(RuntimeError):
+    """密码哈希进程池已饱和"""
 
 
 def get_rsa_keys():
-    """获取或生成RSA密钥对"""
-    global _rsa_private_key, _rsa_public_key
-    
-    if _rsa_private_key is None or _rsa_public_key is None:
-        # 尝试从环境变量或文件加载密钥
-        private_key_pem = os.getenv("RSA_PRIVATE_KEY")
-        public_key_pem = os.getenv("RSA_PUBLIC_KEY")
-        
-        if private_key_pem and public_key_pem:
-            # 从环境变量加载
-            _rsa_private_key = serialization.load_pem_private_key(
-                private_key_pem.encode(),
-                password=None,
-                backend=default_backend()
-            )
-            _rsa_public_key = serialization.load_pem_public_key(
-                public_key_pem.encode(),
-                backend=default_backend()
-            )
-        else:
-            # 生成新的密钥对
-            _rsa_private_key = rsa.generate_private_key(
-                public_exponent=65537,
-                key_size=2048,
-                backend=default_backend()
-            )
-            _rsa_public_key = _rsa_private_key.public_key()
-    
-    return _rsa_private_key, _rsa_public_key
+    """获取当前RSA密钥对（私钥, 公钥）"""
+    key = key_ring.current()
+    return key.private_key, key.public_key
 
 
 def get_public_key_pem() -> str:
-    """获取公钥的PEM格式字符串"""
-    _, public_key = get_rsa_keys()
-    public_key_pem = public_key.public_bytes(
-        encoding=serialization.Encoding.PEM,
-        format=serialization.PublicFormat.SubjectPublicKeyInfo
-    )
-    return public_key_pem.decode('utf-8')
+    """获取当前公钥的PEM格式字符串（已缓存，不重复序列化）"""
+    return key_ring.current().public_pem
 
 
-def decrypt_password(encrypted_password: str) -> str:
-    """使用RSA私钥解密密码"""
+def decrypt_password(encrypted_password: str, key_id: Optional[str] = None) -> str:
+    """使用RSA私钥解密密码（key_id 为客户端加密时使用的密钥ID，可省略）"""
     try:
-        private_key, _ = get_rsa_keys()
-        
         # Base64解码
         encrypted_bytes = base64.b64decode(encrypted_password)
         
         # RSA解密
-        decrypted_bytes = private_key.decrypt(
-            encrypted_bytes,
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None
-            )
-        )
+        decrypted_bytes = key_ring.decrypt(encrypted_bytes, key_id)
         
         # 转换为字符串
         return decrypted_bytes.decode('utf-8')
@@ -86,6 +50,12 @@ def decrypt_password(encrypted_password: str) -> str:
         raise ValueError(f"密码解密失败: {str(e)}")
 
 
+async def decrypt_password_async(encrypted_password: str, key_id: Optional[str] = None) -> str:
+    """解密密码（在线程池中执行，不阻塞事件循环）"""
+    with timed("rsa_decrypt"):
+        return await asyncio.to_thread(decrypt_password, encrypted_password, key_id)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """验证密码"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -96,6 +66,52 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def get_hash_executor() -> ProcessPoolExecutor:
+    """获取密码哈希进程池"""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ProcessPoolExecutor(max_workers=max(1, settings.PASSWORD_HASH_WORKERS))
+    return _hash_executor
+
+
+def shutdown_hash_executor():
+    """关闭密码哈希进程池"""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+
+async def _run_in_hash_executor(func, *args):
+    """在哈希进程池中执行任务，排队已满时立即抛出 PasswordHasherBusyError"""
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHasherBusyError("密码哈希任务过多，请稍后重试")
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        # 耗时包含排队等待进程池的时间
+        with timed("password_hash"):
+            return await loop.run_in_executor(get_hash_executor(), func, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """验证密码（在哈希进程池中执行）"""
+    return await _run_in_hash_executor(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """获取密码哈希（在哈希进程池中执行）"""
+    return await _run_in_hash_executor(get_password_hash, password)
+
+
+def hash_executor_stats() -> dict:
+    """密码哈希进程池统计信息"""
+    return {"pending": _hash_pending, "max_pending": settings.PASSWORD_HASH_MAX_PENDING}
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """创建访问令牌"""
     to_encode = data.copy()
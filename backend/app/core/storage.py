@@ -0,0 +1,168 @@
+"""
+上传文件存储
+
+分块上传的数据以追加方式流式写入 UPLOAD_DIR/tmp/<upload_id>.part，边写边计算 SHA-256，
+单个请求占用的内存只与网络分块大小有关，与文件大小无关。
+完成的文件按内容的 SHA-256 存入 UPLOAD_DIR/blobs/ 下的分级目录，相同内容只保存一份。
+数据库中保存的 file_path 均为相对 UPLOAD_DIR 的路径。
+"""
+import asyncio
+import hashlib
+import os
+from typing import AsyncIterator, Dict, Tuple
+
+import aiofiles
+import aiofiles.os
+
+from app.core.config import settings
+
+# 重新计算哈希时每次读取的字节数
+HASH_READ_SIZE = 1024 * 1024
+
+# 进程内的增量哈希状态：upload_id -> (已计算的字节数, sha256对象)
+_hashers: Dict[str, Tuple[int, "hashlib._Hash"]] = {}
+# 同一上传会话的写入互斥锁
+_locks: Dict[str, asyncio.Lock] = {}
+
+
+class UploadSizeExceededError(ValueError):
+    """写入的数据超过声明的文件大小"""
+
+
+def upload_root() -> str:
+    """上传根目录（绝对路径）"""
+    return os.path.abspath(settings.UPLOAD_DIR)
+
+
+def resolve_path(relative_path: str) -> str:
+    """将数据库中保存的相对路径转换为绝对路径"""
+    return os.path.join(upload_root(), relative_path)
+
+
+def partial_path(upload_id: str) -> str:
+    """上传中的临时文件路径"""
+    return os.path.join(upload_root(), "tmp", f"{upload_id}.part")
+
+
+def blob_path(sha256: str) -> str:
+    """内容寻址存储的相对路径：blobs/ab/cd/abcd...（按哈希前缀分两级目录，避免单目录文件过多）"""
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def derived_dir(sha256: str) -> str:
+    """由内容生成的衍生文件（缩略图、封面）目录的相对路径"""
+    return f"derived/{sha256[:2]}/{sha256}"
+
+
+def upload_lock(upload_id: str) -> asyncio.Lock:
+    """获取上传会话的写入锁"""
+    return _locks.setdefault(upload_id, asyncio.Lock())
+
+
+async def received_size(upload_id: str) -> int:
+    """已写入磁盘的字节数（以磁盘上的临时文件为准，进程重启或多进程时同样可靠）"""
+    try:
+        return (await aiofiles.os.stat(partial_path(upload_id))).st_size
+    except FileNotFoundError:
+        return 0
+
+
+async def hash_file(path: str, limit: int = -1) -> "hashlib._Hash":
+    """流式计算文件（前 limit 字节）的 SHA-256"""
+    hasher = hashlib.sha256()
+    remaining = limit
+    async with aiofiles.open(path, "rb") as f:
+        while remaining != 0:
+            size = HASH_READ_SIZE if remaining < 0 else min(HASH_READ_SIZE, remaining)
+            data = await f.read(size)
+            if not data:
+                break
+            hasher.update(data)
+            remaining -= len(data) if remaining > 0 else 0
+    return hasher
+
+
+async def _get_hasher(upload_id: str, offset: int) -> "hashlib._Hash":
+    """获取与已写入数据一致的增量哈希对象，状态丢失时从临时文件重新计算"""
+    state = _hashers.get(upload_id)
+    if state is not None and state[0] == offset:
+        return state[1]
+    if offset == 0:
+        return hashlib.sha256()
+    return await hash_file(partial_path(upload_id), offset)
+
+
+async def append_chunks(upload_id: str, offset: int, chunks: AsyncIterator[bytes], max_size: int) -> int:
+    """将数据流追加写入临时文件，返回写入后的总字节数
+    
+    调用方需持有 upload_lock(upload_id)，并保证 offset 等于 received_size(upload_id)。
+    超过 max_size 时抛出 UploadSizeExceededError，已写入的部分保留（可从新的偏移量继续）。
+    """
+    path = partial_path(upload_id)
+    await aiofiles.os.makedirs(os.path.dirname(path), exist_ok=True)
+    hasher = await _get_hasher(upload_id, offset)
+    try:
+        async with aiofiles.open(path, "ab") as f:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                if offset + len(chunk) > max_size:
+                    raise UploadSizeExceededError(f"上传数据超过声明的文件大小 {max_size} 字节")
+                await f.write(chunk)
+                hasher.update(chunk)
+                offset += len(chunk)
+    finally:
+        _hashers[upload_id] = (offset, hasher)
+    return offset
+
+
+async def upload_digest(upload_id: str) -> str:
+    """已接收数据的 SHA-256（十六进制）"""
+    hasher = await _get_hasher(upload_id, await received_size(upload_id))
+    return hasher.hexdigest()
+
+
+async def store_blob(upload_id: str, sha256: str):
+    """将完成的临时文件存入内容寻址目录，内容已存在时直接丢弃临时文件
+    
+    调用方需先在数据库中提交对该内容的引用（见 app.db.blobs.acquire_blob），
+    以免与垃圾回收竞争。
+    """
+    source = partial_path(upload_id)
+    destination = resolve_path(blob_path(sha256))
+    if await aiofiles.os.path.exists(destination):
+        await aiofiles.os.remove(source)
+    else:
+        await aiofiles.os.makedirs(os.path.dirname(destination), exist_ok=True)
+        await aiofiles.os.replace(source, destination)
+    _forget(upload_id)
+
+
+async def discard_upload(upload_id: str):
+    """删除未完成的上传数据"""
+    try:
+        await aiofiles.os.remove(partial_path(upload_id))
+    except FileNotFoundError:
+        pass
+    _forget(upload_id)
+
+
+def forget_inactive_uploads() -> int:
+    """清理临时文件已不存在的上传的进程内状态，返回清理的数量
+    
+    上传完成、取消或被（其他进程的）过期清理删除后，本进程中的增量哈希与锁不再需要；
+    正在持有锁的上传不清理。
+    """
+    stale = [
+        upload_id for upload_id in set(_hashers) | set(_locks)
+        if not (upload_id in _locks and _locks[upload_id].locked())
+        and not os.path.exists(partial_path(upload_id))
+    ]
+    for upload_id in stale:
+        _forget(upload_id)
+    return len(stale)
+
+
+def _forget(upload_id: str):
+    _hashers.pop(upload_id, None)
+    _locks.pop(upload_id, None)
@@ -0,0 +1,103 @@
+"""
+已认证用户缓存
+
+缓存 token -> 用户快照（id, username, is_active），避免每个请求都查询 users 表。
+用户被修改或删除时（ORM 事件），通过代数（generation）使该用户的所有缓存条目失效。
+
+失效只发生在执行修改的进程中：多 worker 部署时，其他 worker 在缓存有效期内仍可能接受
+已被禁用或删除的用户的 token，因此有效期最长为 MAX_TTL_SECONDS。
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+# is_active 决定请求是否被接受，缓存时间不超过该值（秒），限制跨 worker 的失效延迟
+MAX_TTL_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """当前用户快照"""
+    id: int
+    username: str
+    is_active: bool
+
+
+class UserCache:
+    """token -> 用户快照 缓存"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=min(ttl, MAX_TTL_SECONDS), on_evict=self._on_evict)
+        # 用户ID -> [代数, 缓存中的条目数]，条目全部离开缓存后删除，不随用户数无限增长
+        self._users: Dict[int, List[int]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, token: str) -> Optional[CurrentUser]:
+        """读取缓存的用户快照，已失效时返回 None"""
+        entry = self._cache.get(token)
+        if entry is None:
+            return None
+        generation, user = entry
+        state = self._users.get(user.id)
+        if state is None or generation != state[0]:
+            self._cache.reject(token)
+            return None
+        return user
+    
+    def set(self, token: str, user: CurrentUser, expires_at: Optional[float] = None):
+        """缓存用户快照，expires_at 为 token 过期时间戳（不会缓存超过 token 有效期）"""
+        ttl = self._cache.ttl
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+        with self._lock:
+            state = self._users.setdefault(user.id, [0, 0])
+            state[1] += 1
+            generation = state[0]
+        self._cache.set(token, (generation, user), ttl=ttl)
+    
+    def _on_evict(self, token: str, entry: tuple):
+        """条目离开缓存时减少该用户的条目数，归零时删除代数记录"""
+        user_id = entry[1].id
+        with self._lock:
+            state = self._users.get(user_id)
+            if state is not None:
+                state[1] -= 1
+                if state[1] <= 0:
+                    del self._users[user_id]
+    
+    def invalidate_user(self, user_id: int):
+        """使指定用户的所有缓存条目失效（没有缓存条目时无需记录）"""
+        with self._lock:
+            state = self._users.get(user_id)
+            if state is not None:
+                state[0] += 1
+    
+    def clear(self):
+        """清空缓存"""
+        self._cache.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        """缓存统计信息（命中/未命中等）"""
+        return {**self._cache.stats(), "users": len(self._users)}
+
+
+user_cache = UserCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user_cache(mapper, connection, target):
+    """用户被修改（如禁用）或删除时使缓存失效"""
+    user_cache.invalidate_user(target.id)
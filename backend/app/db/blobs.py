@@ -0,0 +1,115 @@
+"""
+内容寻址存储的引用计数与垃圾回收
+
+文件与电子书记录通过 content_hash 引用 blobs 表中的内容，引用计数在创建/删除记录的
+同一事务中维护：创建时由调用方执行 acquire_blob，删除时由 ORM 的 after_delete 钩子自动释放
+（任何通过会话删除记录的代码都不会漏掉）；计数归零的内容及其衍生文件由 collect_garbage 删除，
+启动时执行一次，之后由 garbage_collector 定期执行。
+"""
+import asyncio
+import shutil
+from typing import Optional
+
+import aiofiles.os
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import storage
+from app.core.config import settings
+from app.core.periodic import PeriodicTask
+from app.db.database import AsyncSessionLocal
+from app.db.upsert import dialect_insert
+from app.models.blob import Blob
+from app.models.ebook import Ebook
+from app.models.file import File
+
+# 每次垃圾回收处理的最大内容数
+GC_BATCH_SIZE = 1000
+
+
+async def acquire_blob(db: AsyncSession, sha256: str, size: int):
+    """增加内容的引用计数，内容不存在时创建记录"""
+    stmt = dialect_insert(db, Blob)
+    if stmt is not None:
+        stmt = stmt.values(sha256=sha256, size=size, ref_count=1)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[Blob.sha256],
+            set_={"ref_count": Blob.ref_count + 1}
+        ))
+        return
+    result = await db.execute(
+        update(Blob).where(Blob.sha256 == sha256).values(ref_count=Blob.ref_count + 1)
+    )
+    if not result.rowcount:
+        await db.execute(insert(Blob).values(sha256=sha256, size=size, ref_count=1))
+
+
+@event.listens_for(File, "after_delete")
+@event.listens_for(Ebook, "after_delete")
+def release_blob(mapper, connection, target):
+    """删除文件或电子书记录时减少内容的引用计数（旧数据没有 content_hash 时忽略）"""
+    if not target.content_hash:
+        return
+    connection.execute(
+        update(Blob).where(Blob.sha256 == target.content_hash).values(ref_count=Blob.ref_count - 1)
+    )
+
+
+async def collect_garbage() -> int:
+    """删除引用计数归零的内容及其衍生文件（缩略图、封面），返回删除的数量
+    
+    每个内容先将磁盘文件与衍生目录改名隔离，再按条件删除记录：若期间有新的上传引用了该内容
+    （计数已不为零），则删除失败并恢复文件，因此不会误删正在被引用的内容。
+    """
+    async with AsyncSessionLocal() as db:
+        candidates = (await db.scalars(
+            select(Blob.sha256).where(Blob.ref_count <= 0).limit(GC_BATCH_SIZE)
+        )).all()
+    
+    collected = 0
+    for sha256 in candidates:
+        path = storage.resolve_path(storage.blob_path(sha256))
+        derived = storage.resolve_path(storage.derived_dir(sha256))
+        quarantined = await _quarantine(path)
+        quarantined_derived = await _quarantine(derived)
+        
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                delete(Blob).where(Blob.sha256 == sha256, Blob.ref_count <= 0)
+            )
+            await db.commit()
+        
+        if result.rowcount:
+            collected += 1
+            if quarantined is not None:
+                await aiofiles.os.remove(quarantined)
+            if quarantined_derived is not None:
+                await asyncio.to_thread(shutil.rmtree, quarantined_derived, True)
+        else:
+            if quarantined is not None:
+                await aiofiles.os.replace(quarantined, path)
+            if quarantined_derived is not None:
+                await _restore_dir(quarantined_derived, derived)
+    return collected
+
+
+async def _quarantine(path: str) -> Optional[str]:
+    """将文件或目录改名为 <path>.gc，不存在时返回 None"""
+    quarantined = path + ".gc"
+    try:
+        await aiofiles.os.replace(path, quarantined)
+    except FileNotFoundError:
+        return None
+    return quarantined
+
+
+async def _restore_dir(quarantined: str, path: str):
+    """恢复隔离的衍生目录（期间已重新生成时丢弃隔离的副本）"""
+    try:
+        await aiofiles.os.replace(quarantined, path)
+    except OSError:
+        await asyncio.to_thread(shutil.rmtree, quarantined, True)
+
+
+# 定期回收（启动时先执行一次，之后每 BLOB_GC_INTERVAL_SECONDS 秒执行）
+garbage_collector = PeriodicTask("blob_gc", collect_garbage, settings.BLOB_GC_INTERVAL_SECONDS)
@@ -0,0 +1,216 @@
+"""
+计数器批量写入（write-behind）
+
+浏览次数、下载次数等高频计数先在进程内累加，由后台任务按固定间隔或在累积的行数达到阈值时
+合并写入数据库：每批只执行一条 UPDATE（SET c = c + CASE id WHEN ... END），
+行按主键顺序更新，多进程同时刷新时不会互相死锁。计数写入不会触发 updated_at 等 onupdate 默认值。进程异常退出时最多丢失一个刷新周期内的增量，
+正常关闭时由 lifespan 写入剩余增量。
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, update
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.blog import Blog
+from app.models.file import File
+from app.models.news import News
+
+logger = logging.getLogger(__name__)
+
+# 每条 UPDATE 语句包含的最大行数
+FLUSH_BATCH_SIZE = 500
+
+
+class _Shard:
+    __slots__ = ("pending", "lock")
+
+    def __init__(self):
+        self.pending: Counter = Counter()
+        self.lock = threading.Lock()
+
+
+class CounterBuffer:
+    """按主键累加某一整数列的增量，定期批量写入
+
+    增量分散在多个分片中，每个分片一把锁，高并发累加时减少锁竞争。
+    """
+
+    def __init__(self, column: InstrumentedAttribute, shards: int = 16):
+        self.column = column
+        self.name = f"{column.class_.__tablename__}.{column.key}"
+        self.table = column.class_.__table__
+        # 显式保留带 onupdate 默认值的列（如 updated_at），计数写入不算修改记录
+        self._unchanged = {c: c for c in self.table.c if c.onupdate is not None}
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._flush_lock = asyncio.Lock()
+        # 统计信息
+        self.flushed_rows = 0
+        self.flushed_delta = 0
+        self.flushes = 0
+        self.failures = 0
+        self.last_flush_duration = 0.0
+
+    def _shard(self, key: int) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def incr(self, key: int, amount: int = 1):
+        """累加增量（不访问数据库），累积行数达到阈值时唤醒刷新任务"""
+        shard = self._shard(key)
+        with shard.lock:
+            shard.pending[key] += amount
+            size = len(shard.pending)
+        # 以单个分片的行数估算总行数，避免每次累加都遍历所有分片
+        if size * len(self._shards) >= settings.COUNTER_FLUSH_THRESHOLD:
+            _request_flush()
+
+    def pending_keys(self) -> int:
+        """尚未写入数据库的行数"""
+        return sum(len(shard.pending) for shard in self._shards)
+
+    def pending(self) -> int:
+        """尚未写入数据库的增量总数"""
+        total = 0
+        for shard in self._shards:
+            with shard.lock:
+                total += sum(shard.pending.values())
+        return total
+
+    def _drain(self) -> Dict[int, int]:
+        drained: Dict[int, int] = {}
+        for shard in self._shards:
+            with shard.lock:
+                pending, shard.pending = shard.pending, Counter()
+            drained.update((key, delta) for key, delta in pending.items() if delta)
+        return drained
+
+    def _restore(self, pending: Dict[int, int]):
+        for key, delta in pending.items():
+            shard = self._shard(key)
+            with shard.lock:
+                shard.pending[key] += delta
+
+    async def flush(self) -> int:
+        """将累积的增量写入数据库，返回更新的行数；写入失败时增量保留到下次刷新"""
+        async with self._flush_lock:
+            pending = self._drain()
+            if not pending:
+                return 0
+
+            started = time.perf_counter()
+            primary_key = self.table.primary_key.columns.values()[0]
+            column = self.table.c[self.column.key]
+            keys = sorted(pending)
+            try:
+                async with AsyncSessionLocal() as db:
+                    for start in range(0, len(keys), FLUSH_BATCH_SIZE):
+                        batch: List[int] = keys[start:start + FLUSH_BATCH_SIZE]
+                        await db.execute(
+                            update(self.table)
+                            .where(primary_key.in_(batch))
+                            .values({
+                                **self._unchanged,
+                                column: column + case({key: pending[key] for key in batch}, value=primary_key),
+                            })
+                        )
+                    await db.commit()
+            except BaseException:
+                # 包括刷新任务被取消的情况，增量放回缓冲区由关闭时的最后一次刷新写入
+                self.failures += 1
+                self._restore(pending)
+                raise
+            self.flushes += 1
+            self.flushed_rows += len(pending)
+            self.flushed_delta += sum(pending.values())
+            self.last_flush_duration = time.perf_counter() - started
+            return len(pending)
+
+    def stats(self) -> Dict[str, float]:
+        """计数器统计信息（含尚未写入的增量）"""
+        return {
+            "pending_keys": self.pending_keys(),
+            "pending_delta": self.pending(),
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "flushed_delta": self.flushed_delta,
+            "failures": self.failures,
+            "last_flush_seconds": round(self.last_flush_duration, 6),
+        }
+
+
+# 文件下载次数、新闻与博客浏览次数
+download_counts = CounterBuffer(File.download_count, shards=settings.COUNTER_SHARDS)
+news_view_counts = CounterBuffer(News.view_count, shards=settings.COUNTER_SHARDS)
+blog_view_counts = CounterBuffer(Blog.view_count, shards=settings.COUNTER_SHARDS)
+
+_COUNTERS = (download_counts, news_view_counts, blog_view_counts)
+_flush_task: Optional[asyncio.Task] = None
+_flush_requested: Optional[asyncio.Event] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _request_flush():
+    """唤醒刷新任务（可在线程池中的同步代码里调用）"""
+    if _loop is None or _flush_requested is None:
+        return
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is _loop:
+        _flush_requested.set()
+    else:
+        _loop.call_soon_threadsafe(_flush_requested.set)
+
+
+def counter_stats() -> Dict[str, Dict[str, float]]:
+    """所有计数器的统计信息"""
+    return {counter.name: counter.stats() for counter in _COUNTERS}
+
+
+async def _flush_all():
+    for counter in _COUNTERS:
+        try:
+            await counter.flush()
+        except Exception:
+            logger.exception("计数器写入失败：%s", counter.name)
+
+
+async def _flush_loop():
+    while True:
+        try:
+            await asyncio.wait_for(_flush_requested.wait(), timeout=settings.COUNTER_FLUSH_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _flush_requested.clear()
+        await _flush_all()
+
+
+def start_counter_flusher():
+    """启动后台刷新任务（在应用启动时调用）"""
+    global _flush_task, _flush_requested, _loop
+    if _flush_task is None:
+        _loop = asyncio.get_running_loop()
+        _flush_requested = asyncio.Event()
+        _flush_task = asyncio.create_task(_flush_loop())
+
+
+async def stop_counter_flusher():
+    """停止后台任务并写入剩余增量（在应用关闭时调用）"""
+    global _flush_task, _flush_requested, _loop
+    if _flush_task is not None:
+        _flush_task.cancel()
+        try:
+            await _flush_task
+        except asyncio.CancelledError:
+            pass
+        _flush_task = None
+    _flush_requested = None
+    _loop = None
+    await _flush_all()
@@ -1,21 +1,126 @@
 """
 数据库连接和初始化
 """
-from sqlalchemy import create_engine, inspect
+import itertools
+import os
+from typing import Dict
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.metrics import after_cursor_execute, before_cursor_execute, handle_error
+from app.db.sqlite import configure_sqlite_engine
+
+# Alembic 配置所在目录（backend/）
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 首个迁移版本：引入迁移前由 create_all 创建的数据库对应此版本
+BASELINE_REVISION = "0001"
+
+# 同步驱动 -> 异步驱动 的映射
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """将同步数据库URL转换为对应的异步驱动URL"""
+    url = make_url(database_url)
+    async_driver = _ASYNC_DRIVERS.get(url.drivername)
+    if async_driver:
+        url = url.set(drivername=async_driver)
+    return url.render_as_string(hide_password=False)
+
+
+def is_sqlite_file(database_url: str) -> bool:
+    """是否为 SQLite 文件数据库（不含内存数据库）"""
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def get_engine_options(database_url: str, is_async: bool = False) -> dict:
+    """连接池参数
+    
+    SQLite 的同步引擎使用 SQLAlchemy 的默认连接池；开启 SQLITE_OPTIMIZE 时异步引擎使用连接池
+    （aiosqlite 默认不复用连接）。
+    """
+    if make_url(database_url).get_backend_name() == "sqlite":
+        if is_async and settings.SQLITE_OPTIMIZE and is_sqlite_file(database_url):
+            return {
+                "poolclass": AsyncAdaptedQueuePool,
+                "pool_size": settings.DB_POOL_SIZE,
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+            }
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
 
 # 创建数据库引擎
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
+    **get_engine_options(settings.DATABASE_URL)
 )
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 创建异步数据库引擎（供请求处理路径使用，不阻塞事件循环）
+async_engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    **get_engine_options(settings.DATABASE_URL, is_async=True)
+)
+
+# 只读副本引擎（未配置时为空，读请求使用主库）
+read_engines = [
+    create_async_engine(get_async_database_url(url), **get_engine_options(url, is_async=True))
+    for url in settings.database_read_replica_urls
+]
+
+# SQLite 生产模式：设置 PRAGMA，主库异步引擎的写事务串行执行
+if settings.SQLITE_OPTIMIZE:
+    if is_sqlite_file(settings.DATABASE_URL):
+        configure_sqlite_engine(engine)
+        configure_sqlite_engine(async_engine.sync_engine, serialize_writes=True)
+    for _url, _read_engine in zip(settings.database_read_replica_urls, read_engines):
+        if is_sqlite_file(_url):
+            configure_sqlite_engine(_read_engine.sync_engine)
+
+# 统计每个请求执行的 SQL 语句数与耗时（失败的语句由 handle_error 记录）
+for _engine in (engine, async_engine.sync_engine, *(e.sync_engine for e in read_engines)):
+    event.listen(_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(_engine, "handle_error", handle_error)
+
+# 创建异步会话工厂
+# expire_on_commit=False：提交后仍可直接读取对象属性，避免异步上下文中的隐式懒加载
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+_read_session_factories = [
+    async_sessionmaker(bind=e, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    for e in read_engines
+] or [AsyncSessionLocal]
+_read_session_cycle = itertools.cycle(_read_session_factories)
+
 # 创建基础模型类
 Base = declarative_base()
 
@@ -29,23 +134,83 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """获取异步数据库会话"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def read_session() -> AsyncSession:
+    """创建只读会话（配置了只读副本时轮流使用各副本，否则使用主库）"""
+    return next(_read_session_cycle)()
+
+
+async def get_read_db():
+    """获取只读数据库会话
+    
+    仅用于不写入数据的接口。副本存在复制延迟，刚写入的数据可能稍后才能读到。
+    """
+    async with read_session() as db:
+        yield db
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    """各异步引擎的连接池统计（仅统计使用队列连接池的引擎）"""
+    engines = [("primary", async_engine)] + [(f"replica_{i}", e) for i, e in enumerate(read_engines)]
+    stats = {}
+    for name, async_eng in engines:
+        pool = async_eng.pool
+        if hasattr(pool, "checkedout"):
+            stats[name] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+    return stats
+
+
+async def dispose_engines():
+    """释放主库与只读副本的连接池（在应用关闭时调用）"""
+    await async_engine.dispose()
+    for read_engine in read_engines:
+        await read_engine.dispose()
+
+
 def is_database_initialized() -> bool:
     """检查数据库是否已初始化（通过核心表是否存在判断）"""
     inspector = inspect(engine)
     return inspector.has_table("users")
 
 
+def get_alembic_config():
+    """获取 Alembic 迁移配置"""
+    from alembic.config import Config
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    # 应用内执行迁移时不覆盖应用的日志配置
+    config.attributes["configure_logger"] = False
+    return config
+
+
 def init_db() -> bool:
-    """首次初始化数据库表，已初始化则跳过
+    """执行数据库迁移，将表结构升级到最新版本
+    
+    引入迁移前由 create_all 创建的数据库没有版本记录，会先标记为初始版本再升级，
+    使新增的索引等变更同样应用到已有数据库。
     
     返回值:
-        True  - 本次调用进行了初始化（首次）
-        False - 数据库已初始化（未做任何操作）
+        True  - 本次调用创建了表结构（首次）
+        False - 数据库已初始化（仅执行了待应用的迁移）
     """
-    if is_database_initialized():
-        return False
-    # 导入所有模型，确保它们被注册
-    from app.models import user, problem, blog, ebook, file, news  # noqa
-    # 创建所有表（仅首次）
-    Base.metadata.create_all(bind=engine)
-    return True
+    from alembic import command
+    from alembic.runtime.migration import MigrationContext
+    
+    first_time = not is_database_initialized()
+    config = get_alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        if not first_time and MigrationContext.configure(connection).get_current_revision() is None:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
+    return first_time
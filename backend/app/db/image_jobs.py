@@ -0,0 +1,191 @@
+"""
+图片处理任务队列
+
+上传完成时在同一事务中写入 image_jobs 记录，后台工作协程从表中领取任务，
+在独立进程池中生成缩略图与电子书封面。任务状态保存在数据库中，
+领取任务时记录租约起点 claimed_at，租约过期仍未完成的任务（处理它的进程已退出）会被重新领取。
+"""
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import images, storage
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.ebook import Ebook
+from app.models.image_job import ImageJob
+
+logger = logging.getLogger(__name__)
+
+# 图片处理进程池（延迟创建）、工作协程及新任务通知
+_image_executor: Optional[ProcessPoolExecutor] = None
+_workers: List[asyncio.Task] = []
+_wakeup: Optional[asyncio.Event] = None
+
+
+def image_url(content_hash: str, width: int, fmt: str = "webp") -> str:
+    """衍生图片的访问地址"""
+    return f"/api/v1/images/{content_hash}/{images.variant_name(width, fmt)}"
+
+
+def get_image_executor() -> ProcessPoolExecutor:
+    """获取图片处理进程池"""
+    global _image_executor
+    if _image_executor is None:
+        _image_executor = ProcessPoolExecutor(max_workers=max(1, settings.IMAGE_WORKERS))
+    return _image_executor
+
+
+async def enqueue_image_job(
+    db: AsyncSession,
+    kind: str,
+    content_hash: str,
+    source_path: str,
+    resource: str,
+    resource_id: int,
+):
+    """添加图片处理任务（随调用方的事务提交，提交后调用 notify_image_worker 立即处理）"""
+    db.add(ImageJob(
+        kind=kind,
+        content_hash=content_hash,
+        source_path=source_path,
+        resource=resource,
+        resource_id=resource_id,
+        status="pending",
+        attempts=0
+    ))
+
+
+def notify_image_worker():
+    """唤醒空闲的工作协程"""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+def _claimable(cutoff: datetime):
+    """待处理任务，或租约已过期的处理中任务（无领取时间的视为已过期）"""
+    return or_(
+        ImageJob.status == "pending",
+        and_(
+            ImageJob.status == "running",
+            or_(ImageJob.claimed_at.is_(None), ImageJob.claimed_at < cutoff)
+        )
+    )
+
+
+async def _claim_job() -> Optional[ImageJob]:
+    """领取一个待处理任务（条件更新保证多进程下同一任务只被领取一次）"""
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(seconds=settings.IMAGE_JOB_LEASE_SECONDS)
+    async with AsyncSessionLocal() as db:
+        candidates = (await db.scalars(
+            select(ImageJob)
+            .where(_claimable(cutoff))
+            .order_by(ImageJob.id)
+            .limit(settings.IMAGE_WORKERS * 2)
+        )).all()
+        for job in candidates:
+            if job.attempts >= settings.IMAGE_JOB_MAX_ATTEMPTS:
+                # 租约过期且已达到最大尝试次数（每次处理都使进程退出）的任务不再重试
+                values = {"status": "failed", "error": "处理超时或进程退出"}
+            else:
+                values = {"status": "running", "attempts": ImageJob.attempts + 1, "claimed_at": now}
+            result = await db.execute(
+                update(ImageJob)
+                .where(ImageJob.id == job.id, _claimable(cutoff))
+                .values(**values)
+                # 不在内存中求值条件（SQLite 读出的时间不带时区，无法与 cutoff 比较）
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            if result.rowcount and values["status"] == "running":
+                return job
+    return None
+
+
+async def _run_job(job: ImageJob):
+    """执行任务并记录结果"""
+    loop = asyncio.get_running_loop()
+    source = storage.resolve_path(job.source_path)
+    dest_dir = storage.resolve_path(storage.derived_dir(job.content_hash))
+    widths = settings.image_thumbnail_widths
+    
+    async with AsyncSessionLocal() as db:
+        try:
+            if job.kind == "ebook_cover":
+                ebook = await db.get(Ebook, job.resource_id)
+                file_type = ebook.file_type if ebook else ""
+                names = await loop.run_in_executor(
+                    get_image_executor(), images.extract_ebook_cover, source, file_type, dest_dir, widths
+                )
+                if names:
+                    # 仅在用户未设置封面时使用提取的封面
+                    await db.execute(
+                        update(Ebook)
+                        .where(Ebook.id == job.resource_id, Ebook.cover_image.is_(None))
+                        .values(cover_image=image_url(job.content_hash, widths[len(widths) // 2]))
+                    )
+            else:
+                await loop.run_in_executor(
+                    get_image_executor(), images.generate_thumbnails, source, dest_dir, widths
+                )
+            values = {"status": "done", "error": None}
+        except Exception as e:
+            logger.warning("图片处理任务 %s 失败：%s", job.id, e)
+            retry = job.attempts + 1 < settings.IMAGE_JOB_MAX_ATTEMPTS
+            values = {"status": "pending" if retry else "failed", "error": str(e)[:1000]}
+        await db.execute(update(ImageJob).where(ImageJob.id == job.id).values(**values))
+        await db.commit()
+    return values["status"] != "pending"
+
+
+async def _worker_loop():
+    while True:
+        try:
+            job = await _claim_job()
+            if job is not None and await _run_job(job):
+                continue
+        except Exception:
+            logger.exception("图片处理队列读取失败")
+            job = None
+        if job is not None:
+            # 失败后稍后重试，避免立即重复失败
+            await asyncio.sleep(settings.IMAGE_JOB_POLL_SECONDS)
+            continue
+        _wakeup.clear()
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=settings.IMAGE_JOB_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def start_image_worker():
+    """启动图片处理工作协程（在应用启动时调用），上次退出时中断的任务在租约过期后重新领取"""
+    global _wakeup
+    if _workers:
+        return
+    _wakeup = asyncio.Event()
+    for _ in range(max(1, settings.IMAGE_WORKERS)):
+        _workers.append(asyncio.create_task(_worker_loop()))
+
+
+async def stop_image_worker():
+    """停止工作协程并关闭进程池（在应用关闭时调用）"""
+    global _image_executor, _wakeup
+    for task in _workers:
+        task.cancel()
+    for task in _workers:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    _workers.clear()
+    _wakeup = None
+    if _image_executor is not None:
+        _image_executor.shutdown(wait=False, cancel_futures=True)
+        _image_executor = None
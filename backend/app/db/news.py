@@ -0,0 +1,202 @@
+"""
+新闻入库
+
+爬虫批量推送的新闻按去重键（规范化后的 source_url，无链接时为规范化标题 + 来源）
+去重，在一个事务中以 INSERT ... ON CONFLICT 批量写入。
+"""
+import hashlib
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.tags import add_tags_bulk, parse_tags, set_tags
+from app.db.upsert import dialect_insert
+from app.models.news import News
+
+# 每条 SQL 语句处理的行数
+INGEST_BATCH_SIZE = 500
+
+# 由爬虫维护、入库时可被更新的字段（is_featured、view_count 由站内维护，更新时保留）
+CRAWLED_FIELDS = (
+    "title", "content", "summary", "source", "source_url",
+    "author", "category", "tags", "cover_image", "publish_date",
+)
+
+# 规范化链接时去除的跟踪参数
+_TRACKING_PARAMS = {"spm", "from", "ref", "fbclid", "gclid", "share_token"}
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_url(url: Optional[str]) -> str:
+    """规范化链接：忽略协议与 www.、默认端口、片段、跟踪参数、参数顺序及末尾斜杠"""
+    if not url or not url.strip():
+        return ""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/")
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    ))
+    return urlunsplit(("", host, path, query, "")).lstrip("/")
+
+
+def dedup_key(source_url: Optional[str], title: str, source: Optional[str] = None) -> str:
+    """新闻去重键（SHA-256 十六进制）"""
+    url = normalize_url(source_url)
+    if url:
+        basis = "url:" + url
+    else:
+        basis = "title:" + _WHITESPACE.sub(" ", title).strip().casefold() + "|" + (source or "").strip().casefold()
+    return hashlib.sha256(basis.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class IngestCounts:
+    """入库结果计数"""
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+
+
+async def ingest_news(db: AsyncSession, items: Sequence[dict]) -> IngestCounts:
+    """批量写入新闻（调用方负责提交事务）
+
+    同一请求内去重键相同的新闻只保留第一条；已存在且爬虫字段无变化的新闻计为跳过，
+    有变化的更新爬虫字段，其余插入；查询之后被并发请求插入的新闻计为更新。
+    """
+    counts = IngestCounts()
+    unique: Dict[str, dict] = {}
+    for item in items:
+        if isinstance(item.get("publish_date"), datetime) and item["publish_date"].tzinfo is not None:
+            # 发布时间统一以 UTC 存储（不带时区），便于跨数据库比较是否变化
+            item = {**item, "publish_date": item["publish_date"].astimezone(timezone.utc).replace(tzinfo=None)}
+        key = dedup_key(item.get("source_url"), item["title"], item.get("source"))
+        if key in unique:
+            counts.skipped += 1
+        else:
+            unique[key] = {**item, "dedup_key": key}
+
+    keys = list(unique)
+    existing: Dict[str, dict] = {}
+    for start in range(0, len(keys), INGEST_BATCH_SIZE):
+        rows = await db.execute(
+            select(News.id, News.dedup_key, *(getattr(News, f) for f in CRAWLED_FIELDS))
+            .where(News.dedup_key.in_(keys[start:start + INGEST_BATCH_SIZE]))
+        )
+        for row in rows.mappings():
+            existing[row["dedup_key"]] = dict(row)
+
+    new_rows: List[dict] = []
+    changed_rows: List[dict] = []
+    for key, row in unique.items():
+        current = existing.get(key)
+        if current is None:
+            new_rows.append(row)
+        elif any(_differs(current[f], row.get(f)) for f in CRAWLED_FIELDS):
+            changed_rows.append(row)
+        else:
+            counts.skipped += 1
+
+    stmt = dialect_insert(db, News)
+    if stmt is None:
+        await _upsert_fallback(db, new_rows + changed_rows, existing)
+        inserted = await _news_ids(db, [row["dedup_key"] for row in new_rows])
+        raced: List[dict] = []
+    else:
+        # 新行以 ON CONFLICT DO NOTHING 插入，RETURNING 只返回真正插入的行；
+        # 查询之后被并发请求写入的行不在其中，与有变化的行一起按更新处理
+        inserted = await _insert_new(db, stmt, new_rows)
+        raced = [row for row in new_rows if row["dedup_key"] not in inserted]
+        raced_ids = await _update_existing(db, stmt, changed_rows + raced)
+        for row in raced:
+            row["id"] = raced_ids[row["dedup_key"]]
+    counts.inserted = len(inserted)
+    counts.updated = len(changed_rows) + len(raced)
+
+    # 新插入的行直接写入标签关联；并发写入的行不知道原标签，由 set_tags 与数据库中的关联比较后同步
+    tagged_new = [(inserted[row["dedup_key"]], row["tags"]) for row in new_rows
+                  if row["dedup_key"] in inserted and parse_tags(row.get("tags"))]
+    if tagged_new:
+        await add_tags_bulk(db, "news", None, tagged_new)
+    for row in changed_rows:
+        current = existing[row["dedup_key"]]
+        if parse_tags(current["tags"]) != parse_tags(row.get("tags")):
+            await set_tags(db, "news", current["id"], None, row.get("tags"))
+    for row in raced:
+        await set_tags(db, "news", row["id"], None, row.get("tags"))
+    return counts
+
+
+def _new_values(row: dict) -> dict:
+    return {"view_count": 0, "is_featured": 0, **row}
+
+
+async def _insert_new(db: AsyncSession, stmt, rows: List[dict]) -> Dict[str, int]:
+    """插入新闻，已存在的跳过，返回真正插入的 {去重键: ID}"""
+    inserted: Dict[str, int] = {}
+    for start in range(0, len(rows), INGEST_BATCH_SIZE):
+        batch = rows[start:start + INGEST_BATCH_SIZE]
+        result = await db.execute(
+            stmt.on_conflict_do_nothing(index_elements=[News.dedup_key]).returning(News.dedup_key, News.id),
+            [_new_values(row) for row in batch]
+        )
+        inserted.update(result.tuples().all())
+    return inserted
+
+
+async def _update_existing(db: AsyncSession, stmt, rows: List[dict]) -> Dict[str, int]:
+    """更新已存在新闻的爬虫字段（期间被删除的重新插入），返回 {去重键: ID}"""
+    ids: Dict[str, int] = {}
+    for start in range(0, len(rows), INGEST_BATCH_SIZE):
+        batch = rows[start:start + INGEST_BATCH_SIZE]
+        result = await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[News.dedup_key],
+                set_={
+                    **{f: stmt.excluded[f] for f in CRAWLED_FIELDS},
+                    "crawl_date": func.now(),
+                    "updated_at": func.now(),
+                }
+            ).returning(News.dedup_key, News.id),
+            [_new_values(row) for row in batch]
+        )
+        ids.update(result.tuples().all())
+    return ids
+
+
+async def _news_ids(db: AsyncSession, keys: List[str]) -> Dict[str, int]:
+    ids: Dict[str, int] = {}
+    for start in range(0, len(keys), INGEST_BATCH_SIZE):
+        ids.update((await db.execute(
+            select(News.dedup_key, News.id).where(News.dedup_key.in_(keys[start:start + INGEST_BATCH_SIZE]))
+        )).tuples().all())
+    return ids
+
+
+def _differs(current, incoming) -> bool:
+    if isinstance(current, datetime) and current.tzinfo is not None:
+        # PostgreSQL 返回带时区的时间，SQLite 返回不带时区的 UTC 时间，统一后比较
+        current = current.astimezone(timezone.utc).replace(tzinfo=None)
+    return current != incoming
+
+
+async def _upsert_fallback(db: AsyncSession, batch: List[dict], existing: Dict[str, dict]):
+    """不支持 ON CONFLICT 的数据库：按是否已存在分别插入和更新"""
+    for row in batch:
+        current = existing.get(row["dedup_key"])
+        if current is None:
+            await db.execute(insert(News).values(view_count=0, is_featured=0, **row))
+        else:
+            news = await db.get(News, current["id"])
+            for f in CRAWLED_FIELDS:
+                setattr(news, f, row.get(f))
@@ -0,0 +1,177 @@
+"""
+全文搜索（题目、博客、新闻）
+
+索引由迁移 0003 创建并由数据库自身维护：
+- SQLite：FTS5 外部内容表 <table>_fts，触发器在插入/更新/删除时同步；
+- PostgreSQL：tsvector 生成列 search_vector + GIN 索引。
+
+查询分两步执行：先只按相关度排序取出当前页的 (类型, ID)，
+再仅为当前页的记录读取标题和摘要片段，避免为全部命中记录生成摘要。
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# 单次查询最多使用的关键词数量
+MAX_SEARCH_TERMS = 8
+# 摘要片段的词数
+SNIPPET_TOKENS = 16
+# 最后一个关键词达到此长度时按前缀匹配（过短的前缀会展开为大量词项）
+MIN_PREFIX_LENGTH = 3
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchUnavailableError(RuntimeError):
+    """当前数据库不支持全文搜索"""
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    """可搜索的数据源"""
+    type: str
+    table: str
+    columns: Tuple[str, ...]  # 参与索引的列（顺序与迁移中的FTS表一致）
+    weights: Tuple[float, ...]  # SQLite bm25 各列权重
+    visibility: str  # 可见性条件（表别名 t，可使用 :user_id）
+
+
+SEARCH_SOURCES: Dict[str, SearchSource] = {
+    "problem": SearchSource(
+        "problem", "problems",
+        ("title", "tags", "description", "solution"), (10.0, 5.0, 2.0, 1.0),
+        "t.user_id = :user_id",
+    ),
+    "blog": SearchSource(
+        "blog", "blogs",
+        ("title", "tags", "summary", "content"), (10.0, 5.0, 3.0, 1.0),
+        "(t.user_id = :user_id OR t.is_published)",
+    ),
+    "news": SearchSource(
+        "news", "news",
+        ("title", "tags", "summary", "content"), (10.0, 5.0, 3.0, 1.0),
+        "1 = 1",
+    ),
+}
+
+
+def is_search_index_object(name: str, type_: str) -> bool:
+    """判断数据库对象是否由搜索索引迁移维护（供 Alembic 自动生成时忽略）"""
+    if type_ == "column":
+        return name == "search_vector"
+    if type_ == "table":
+        return any(name == f"{s.table}_fts" or name.startswith(f"{s.table}_fts_")
+                   for s in SEARCH_SOURCES.values())
+    if type_ == "index":
+        return name.endswith("_search_vector")
+    return False
+
+
+def parse_search_terms(query: str) -> List[str]:
+    """从用户输入中提取关键词（忽略标点与查询语法字符）"""
+    return _TERM_PATTERN.findall(query.lower())[:MAX_SEARCH_TERMS]
+
+
+def _use_prefix(terms: Sequence[str], index: int) -> bool:
+    # 仅最后一个关键词（用户可能尚未输入完整）按前缀匹配
+    return index == len(terms) - 1 and len(terms[index]) >= MIN_PREFIX_LENGTH
+
+
+def _sqlite_match(terms: Sequence[str]) -> str:
+    # 每个关键词作为一个短语，多个关键词之间为 AND
+    return " ".join(
+        '"{}"{}'.format(t.replace('"', '""'), "*" if _use_prefix(terms, i) else "")
+        for i, t in enumerate(terms)
+    )
+
+
+def _postgresql_tsquery(terms: Sequence[str]) -> str:
+    return " & ".join(
+        f"{t}:*" if _use_prefix(terms, i) else t for i, t in enumerate(terms)
+    )
+
+
+def _rank_sql(dialect: str, source: SearchSource) -> str:
+    """单个数据源的相关度排序查询（分数越大越相关）"""
+    if dialect == "sqlite":
+        fts = f"{source.table}_fts"
+        weights = ", ".join(str(w) for w in source.weights)
+        return (
+            f"SELECT '{source.type}' AS type, t.id AS id, -bm25({fts}, {weights}) AS score "
+            f"FROM {fts} JOIN {source.table} t ON t.id = {fts}.rowid "
+            f"WHERE {fts} MATCH :match AND {source.visibility}"
+        )
+    return (
+        f"SELECT '{source.type}' AS type, t.id AS id, "
+        f"ts_rank_cd(t.search_vector, to_tsquery('simple', :match)) AS score "
+        f"FROM {source.table} t "
+        f"WHERE t.search_vector @@ to_tsquery('simple', :match) AND {source.visibility}"
+    )
+
+
+def _snippet_sql(dialect: str, source: SearchSource) -> str:
+    """为指定ID读取标题与摘要片段"""
+    if dialect == "sqlite":
+        fts = f"{source.table}_fts"
+        return (
+            f"SELECT t.id AS id, t.title AS title, "
+            f"snippet({fts}, -1, '', '', '…', {SNIPPET_TOKENS}) AS snippet "
+            f"FROM {fts} JOIN {source.table} t ON t.id = {fts}.rowid "
+            f"WHERE {fts} MATCH :match AND {fts}.rowid IN :ids"
+        )
+    body = ", ".join(f"t.{c}" for c in source.columns[1:])
+    return (
+        f"SELECT t.id AS id, t.title AS title, "
+        f"ts_headline('simple', concat_ws(' ', {body}), to_tsquery('simple', :match), "
+        f"'StartSel=\"\", StopSel=\"\", MaxWords={SNIPPET_TOKENS}, MinWords=4') AS snippet "
+        f"FROM {source.table} t WHERE t.id IN :ids"
+    )
+
+
+async def search(
+    db: AsyncSession,
+    query: str,
+    user_id: int,
+    types: Optional[Sequence[str]] = None,
+    skip: int = 0,
+    limit: int = 20,
+) -> List[dict]:
+    """全文搜索，返回按相关度排序的一页结果
+    
+    每条结果包含 type, id, title, snippet, score。
+    """
+    dialect = db.bind.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        raise SearchUnavailableError(f"数据库 {dialect} 不支持全文搜索")
+    
+    terms = parse_search_terms(query)
+    sources = [SEARCH_SOURCES[t] for t in (types or SEARCH_SOURCES)]
+    if not terms or not sources:
+        return []
+    match = _sqlite_match(terms) if dialect == "sqlite" else _postgresql_tsquery(terms)
+    
+    rank_sql = " UNION ALL ".join(_rank_sql(dialect, s) for s in sources)
+    ranked = (await db.execute(
+        text(f"SELECT type, id, score FROM ({rank_sql}) AS hits "
+             f"ORDER BY score DESC, id DESC LIMIT :limit OFFSET :skip"),
+        {"match": match, "user_id": user_id, "limit": limit, "skip": skip},
+    )).all()
+    
+    # 第二步：仅为当前页读取标题与摘要片段
+    details: Dict[Tuple[str, int], dict] = {}
+    for source in sources:
+        ids = [row.id for row in ranked if row.type == source.type]
+        if not ids:
+            continue
+        stmt = text(_snippet_sql(dialect, source)).bindparams(bindparam("ids", expanding=True))
+        for row in (await db.execute(stmt, {"match": match, "ids": ids})).all():
+            details[(source.type, row.id)] = {"title": row.title, "snippet": row.snippet}
+    
+    return [
+        {"type": row.type, "id": row.id, "score": float(row.score), **details.get((row.type, row.id), {})}
+        for row in ranked
+        if (row.type, row.id) in details
+    ]
@@ -0,0 +1,110 @@
+"""
+SQLite 生产模式
+
+适用于单机部署，SQLITE_OPTIMIZE 开启时：
+- 每个连接建立时设置 WAL 日志、synchronous、页缓存、mmap 与 busy_timeout：
+  WAL 下读不阻塞写、写不阻塞读，提交只需追加写入 WAL 文件；
+- 异步引擎使用连接池（aiosqlite 默认每个会话新建连接与线程）；
+- 进程内的写事务经同一把锁串行执行：第一条写语句执行前获取，连接归还连接池
+  （提交或回滚之后）时释放。写事务按顺序排队，不再在 SQLite 的忙等待中反复休眠重试，
+  也不会因等待超过 busy_timeout 而报 "database is locked"。读操作不受影响。
+
+多个进程（多个 uvicorn worker）之间仍由 SQLite 文件锁与 busy_timeout 协调。
+"""
+import asyncio
+import re
+import time
+import weakref
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.util import await_only
+
+from app.core.config import settings
+
+# 需要获取写锁的语句
+_WRITE_STATEMENT = re.compile(r"^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b", re.IGNORECASE)
+
+# 连接信息中保存已持有的写锁的键
+_WRITE_LOCK_KEY = "sqlite_write_lock"
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """连接建立时设置 PRAGMA（connect 事件钩子）"""
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        "PRAGMA journal_mode = WAL",
+        f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}",
+        # 负数表示以 KiB 为单位
+        f"PRAGMA cache_size = -{int(settings.SQLITE_CACHE_SIZE_KB)}",
+        f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in pragmas:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+class SerializedWriter:
+    """进程内串行化 SQLite 写事务（只用于异步引擎，锁按事件循环区分）"""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+        # 统计信息
+        self.acquisitions = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = self._locks[loop] = asyncio.Lock()
+        return lock
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        """第一条写语句执行前获取写锁（在 greenlet 中等待，不阻塞事件循环）"""
+        if _WRITE_LOCK_KEY in conn.info or not _WRITE_STATEMENT.match(statement):
+            return
+        lock = self._lock()
+        started = time.perf_counter()
+        try:
+            await_only(asyncio.wait_for(lock.acquire(), self.timeout))
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"等待 SQLite 写锁超过 {self.timeout} 秒") from None
+        waited = time.perf_counter() - started
+        conn.info[_WRITE_LOCK_KEY] = lock
+        self.acquisitions += 1
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def release(self, dbapi_connection, connection_record, *args):
+        """连接归还连接池或失效时释放写锁（checkin / invalidate 事件钩子）"""
+        lock = connection_record.info.pop(_WRITE_LOCK_KEY, None)
+        if lock is not None:
+            lock.release()
+
+    def stats(self) -> Dict[str, float]:
+        """写锁统计信息"""
+        return {
+            "acquisitions": self.acquisitions,
+            "wait_seconds": round(self.wait_seconds, 6),
+            "max_wait_seconds": round(self.max_wait_seconds, 6),
+        }
+
+
+sqlite_writer = SerializedWriter(timeout=settings.SQLITE_WRITE_LOCK_TIMEOUT_SECONDS)
+
+
+def configure_sqlite_engine(sync_engine: Engine, serialize_writes: bool = False):
+    """为 SQLite 引擎设置 PRAGMA；serialize_writes 为 True 时（仅异步引擎）串行化写事务"""
+    event.listen(sync_engine, "connect", set_sqlite_pragmas)
+    if serialize_writes:
+        event.listen(sync_engine, "before_cursor_execute", sqlite_writer.before_cursor_execute)
+        event.listen(sync_engine.pool, "checkin", sqlite_writer.release)
+        event.listen(sync_engine.pool, "invalidate", sqlite_writer.release)
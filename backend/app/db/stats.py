@@ -0,0 +1,92 @@
+"""
+题目统计汇总
+
+problem_daily_stats 按 (用户, 日期, 难度) 保存题目数量，在题目创建/更新/删除的同一事务中增量维护；
+统计接口只读取汇总表，开销与练习天数成正比，而与题目总数无关。
+"""
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.tags import get_user_tag_counts
+from app.db.upsert import add_counts
+from app.models.stats import ProblemDailyStat
+
+StatKey = Tuple[date, str]
+
+
+def stat_key(problem_date: date, difficulty: Optional[str]) -> StatKey:
+    """汇总表的键：(日期, 难度)，未设置难度时为空字符串"""
+    return problem_date, difficulty or ""
+
+
+async def adjust_problem_stats(db: AsyncSession, user_id: int, deltas: Counter):
+    """按 (日期, 难度) 调整用户的每日题目数，计数归零的记录被删除"""
+    rows = [
+        {"user_id": user_id, "date": d, "difficulty": difficulty, "count": delta}
+        for (d, difficulty), delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+    # 单条 upsert：并发创建同一 (日期, 难度) 的题目时不会因主键冲突失败
+    await add_counts(db, ProblemDailyStat, rows)
+    await db.execute(delete(ProblemDailyStat).where(
+        ProblemDailyStat.user_id == user_id, ProblemDailyStat.count <= 0
+    ))
+
+
+def compute_streaks(days: List[date], today: date) -> Tuple[int, int]:
+    """根据升序排列的练习日期计算 (当前连续天数, 最长连续天数)
+    
+    今天尚未练习时，截至昨天的连续记录仍计为当前连续天数。
+    """
+    longest = run = 0
+    previous = None
+    for day in days:
+        run = run + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+    current = run if previous is not None and today - previous <= timedelta(days=1) else 0
+    return current, longest
+
+
+async def get_problem_stats(
+    db: AsyncSession,
+    user_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> dict:
+    """读取用户的题目统计：总数、按难度、按标签、每日日历及连续练习天数
+    
+    date_from/date_to 仅限制返回的日历范围，其余统计始终覆盖全部数据。
+    """
+    rows = (await db.execute(
+        select(ProblemDailyStat.date, ProblemDailyStat.difficulty, ProblemDailyStat.count)
+        .where(ProblemDailyStat.user_id == user_id)
+        .order_by(ProblemDailyStat.date)
+    )).tuples().all()
+    
+    per_day: Dict[date, int] = {}
+    by_difficulty: Counter = Counter()
+    for day, difficulty, count in rows:
+        per_day[day] = per_day.get(day, 0) + count
+        by_difficulty[difficulty or "unknown"] += count
+    
+    current_streak, longest_streak = compute_streaks(list(per_day), date.today())
+    calendar = [
+        {"date": day, "count": count}
+        for day, count in per_day.items()
+        if (date_from is None or day >= date_from) and (date_to is None or day <= date_to)
+    ]
+    return {
+        "total": sum(by_difficulty.values()),
+        "by_difficulty": dict(by_difficulty),
+        "by_tag": await get_user_tag_counts(db, user_id, "problem"),
+        "calendar": calendar,
+        "active_days": len(per_day),
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+    }
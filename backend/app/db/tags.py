@@ -0,0 +1,147 @@
+"""
+标签存储
+
+各资源仍保留逗号分隔的 tags 字段作为展示用的原始值，规范化后的标签同时写入
+tags 表与对应的关联表，并在同一事务中维护 user_tag_counts 预汇总计数。
+"""
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.upsert import add_counts, insert_ignore
+
+from app.models.tag import (
+    Tag,
+    UserTagCount,
+    problem_tags,
+    blog_tags,
+    ebook_tags,
+    file_tags,
+    news_tags,
+)
+
+# 资源类型 -> (关联表, 关联表中的资源ID列名)
+TAGGED_RESOURCES: Dict[str, Tuple[Table, str]] = {
+    "problem": (problem_tags, "problem_id"),
+    "blog": (blog_tags, "blog_id"),
+    "ebook": (ebook_tags, "ebook_id"),
+    "file": (file_tags, "file_id"),
+    "news": (news_tags, "news_id"),
+}
+
+# 标签名最大长度（与 Tag.name 一致）
+MAX_TAG_LENGTH = 50
+
+
+def parse_tags(value: Optional[str]) -> List[str]:
+    """解析逗号分隔的标签字符串：去除空白、转为小写、去重并保持顺序"""
+    if not value:
+        return []
+    names = []
+    for part in value.replace("，", ",").split(","):
+        name = part.strip().lower()[:MAX_TAG_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+async def get_tag_ids(db: AsyncSession, names: Iterable[str], create: bool = True) -> Dict[str, int]:
+    """获取标签名对应的ID，create=True 时创建不存在的标签"""
+    names = set(names)
+    if not names:
+        return {}
+    if create:
+        await db.execute(insert_ignore(db, Tag.__table__), [{"name": n} for n in names])
+    rows = await db.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names)))
+    return {name: tag_id for name, tag_id in rows.all()}
+
+
+async def _adjust_user_counts(db: AsyncSession, user_id: int, resource: str, deltas: Counter):
+    """按标签ID调整用户标签计数，计数归零的记录被删除"""
+    rows = [
+        {"user_id": user_id, "resource": resource, "tag_id": tag_id, "count": delta}
+        for tag_id, delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+    # 单条 upsert：同一用户并发创建带相同新标签的资源时不会因主键冲突失败
+    await add_counts(db, UserTagCount, rows)
+    await db.execute(delete(UserTagCount).where(
+        UserTagCount.user_id == user_id, UserTagCount.resource == resource, UserTagCount.count <= 0
+    ))
+
+
+async def add_tags_bulk(
+    db: AsyncSession,
+    resource: str,
+    user_id: Optional[int],
+    items: Sequence[Tuple[int, Optional[str]]],
+):
+    """为一批新建的资源写入标签关联，items 为 (资源ID, 标签字符串) 列表
+    
+    已存在的关联以 ON CONFLICT DO NOTHING 跳过，不会使整个事务失败。
+    """
+    table, column = TAGGED_RESOURCES[resource]
+    parsed = [(entity_id, parse_tags(tags)) for entity_id, tags in items]
+    tag_ids = await get_tag_ids(db, {name for _, names in parsed for name in names})
+    rows = [
+        {column: entity_id, "tag_id": tag_ids[name]}
+        for entity_id, names in parsed
+        for name in names
+    ]
+    if not rows:
+        return
+    await db.execute(insert_ignore(db, table), rows)
+    if user_id is not None:
+        await _adjust_user_counts(db, user_id, resource, Counter(row["tag_id"] for row in rows))
+
+
+async def set_tags(
+    db: AsyncSession,
+    resource: str,
+    entity_id: int,
+    user_id: Optional[int],
+    tags: Optional[str],
+):
+    """将资源的标签关联同步为 tags 字符串的内容（tags 为 None 时清空，用于删除资源前）"""
+    table, column = TAGGED_RESOURCES[resource]
+    entity = table.c[column]
+    current = set((await db.scalars(select(table.c.tag_id).where(entity == entity_id))).all())
+    wanted = set((await get_tag_ids(db, parse_tags(tags))).values())
+    
+    added, removed = wanted - current, current - wanted
+    if removed:
+        await db.execute(delete(table).where(entity == entity_id, table.c.tag_id.in_(removed)))
+    if added:
+        await db.execute(insert(table), [{column: entity_id, "tag_id": tag_id} for tag_id in added])
+    if user_id is not None:
+        deltas = Counter({tag_id: 1 for tag_id in added})
+        deltas.subtract({tag_id: 1 for tag_id in removed})
+        await _adjust_user_counts(db, user_id, resource, deltas)
+
+
+def tagged_with(resource: str, names: Sequence[str]):
+    """返回带有全部指定标签的资源ID子查询（通过标签名唯一索引与关联表反向索引查找）"""
+    table, column = TAGGED_RESOURCES[resource]
+    names = parse_tags(",".join(names))
+    return (
+        select(table.c[column])
+        .join(Tag, Tag.id == table.c.tag_id)
+        .where(Tag.name.in_(names))
+        .group_by(table.c[column])
+        .having(func.count() == len(names))
+    )
+
+
+async def get_user_tag_counts(db: AsyncSession, user_id: int, resource: str, limit: int = 100) -> List[dict]:
+    """读取用户某类资源的标签计数（按数量降序）"""
+    rows = await db.execute(
+        select(Tag.name, UserTagCount.count)
+        .join(Tag, Tag.id == UserTagCount.tag_id)
+        .where(UserTagCount.user_id == user_id, UserTagCount.resource == resource)
+        .order_by(UserTagCount.count.desc(), Tag.name)
+        .limit(limit)
+    )
+    return [{"name": name, "count": count} for name, count in rows.all()]
@@ -0,0 +1,38 @@
+"""
+上传会话维护
+
+过期会话在启动时以及之后每 UPLOAD_PURGE_INTERVAL_SECONDS 秒清理一次（由 upload_purger 执行），
+同时清理本进程中已结束上传的增量哈希与锁。
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+
+from app.core import storage
+from app.core.config import settings
+from app.core.periodic import PeriodicTask
+from app.db.database import AsyncSessionLocal
+from app.models.upload import UploadSession
+
+
+async def purge_expired_uploads() -> int:
+    """删除超过保留时间的上传会话及其未完成的临时文件，返回删除的会话数
+    
+    completing 状态的会话超过保留时间说明完成过程中进程已退出，按未完成处理。
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(UploadSession.id, UploadSession.status).where(UploadSession.updated_at < cutoff)
+        )).all()
+        for upload_id, upload_status in rows:
+            if upload_status != "completed":
+                await storage.discard_upload(upload_id)
+        if rows:
+            await db.execute(delete(UploadSession).where(UploadSession.id.in_([row[0] for row in rows])))
+            await db.commit()
+    storage.forget_inactive_uploads()
+    return len(rows)
+
+
+upload_purger = PeriodicTask("upload_purge", purge_expired_uploads, settings.UPLOAD_PURGE_INTERVAL_SECONDS)
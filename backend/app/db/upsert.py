@@ -0,0 +1,60 @@
+"""
+按数据库方言构造 INSERT ... ON CONFLICT
+
+SQLite 与 PostgreSQL 的 insert 构造支持 on_conflict_do_nothing / on_conflict_do_update，
+其他数据库时 dialect_insert 返回 None，由调用方回退为先更新（或查询）再插入。
+"""
+from typing import List, Optional, Sequence
+
+from sqlalchemy import and_, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.dml import Insert
+
+_DIALECT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def dialect_insert(db: AsyncSession, table) -> Optional[Insert]:
+    """支持 ON CONFLICT 的 insert 构造，数据库不支持时返回 None"""
+    insert_ = _DIALECT_INSERTS.get(db.bind.dialect.name)
+    return insert_(table) if insert_ is not None else None
+
+
+def insert_ignore(db: AsyncSession, table) -> Insert:
+    """INSERT ... ON CONFLICT DO NOTHING（数据库不支持时为普通 INSERT）"""
+    stmt = dialect_insert(db, table)
+    if stmt is None:
+        return insert(table)
+    return stmt.on_conflict_do_nothing()
+
+
+async def add_counts(db: AsyncSession, model, rows: List[dict], column: str = "count"):
+    """按主键累加计数列：INSERT ... ON CONFLICT (主键) DO UPDATE SET count = count + excluded.count
+    
+    rows 为包含全部主键列与增量的字典，按主键排序后写入，并发事务以相同顺序加锁，避免死锁；
+    不存在的行以增量为初始值插入。数据库不支持 ON CONFLICT 时逐行先更新、未更新到再插入。
+    """
+    keys: Sequence[str] = [c.key for c in model.__table__.primary_key.columns]
+    rows = sorted(rows, key=lambda row: tuple(row[k] for k in keys))
+    counter = getattr(model, column)
+    stmt = dialect_insert(db, model)
+    if stmt is not None:
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=keys,
+                set_={column: counter + stmt.excluded[column]}
+            ),
+            rows
+        )
+        return
+    for row in rows:
+        result = await db.execute(
+            update(model)
+            .where(and_(*(getattr(model, k) == row[k] for k in keys)))
+            .values({column: counter + row[column]})
+        )
+        if not result.rowcount:
+            await db.execute(insert(model).values(**row))
@@ -7,6 +7,14 @@ from app.models.blog import Blog
 from app.models.ebook import Ebook
 from app.models.file import File
 from app.models.news import News
+from app.models.tag import Tag, UserTagCount
+from app.models.stats import ProblemDailyStat
+from app.models.upload import UploadSession
+from app.models.blob import Blob
+from app.models.image_job import ImageJob
 
-__all__ = ["User", "Problem", "Blog", "Ebook", "File", "News"]
+__all__ = [
+    "User", "Problem", "Blog", "Ebook", "File", "News",
+    "Tag", "UserTagCount", "ProblemDailyStat", "UploadSession", "Blob", "ImageJob",
+]
 
@@ -0,0 +1,21 @@
+"""
+内容寻址存储模型
+"""
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class Blob(Base):
+    """按 SHA-256 去重的文件内容表，ref_count 为引用该内容的文件与电子书记录数"""
+    __tablename__ = "blobs"
+    __table_args__ = (
+        # 垃圾回收：WHERE ref_count <= 0
+        Index("ix_blobs_ref_count", "ref_count"),
+    )
+    
+    sha256 = Column(String(64), primary_key=True)  # 内容哈希（十六进制）
+    size = Column(BigInteger, nullable=False)  # 内容大小（字节）
+    ref_count = Column(Integer, nullable=False, default=0)  # 引用计数
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
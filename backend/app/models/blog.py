@@ -1,7 +1,7 @@
 """
 博客模型
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.database import Base
@@ -10,6 +10,12 @@ from app.db.database import Base
 class Blog(Base):
     """博客表"""
     __tablename__ = "blogs"
+    __table_args__ = (
+        # 按用户列出：WHERE user_id = ? ORDER BY created_at DESC
+        Index("ix_blogs_user_created", "user_id", "created_at"),
+        # 已发布博客列表：WHERE is_published ORDER BY created_at DESC, id DESC
+        Index("ix_blogs_published_created_id", "is_published", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
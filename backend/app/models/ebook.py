@@ -1,7 +1,7 @@
 """
 电子书模型
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.database import Base
@@ -10,6 +10,10 @@ from app.db.database import Base
 class Ebook(Base):
     """电子书表"""
     __tablename__ = "ebooks"
+    __table_args__ = (
+        # 按用户列出：WHERE user_id = ? ORDER BY created_at DESC
+        Index("ix_ebooks_user_created", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -17,6 +21,7 @@ class Ebook(Base):
     author = Column(String(100), nullable=True)
     description = Column(Text, nullable=True)
     file_path = Column(String(500), nullable=False)  # 文件存储路径
+    content_hash = Column(String(64), nullable=True, index=True)  # 内容哈希（对应 blobs.sha256，旧数据为空）
     file_name = Column(String(200), nullable=False)  # 原始文件名
     file_size = Column(Integer, nullable=False)  # 文件大小（字节）
     file_type = Column(String(50), nullable=False)  # 文件类型（pdf, epub, mobi等）
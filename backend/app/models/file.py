@@ -1,7 +1,7 @@
 """
 文件模型
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, BigInteger
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, BigInteger, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.database import Base
@@ -10,12 +10,17 @@ from app.db.database import Base
 class File(Base):
     """文件表"""
     __tablename__ = "files"
+    __table_args__ = (
+        # 按用户列出：WHERE user_id = ? ORDER BY created_at DESC
+        Index("ix_files_user_created", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     original_name = Column(String(500), nullable=False)  # 原始文件名
     stored_name = Column(String(500), nullable=False)  # 存储文件名
     file_path = Column(String(1000), nullable=False)  # 文件存储路径
+    content_hash = Column(String(64), nullable=True, index=True)  # 内容哈希（对应 blobs.sha256，旧数据为空）
     file_size = Column(BigInteger, nullable=False)  # 文件大小（字节）
     file_type = Column(String(100), nullable=False)  # MIME类型
     file_extension = Column(String(20), nullable=True)  # 文件扩展名
@@ -0,0 +1,28 @@
+"""
+图片处理任务模型
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class ImageJob(Base):
+    """缩略图与封面生成任务队列表（持久化在数据库中，进程重启后继续处理）"""
+    __tablename__ = "image_jobs"
+    __table_args__ = (
+        # 领取任务：WHERE status = 'pending' ORDER BY id
+        Index("ix_image_jobs_status_id", "status", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(20), nullable=False)  # 任务类型：thumbnail（图片缩略图）, ebook_cover（电子书封面）
+    content_hash = Column(String(64), nullable=False)  # 源文件内容哈希（衍生文件按此存放）
+    source_path = Column(String(1000), nullable=False)  # 源文件路径（相对 UPLOAD_DIR）
+    resource = Column(String(20), nullable=False)  # 来源资源类型：file, ebook
+    resource_id = Column(Integer, nullable=False)  # 来源资源ID
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)  # 已尝试次数
+    error = Column(Text, nullable=True)  # 最近一次失败原因
+    claimed_at = Column(DateTime(timezone=True), nullable=True)  # 最近一次领取时间（running 状态的租约起点）
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
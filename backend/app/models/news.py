@@ -1,7 +1,7 @@
 """
 新闻模型
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Date, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.database import Base
@@ -10,6 +10,11 @@ from app.db.database import Base
 class News(Base):
     """新闻表"""
     __tablename__ = "news"
+    __table_args__ = (
+        # 新闻列表：[WHERE category = ?] ORDER BY publish_date DESC, id DESC
+        Index("ix_news_publish_id", "publish_date", "id"),
+        Index("ix_news_category_publish_id", "category", "publish_date", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(500), nullable=False, index=True)
@@ -17,6 +22,7 @@ class News(Base):
     summary = Column(String(1000), nullable=True)  # 摘要
     source = Column(String(200), nullable=True)  # 来源
     source_url = Column(String(1000), nullable=True)  # 来源链接
+    dedup_key = Column(String(64), nullable=True, unique=True, index=True)  # 去重键（规范化 source_url 或标题的 SHA-256）
     author = Column(String(100), nullable=True)  # 作者
     category = Column(String(50), nullable=True, index=True)  # 分类
     tags = Column(String(500), nullable=True)  # 标签
@@ -1,7 +1,7 @@
 """
 题目模型
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Date, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.database import Base
@@ -10,6 +10,12 @@ from app.db.database import Base
 class Problem(Base):
     """题目表"""
     __tablename__ = "problems"
+    __table_args__ = (
+        # 游标分页：WHERE user_id = ? AND (date, id) < (?, ?) ORDER BY date DESC, id DESC
+        Index("ix_problems_user_date_id", "user_id", "date", "id"),
+        # 按日期查询：WHERE user_id = ? AND date = ? ORDER BY created_at DESC
+        Index("ix_problems_user_date_created", "user_id", "date", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -0,0 +1,15 @@
+"""
+统计汇总模型
+"""
+from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from app.db.database import Base
+
+
+class ProblemDailyStat(Base):
+    """用户每日刷题数汇总表（按难度拆分），随题目的增删改在同一事务中增量维护"""
+    __tablename__ = "problem_daily_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    difficulty = Column(String(20), primary_key=True)  # 未设置难度时为空字符串
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,44 @@
+"""
+标签模型
+
+标签统一存放在 tags 表中，各资源通过关联表引用；
+user_tag_counts 为每个用户按资源类型预先汇总的标签计数（用于标签云）。
+"""
+from sqlalchemy import Column, Integer, String, ForeignKey, Table, Index
+from app.db.database import Base
+
+
+class Tag(Base):
+    """标签表"""
+    __tablename__ = "tags"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(50), unique=True, index=True, nullable=False)  # 规范化后的标签名（小写）
+
+
+def _association_table(name: str, entity_table: str, entity_column: str) -> Table:
+    """创建 资源-标签 关联表，主键 (资源ID, 标签ID)，并按 (标签ID, 资源ID) 建反向索引"""
+    return Table(
+        name,
+        Base.metadata,
+        Column(entity_column, Integer, ForeignKey(f"{entity_table}.id", ondelete="CASCADE"), primary_key=True),
+        Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+        Index(f"ix_{name}_tag_entity", "tag_id", entity_column),
+    )
+
+
+problem_tags = _association_table("problem_tags", "problems", "problem_id")
+blog_tags = _association_table("blog_tags", "blogs", "blog_id")
+ebook_tags = _association_table("ebook_tags", "ebooks", "ebook_id")
+file_tags = _association_table("file_tags", "files", "file_id")
+news_tags = _association_table("news_tags", "news", "news_id")
+
+
+class UserTagCount(Base):
+    """用户标签计数表（按资源类型汇总）"""
+    __tablename__ = "user_tag_counts"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    resource = Column(String(20), primary_key=True)  # problem, blog, ebook, file
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,26 @@
+"""
+上传会话模型
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, BigInteger, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class UploadSession(Base):
+    """可续传的分块上传会话表"""
+    __tablename__ = "upload_sessions"
+    __table_args__ = (
+        Index("ix_upload_sessions_status_updated", "status", "updated_at"),
+    )
+    
+    id = Column(String(32), primary_key=True)  # 上传ID（uuid4 hex）
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    target = Column(String(20), nullable=False)  # 上传目标：file, ebook
+    file_name = Column(String(500), nullable=False)  # 原始文件名
+    file_type = Column(String(100), nullable=False)  # MIME类型
+    file_size = Column(BigInteger, nullable=False)  # 声明的文件大小（字节）
+    received = Column(BigInteger, nullable=False, default=0)  # 已接收字节数
+    sha256 = Column(String(64), nullable=True)  # 完成后的内容哈希
+    status = Column(String(20), nullable=False, default="pending")  # pending, completing（正在完成）, completed
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -45,3 +45,26 @@ class BlogResponse(BlogBase):
         from_attributes = True
 
 
+
+
+class BlogListItem(BaseModel):
+    """博客列表项模式（不含正文）"""
+    id: int
+    user_id: int
+    title: str
+    summary: Optional[str] = None
+    cover_image: Optional[str] = None
+    tags: Optional[str] = None
+    category: Optional[str] = None
+    is_published: bool
+    view_count: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class BlogDetail(BlogResponse):
+    """博客详情模式（含渲染后的 HTML 正文）"""
+    content_html: str
@@ -39,6 +39,7 @@ class EbookResponse(EbookBase):
     id: int
     user_id: int
     file_path: str
+    content_hash: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     
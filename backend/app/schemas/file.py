@@ -38,6 +38,7 @@ class FileResponse(FileBase):
     user_id: int
     stored_name: str
     file_path: str
+    content_hash: Optional[str] = None
     download_count: int
     created_at: datetime
     updated_at: Optional[datetime] = None
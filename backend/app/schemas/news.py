@@ -3,7 +3,7 @@
 """
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class NewsBase(BaseModel):
@@ -48,3 +48,44 @@ class NewsResponse(NewsBase):
         from_attributes = True
 
 
+
+
+class NewsListItem(BaseModel):
+    """新闻列表项模式（不含正文）"""
+    id: int
+    title: str
+    summary: Optional[str] = None
+    source: Optional[str] = None
+    source_url: Optional[str] = None
+    author: Optional[str] = None
+    category: Optional[str] = None
+    tags: Optional[str] = None
+    cover_image: Optional[str] = None
+    publish_date: Optional[datetime] = None
+    is_featured: int = 0
+    view_count: int
+    crawl_date: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class NewsCategory(BaseModel):
+    """新闻分类及数量"""
+    name: str
+    count: int
+
+
+class NewsIngestError(BaseModel):
+    """批量入库的单条错误"""
+    index: int  # 序号（从0开始）
+    error: str
+
+
+class NewsIngestResult(BaseModel):
+    """批量入库结果"""
+    inserted: int
+    updated: int
+    skipped: int  # 重复且内容无变化
+    failed: int
+    errors: List[NewsIngestError] = []
@@ -3,7 +3,9 @@
 """
 from pydantic import BaseModel
 from datetime import date, datetime
-from typing import Optional
+from typing import Dict, List, Optional
+
+from app.schemas.tag import TagCount
 
 
 class ProblemBase(BaseModel):
@@ -43,3 +45,34 @@ class ProblemResponse(ProblemBase):
         from_attributes = True
 
 
+
+
+class ProblemBulkError(BaseModel):
+    """批量导入的单行错误"""
+    index: int  # 行号（从0开始）
+    error: str
+
+
+class ProblemBulkResult(BaseModel):
+    """批量导入结果"""
+    inserted: int
+    failed: int
+    errors: List[ProblemBulkError] = []
+    truncated: bool = False  # 超过单次导入上限，其余的行未导入
+
+
+class ProblemDayCount(BaseModel):
+    """每日题目数"""
+    date: date
+    count: int
+
+
+class ProblemStats(BaseModel):
+    """题目统计"""
+    total: int
+    by_difficulty: Dict[str, int]
+    by_tag: List[TagCount]
+    calendar: List[ProblemDayCount]
+    active_days: int
+    current_streak: int
+    longest_streak: int
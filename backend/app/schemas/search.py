@@ -0,0 +1,16 @@
+"""
+搜索相关的 Pydantic 模式
+"""
+from pydantic import BaseModel
+from typing import Literal, Optional
+
+SearchType = Literal["problem", "blog", "news"]
+
+
+class SearchResult(BaseModel):
+    """搜索结果"""
+    type: SearchType
+    id: int
+    title: str
+    snippet: Optional[str] = None  # 命中内容的摘要片段
+    score: float  # 相关度，越大越相关
@@ -0,0 +1,13 @@
+"""
+标签相关的 Pydantic 模式
+"""
+from pydantic import BaseModel
+from typing import Literal
+
+TagResource = Literal["problem", "blog", "ebook", "file"]
+
+
+class TagCount(BaseModel):
+    """标签计数（用于标签云）"""
+    name: str
+    count: int
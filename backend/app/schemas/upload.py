@@ -0,0 +1,41 @@
+"""
+分块上传相关的 Pydantic 模式
+"""
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Literal, Optional
+
+UploadTarget = Literal["file", "ebook"]
+
+
+class UploadCreate(BaseModel):
+    """创建上传会话模式"""
+    target: UploadTarget
+    file_name: str = Field(..., min_length=1, max_length=500)
+    file_type: str = Field("application/octet-stream", max_length=100)
+    file_size: int = Field(..., ge=0)
+
+
+class UploadStatus(BaseModel):
+    """上传会话状态模式"""
+    id: str
+    target: UploadTarget
+    file_name: str
+    file_type: str
+    file_size: int
+    received: int
+    chunk_size: int
+    status: str
+    sha256: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+
+class UploadComplete(BaseModel):
+    """完成上传时提交的元数据（file 使用 description/tags/category/is_public，ebook 另需 title/author）"""
+    title: Optional[str] = None
+    author: Optional[str] = None
+    description: Optional[str] = None
+    tags: Optional[str] = None
+    category: Optional[str] = None
+    is_public: int = 0
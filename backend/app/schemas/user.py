@@ -27,6 +27,7 @@ class UserLoginEncrypted(BaseModel):
     """用户登录模式（加密密码）"""
     username: str
     encrypted_password: str  # Base64编码的RSA加密密码
+    key_id: Optional[str] = None  # 加密所用公钥的ID（/auth/public-key 返回的 key_id）
 
 
 class UserResponse(UserBase):
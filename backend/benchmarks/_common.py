@@ -0,0 +1,167 @@
+"""
+基准测试公共工具
+
+使用方式：在导入 app 之前调用 configure_database()，使应用连接到独立的基准测试数据库。
+"""
+import asyncio
+import json
+from datetime import date, datetime, timedelta, timezone
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+# 保证从 backend 目录外运行时也能导入 app 包
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def configure_database(database_url: Optional[str] = None) -> str:
+    """设置基准测试使用的数据库URL（默认使用临时SQLite文件）"""
+    if not database_url:
+        fd, path = tempfile.mkstemp(prefix="codingspace-bench-", suffix=".db")
+        os.close(fd)
+        os.remove(path)
+        database_url = f"sqlite:///{path}"
+    os.environ["DATABASE_URL"] = database_url
+    return database_url
+
+
+def seed_user(username: str, password: str, problems: int = 0, problems_per_day: int = 1) -> int:
+    """初始化数据库，创建用户并批量写入题目，返回用户ID"""
+    from app.core.security import get_password_hash
+    from app.db.database import SessionLocal, init_db
+    from app.models.problem import Problem
+    from app.models.user import User
+
+    init_db()
+    db = SessionLocal()
+    try:
+        user = User(username=username, hashed_password=get_password_hash(password))
+        db.add(user)
+        db.commit()
+        today = date.today()
+        batch = 10000
+        for start in range(0, problems, batch):
+            db.bulk_insert_mappings(Problem, [
+                {
+                    "user_id": user.id,
+                    "date": today - timedelta(days=i // problems_per_day),
+                    "title": f"problem-{i}",
+                    "difficulty": ("easy", "medium", "hard")[i % 3],
+                    "description": "x" * 200,
+                    "tags": "dp,graph",
+                }
+                for i in range(start, min(start + batch, problems))
+            ])
+            db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def seed_users(usernames: Sequence[str], password: str) -> List[int]:
+    """初始化数据库并批量创建使用同一密码的用户（只计算一次哈希），返回用户ID"""
+    from app.core.security import get_password_hash
+    from app.db.database import SessionLocal, init_db
+    from app.models.user import User
+
+    init_db()
+    hashed_password = get_password_hash(password)
+    db = SessionLocal()
+    try:
+        users = [User(username=name, hashed_password=hashed_password) for name in usernames]
+        db.add_all(users)
+        db.commit()
+        return [user.id for user in users]
+    finally:
+        db.close()
+
+
+def environment_info(database_url: Optional[str] = None) -> Dict[str, object]:
+    """运行环境信息，写入报告便于比较不同机器、数据库与代码版本的结果"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    database = None
+    if database_url:
+        from sqlalchemy.engine import make_url
+        database = make_url(database_url).get_backend_name()
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "database": database,
+    }
+
+
+async def login(client, username: str, password: str) -> dict:
+    """登录并返回带 Authorization 的请求头"""
+    resp = await client.post(
+        "/api/v1/auth/login-json",
+        json={"username": username, "password": password},
+    )
+    resp.raise_for_status()
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """计算百分位数（最近秩法）"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """汇总延迟样本（单位：毫秒）"""
+    ms = [x * 1000 for x in latencies]
+    return {
+        "requests": len(ms),
+        "rps": round(len(ms) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(max(ms), 3) if ms else 0.0,
+    }
+
+
+async def run_concurrent(
+    request: Callable[[int], Awaitable[None]],
+    concurrency: int,
+    requests_per_client: int,
+) -> Dict[str, float]:
+    """以 concurrency 个并发客户端各执行 requests_per_client 次请求，返回延迟统计"""
+    latencies: List[float] = []
+
+    async def client(worker_id: int):
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            await request(worker_id)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def write_report(path: Optional[str], report: dict):
+    """打印结果，并在指定路径时写入JSON文件"""
+    text = json.dumps(report, ensure_ascii=False, indent=2, default=str)
+    print(text)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
@@ -0,0 +1,65 @@
+"""
+并发请求延迟基准测试（同步 Session vs 异步 AsyncSession）
+
+在进程内通过 httpx.AsyncClient + ASGITransport 驱动应用：多个客户端并发请求
+GET /api/v1/problems，同时另一组客户端请求 /health，用于观察数据库查询是否阻塞事件循环。
+
+用法：
+    python -m benchmarks.bench_async_db --concurrency 50 --requests 20 --output result.json
+
+在改动前后的代码上分别运行，对比输出中的 p99_ms 即可。
+"""
+import argparse
+import asyncio
+
+from benchmarks._common import configure_database, login, run_concurrent, seed_user, write_report
+
+
+async def run(args) -> dict:
+    import httpx
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = await login(client, "bench", "bench-password")
+
+        async def list_problems(_):
+            r = await client.get("/api/v1/problems", params={"limit": args.limit}, headers=headers)
+            r.raise_for_status()
+
+        async def health(_):
+            r = await client.get("/health")
+            r.raise_for_status()
+
+        problems_result, health_result = await asyncio.gather(
+            run_concurrent(list_problems, args.concurrency, args.requests),
+            run_concurrent(health, args.concurrency, args.requests),
+        )
+
+    return {
+        "benchmark": "async_db",
+        "concurrency": args.concurrency,
+        "requests_per_client": args.requests,
+        "limit": args.limit,
+        "problems": problems_result,
+        "health": health_result,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="数据库URL（默认临时SQLite文件）")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20, help="每个客户端的请求次数")
+    parser.add_argument("--problems", type=int, default=2000, help="基准用户的题目数量")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--output", default=None, help="结果JSON输出路径")
+    args = parser.parse_args()
+
+    configure_database(args.database_url)
+    seed_user("bench", "bench-password", args.problems)
+    write_report(args.output, asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
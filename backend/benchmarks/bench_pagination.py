@@ -0,0 +1,89 @@
+"""
+题目列表分页基准测试（偏移分页 vs 游标分页）
+
+为单个用户写入大量题目后，分别在不同深度请求一页数据，对比 skip/limit 与游标分页的延迟。
+
+用法：
+    python -m benchmarks.bench_pagination --problems 100000 --output result.json
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._common import configure_database, login, seed_user, summarize, write_report
+
+
+def cursor_at(user_id: int, depth: int) -> str:
+    """计算第 depth 条记录之后的游标（与接口的 (date, id) 降序一致）"""
+    from app.core.pagination import encode_cursor
+    from app.db.database import SessionLocal
+    from app.models.problem import Problem
+
+    db = SessionLocal()
+    try:
+        row = db.query(Problem.date, Problem.id).filter(Problem.user_id == user_id).order_by(
+            Problem.date.desc(), Problem.id.desc()
+        ).offset(depth - 1).limit(1).one()
+        return encode_cursor(row.date, row.id)
+    finally:
+        db.close()
+
+
+async def run(args, user_id: int) -> dict:
+    import httpx
+    from main import app
+
+    depths = [d for d in args.depths if d < args.problems]
+    cursors = {d: cursor_at(user_id, d) for d in depths if d > 0}
+    results = {}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = await login(client, "bench", "bench-password")
+
+        async def measure(params: dict) -> dict:
+            latencies = []
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                r = await client.get("/api/v1/problems", params=params, headers=headers)
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - t)
+            return summarize(latencies, time.perf_counter() - start)
+
+        for depth in depths:
+            offset_params = {"skip": depth, "limit": args.limit}
+            cursor_params = {"limit": args.limit, "use_cursor": "true"}
+            if depth:
+                cursor_params["cursor"] = cursors[depth]
+            results[str(depth)] = {
+                "offset": await measure(offset_params),
+                "cursor": await measure(cursor_params),
+            }
+
+    return {
+        "benchmark": "pagination",
+        "problems": args.problems,
+        "limit": args.limit,
+        "repeat": args.repeat,
+        "depths": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="数据库URL（默认临时SQLite文件）")
+    parser.add_argument("--problems", type=int, default=100000, help="基准用户的题目数量")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20, help="每个深度的请求次数")
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 1000, 10000, 50000, 99000])
+    parser.add_argument("--output", default=None, help="结果JSON输出路径")
+    args = parser.parse_args()
+
+    configure_database(args.database_url)
+    user_id = seed_user("bench", "bench-password", args.problems, problems_per_day=3)
+    write_report(args.output, asyncio.run(run(args, user_id)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+全文搜索基准测试
+
+向 news 表写入大量合成文档（词频服从近似 Zipf 分布，索引由触发器/生成列同步维护），
+然后分别以高频词、中频词、低频词和多词组合请求 GET /api/v1/search，统计延迟。
+
+用法：
+    python -m benchmarks.bench_search --documents 1000000 --output result.json
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import time
+
+from benchmarks._common import configure_database, login, seed_user, summarize, write_report
+
+VOCABULARY_SIZE = 50000
+WORDS_PER_DOCUMENT = 40
+
+
+def _word(rank: int) -> str:
+    return f"w{rank}"
+
+
+def seed_documents(documents: int, seed: int = 42) -> float:
+    """批量写入合成新闻文档，返回写入耗时（秒）"""
+    from sqlalchemy import insert
+    from app.db.database import engine
+    from app.models.news import News
+
+    rng = random.Random(seed)
+    # 近似 Zipf 分布：排名越靠前的词出现越频繁
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(VOCABULARY_SIZE)))
+    ranks = list(range(VOCABULARY_SIZE))
+    start = time.perf_counter()
+    batch = 10000
+    with engine.begin() as conn:
+        for offset in range(0, documents, batch):
+            rows = []
+            for _ in range(min(batch, documents - offset)):
+                words = [_word(r) for r in rng.choices(ranks, cum_weights=cum_weights, k=WORDS_PER_DOCUMENT)]
+                rows.append({
+                    "title": " ".join(words[:6]),
+                    "summary": " ".join(words[6:14]),
+                    "content": " ".join(words[14:]),
+                    "tags": words[0],
+                    "category": "tech",
+                })
+            conn.execute(insert(News), rows)
+    return time.perf_counter() - start
+
+
+async def run(args) -> dict:
+    import httpx
+    from main import app
+
+    queries = {
+        "common": _word(0),
+        "medium": _word(500),
+        "rare": _word(VOCABULARY_SIZE - 1),
+        "two_terms": f"{_word(3)} {_word(50)}",
+        "prefix": "w123",
+    }
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = await login(client, "bench", "bench-password")
+        for name, q in queries.items():
+            latencies = []
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                r = await client.get("/api/v1/search", params={"q": q, "limit": args.limit}, headers=headers)
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - t)
+            results[name] = {"query": q, **summarize(latencies, time.perf_counter() - start)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="数据库URL（默认临时SQLite文件）")
+    parser.add_argument("--documents", type=int, default=1000000, help="合成文档数量")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20, help="每种查询的请求次数")
+    parser.add_argument("--output", default=None, help="结果JSON输出路径")
+    args = parser.parse_args()
+
+    configure_database(args.database_url)
+    seed_user("bench", "bench-password")
+    seed_seconds = seed_documents(args.documents)
+    write_report(args.output, {
+        "benchmark": "search",
+        "documents": args.documents,
+        "seed_seconds": round(seed_seconds, 2),
+        "limit": args.limit,
+        "repeat": args.repeat,
+        "queries": asyncio.run(run(args)),
+    })
+
+
+if __name__ == "__main__":
+    main()
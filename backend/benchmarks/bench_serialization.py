@@ -0,0 +1,97 @@
+"""
+题目列表序列化微基准测试（默认路径 vs FAST_JSON_RESPONSES 快速路径）
+
+为单个用户写入题目后，反复查询并序列化一页（默认 1000 行）数据，对比：
+- orm_pydantic_stdlib：查询 ORM 对象，经 List[ProblemResponse] 校验并转换后用标准库 json 编码（FastAPI 默认路径）；
+- orm_pydantic_fast：同上，改用 FastJSONResponse 编码（只替换默认响应类型）；
+- rows_fast：只查询响应字段对应的列，数据库行直接转为 dict 后用 FastJSONResponse 编码（题目列表的快速路径）。
+
+报告包含每种方式的每页耗时百分位、相对默认路径的加速比，以及使用的 JSON 库（orjson 或 pydantic-core）。
+
+用法：
+    python -m benchmarks.bench_serialization --rows 1000 --repeat 50 --output result.json
+"""
+import argparse
+import time
+from typing import Callable, Dict, List
+
+from benchmarks._common import configure_database, environment_info, seed_user, summarize, write_report
+
+
+def measure(page: Callable[[], bytes], repeat: int) -> dict:
+    """执行 repeat 次（先预热一次），返回耗时统计与响应体大小"""
+    body = page()
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        t = time.perf_counter()
+        page()
+        latencies.append(time.perf_counter() - t)
+    return {**summarize(latencies, time.perf_counter() - start), "body_bytes": len(body)}
+
+
+def run(args, user_id: int) -> Dict[str, dict]:
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+    from starlette.responses import JSONResponse
+
+    from app.api.v1.problems import RESPONSE_COLUMNS
+    from app.core.responses import FastJSONResponse
+    from app.db.database import SessionLocal
+    from app.models.problem import Problem
+    from app.schemas.problem import ProblemResponse
+
+    adapter = TypeAdapter(List[ProblemResponse])
+    query = select(Problem).where(Problem.user_id == user_id).order_by(Problem.date.desc()).limit(args.rows)
+    db = SessionLocal()
+
+    def orm_page(response_class) -> bytes:
+        # 每次使用新的标识映射，与每个请求一个会话一致
+        db.expunge_all()
+        problems = db.scalars(query).all()
+        content = adapter.dump_python(adapter.validate_python(problems, from_attributes=True), mode="json")
+        return response_class(content).body
+
+    def rows_page() -> bytes:
+        rows = [row._asdict() for row in db.execute(query.with_only_columns(*RESPONSE_COLUMNS))]
+        return FastJSONResponse(rows).body
+
+    try:
+        results = {
+            "orm_pydantic_stdlib": measure(lambda: orm_page(JSONResponse), args.repeat),
+            "orm_pydantic_fast": measure(lambda: orm_page(FastJSONResponse), args.repeat),
+            "rows_fast": measure(rows_page, args.repeat),
+        }
+    finally:
+        db.close()
+    baseline = results["orm_pydantic_stdlib"]["p50_ms"]
+    for stats in results.values():
+        stats["speedup_p50"] = round(baseline / stats["p50_ms"], 2) if stats["p50_ms"] else 0.0
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="数据库URL（默认临时SQLite文件）")
+    parser.add_argument("--rows", type=int, default=1000, help="每页行数")
+    parser.add_argument("--repeat", type=int, default=50, help="每种方式的执行次数")
+    parser.add_argument("--output", default=None, help="结果JSON输出路径")
+    args = parser.parse_args()
+
+    database_url = configure_database(args.database_url)
+    user_id = seed_user("bench", "bench-password", args.rows)
+
+    from app.core import responses
+
+    write_report(args.output, {
+        "benchmark": "serialization",
+        "environment": environment_info(database_url),
+        "json_library": "orjson" if responses.orjson is not None else "pydantic-core",
+        "rows": args.rows,
+        "repeat": args.repeat,
+        "strategies": run(args, user_id),
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+SQLite 并发写入基准测试（SQLITE_OPTIMIZE 关闭 / 开启对比）
+
+分别以 SQLITE_OPTIMIZE=false（SQLite 默认的回滚日志、每个会话新建连接、写事务争抢文件锁）与
+SQLITE_OPTIMIZE=true（WAL、连接池、进程内串行写入）在子进程中运行 bench_api 的写入场景，
+每种模式使用新的临时数据库，输出两者的 requests/sec、延迟百分位、错误计数与吞吐提升倍数。
+
+用法：
+    python -m benchmarks.bench_sqlite_writes --concurrency 20 --requests 20 --output sqlite.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks._common import BACKEND_DIR, environment_info, write_report
+
+MODES = {"default": "false", "optimized": "true"}
+WRITE_SCENARIOS = ("problems_create", "problems_update", "problems_delete")
+
+
+def run_mode(optimize: str, args) -> dict:
+    """在子进程中运行 bench_api（配置在导入 app 时读取，需要独立进程）"""
+    fd, output = tempfile.mkstemp(prefix="codingspace-bench-", suffix=".json")
+    os.close(fd)
+    try:
+        subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.bench_api",
+                "--users", str(args.concurrency), "--problems", "0",
+                "--concurrency", str(args.concurrency), "--requests", str(args.requests),
+                "--scenarios", *args.scenarios, "--output", output,
+            ],
+            cwd=BACKEND_DIR, env={**os.environ, "SQLITE_OPTIMIZE": optimize},
+            stdout=subprocess.DEVNULL, check=True,
+        )
+        with open(output, encoding="utf-8") as f:
+            return json.load(f)["scenarios"]
+    finally:
+        os.remove(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=20, help="每个客户端的请求次数")
+    parser.add_argument("--scenarios", nargs="+", choices=WRITE_SCENARIOS, default=list(WRITE_SCENARIOS),
+                        help="要运行的写入场景（update/delete 依赖 create 创建的题目）")
+    parser.add_argument("--output", default=None, help="结果JSON输出路径")
+    args = parser.parse_args()
+    args.concurrency = max(1, args.concurrency)
+
+    results = {mode: run_mode(optimize, args) for mode, optimize in MODES.items()}
+    speedup = {
+        name: round(results["optimized"][name]["rps"] / results["default"][name]["rps"], 2)
+        for name in args.scenarios if results["default"][name]["rps"]
+    }
+    write_report(args.output, {
+        "benchmark": "sqlite_writes",
+        "environment": environment_info("sqlite://"),
+        "concurrency": args.concurrency,
+        "requests_per_client": args.requests,
+        **results,
+        "speedup": speedup,
+    })
+
+
+if __name__ == "__main__":
+    main()
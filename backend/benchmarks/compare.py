@@ -0,0 +1,69 @@
+"""
+对比两份基准测试结果
+
+遍历两份 JSON 报告中所有包含 rps 与延迟百分位的条目，输出变化百分比；
+吞吐下降或 p99 延迟上升超过阈值时视为性能回退，退出码为 1（可用于 CI）。
+
+用法：
+    python -m benchmarks.compare baseline.json current.json --threshold 10
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, Tuple
+
+METRICS = ("rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def iter_results(report: dict, prefix: str = "") -> Iterator[Tuple[str, Dict[str, float]]]:
+    """产出 (路径, 统计) 对，路径形如 scenarios.me"""
+    for key, value in report.items():
+        if not isinstance(value, dict):
+            continue
+        path = f"{prefix}.{key}" if prefix else key
+        if "rps" in value and "p99_ms" in value:
+            yield path, value
+        else:
+            yield from iter_results(value, path)
+
+
+def change(before: float, after: float) -> float:
+    """变化百分比"""
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", help="基准结果JSON")
+    parser.add_argument("current", help="当前结果JSON")
+    parser.add_argument("--threshold", type=float, default=10.0, help="判定回退的变化百分比")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = dict(iter_results(json.load(f)))
+    with open(args.current, encoding="utf-8") as f:
+        current = dict(iter_results(json.load(f)))
+
+    regressions = []
+    print(f"{'name':<36}" + "".join(f"{m:>18}" for m in METRICS))
+    for path, after in current.items():
+        before = baseline.get(path)
+        if before is None:
+            continue
+        cells = []
+        for metric in METRICS:
+            delta = change(before.get(metric, 0.0), after.get(metric, 0.0))
+            cells.append(f"{after.get(metric, 0.0):>10.1f} {delta:>+6.1f}%")
+        print(f"{path:<36}" + "".join(f"{cell:>18}" for cell in cells))
+        if change(before["rps"], after["rps"]) < -args.threshold or change(before["p99_ms"], after["p99_ms"]) > args.threshold:
+            regressions.append(path)
+
+    if regressions:
+        print(f"\n性能回退（超过 {args.threshold}%）：{', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,31 @@
 codingSpace 后端主应用
 基于 FastAPI 框架
 """
-from fastapi import FastAPI
+import secrets
+from typing import Optional
+
+from fastapi import FastAPI, Header, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.api.v1 import api_router
-from app.db.database import init_db, SessionLocal
+from app.db.database import init_db, SessionLocal, dispose_engines, pool_stats
+from app.db.sqlite import sqlite_writer
 from app.db.init_data import init_data
+from app.db.uploads import purge_expired_uploads, upload_purger
+from app.db.blobs import collect_garbage, garbage_collector
+from app.db.counters import start_counter_flusher, stop_counter_flusher, counter_stats
+from app.db.image_jobs import start_image_worker, stop_image_worker
+from app.core.security import shutdown_hash_executor, hash_executor_stats
+from app.core.rsa_keys import key_ring, start_key_refresher, stop_key_refresher
+from app.core.rate_limit import login_throttle
+from app.core.metrics import InstrumentationMiddleware, metrics
+from app.core.markdown import rendered_cache
+from app.core.responses import FastJSONResponse
+from app.core.news_cache import news_cache
+from app.core.user_cache import user_cache
 
 
 @asynccontextmanager
@@ -25,16 +42,39 @@ async def lifespan(app: FastAPI):
             init_data(db)
         finally:
             db.close()
+    
+    # 加载（首次启动时生成）加密登录使用的RSA密钥，避免首个请求承担密钥生成的耗时；
+    # 之后由后台任务在线程中定期检查轮换
+    key_ring.load()
+    start_key_refresher()
+    
+    # 清理过期的上传会话与临时文件，回收无引用的文件内容
+    await purge_expired_uploads()
+    await collect_garbage()
+    upload_purger.start()
+    garbage_collector.start()
+    start_counter_flusher()
+    await start_image_worker()
         
     yield
-    # 关闭时清理资源（如果需要）
+    # 关闭时停止图片处理任务（未完成的任务下次启动时继续），写入尚未落库的计数
+    await stop_image_worker()
+    await upload_purger.stop()
+    await garbage_collector.stop()
+    await stop_counter_flusher()
+    await stop_key_refresher()
+    # 关闭时释放异步连接池、限流使用的 Redis 连接与密码哈希进程池
+    await dispose_engines()
+    await login_throttle.close()
+    shutdown_hash_executor()
 
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="codingSpace平台后端API",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse
 )
 
 # 配置CORS
@@ -46,6 +86,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 请求耗时与数据库查询统计（最外层，计入 CORS 等中间件的耗时）
+app.add_middleware(InstrumentationMiddleware)
+
+# 导出到 /metrics 的缓存、计数器与进程池统计
+metrics.register_stats("cache", lambda: {
+    "user": user_cache.stats(),
+    "news": news_cache.stats(),
+    "blog_render": rendered_cache.stats(),
+})
+metrics.register_stats("counter", counter_stats)
+metrics.register_stats("db_pool", pool_stats)
+metrics.register_stats("executor", lambda: {"password_hash": hash_executor_stats()})
+metrics.register_stats("rate_limit", lambda: {"login": login_throttle.stats()})
+metrics.register_stats("sqlite_writer", lambda: {"primary": sqlite_writer.stats()})
+
 # 注册路由
 app.include_router(api_router, prefix="/api/v1")
 
@@ -62,8 +117,23 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """健康检查"""
-    return {"status": "healthy"}
+    """健康检查（附带尚未写入数据库的计数增量）"""
+    return {"status": "healthy", "counters": counter_stats()}
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def get_metrics(authorization: Optional[str] = Header(None)):
+        """Prometheus 格式的性能指标（设置 METRICS_TOKEN 时需携带 Bearer 令牌）"""
+        if settings.METRICS_TOKEN:
+            scheme, _, token = (authorization or "").partition(" ")
+            if scheme.lower() != "bearer" or not secrets.compare_digest(token, settings.METRICS_TOKEN):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="指标令牌无效",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 
 if __name__ == "__main__":